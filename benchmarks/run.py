@@ -0,0 +1,274 @@
+"""
+# End-to-end scale benchmarks
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Generates a synthetic dependency tree (see synthetic.py), then times frundles commands
+on it, in aggregate and recurse modes:
+
+- sync-cold: sync without catalog folder, lock file nor cache;
+- sync-warm: sync of an already synchronized workspace;
+- sync-forced: same, but bypassing the no-op detection;
+- list: list every library of the tree;
+- locate: locate a library of the deepest level from the root workspace;
+- bump-all: bump all libraries, after a new commit has been added to each of them.
+
+Each command runs in a new process, like it would from a shell or an EDA tool. Results
+are written as JSON, to track performance regressions.
+
+Usage:
+
+    python benchmarks/run.py --libraries 100 --depth 3 --diamonds 5 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import synthetic
+
+_REPO_DIR = Path(__file__).resolve().parent.parent
+_RESULTS_VERSION = 1
+
+MODES = ("aggregate", "recurse")
+
+
+###########################################
+# Command runner
+###########################################
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Runner:
+    def __init__(self, command, wspace_path: Path, cache_dir: Path):
+        self.command = command
+        self.wspace_path = wspace_path
+
+        self.env = dict(os.environ)
+        self.env["FRUNDLES_CACHE_DIR"] = str(cache_dir)
+        self.env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(_REPO_DIR / "src"), os.environ.get("PYTHONPATH")])
+        )
+
+    def run(self, *args):
+        """Run a frundles command, and return its duration in seconds"""
+
+        start = time.perf_counter()
+        result = subprocess.run(
+            [*self.command, *args],
+            cwd=self.wspace_path,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        duration = time.perf_counter() - start
+
+        output = result.stdout.decode("utf-8", errors="replace")
+
+        # Library errors are logged, but don't change the exit code
+        if (result.returncode != 0) or (" ERROR " in output):
+            raise BenchmarkError(
+                f"'frundles {' '.join(args)}' failed in {self.wspace_path}:\n{output}"
+            )
+
+        return duration
+
+
+###########################################
+# Benchmark phases
+###########################################
+
+
+def _clean_workspace(wspace_path: Path, cache_dir: Path):
+    for path in (wspace_path / "ip", wspace_path / ".frundles", cache_dir):
+        shutil.rmtree(path, ignore_errors=True)
+
+    (wspace_path / "frundles.lock").unlink(missing_ok=True)
+
+
+def _summary(mode: str, phase: str, runs):
+    return {
+        "mode": mode,
+        "phase": phase,
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "max": max(runs),
+    }
+
+
+def bench_mode(
+    tree: synthetic.SyntheticTree, work_dir: Path, mode: str, args, commit_index
+):
+    wspace_path = work_dir / mode / "ws"
+    cache_dir = work_dir / mode / "cache"
+
+    synthetic.create_root_workspace(wspace_path, tree, mode)
+
+    runner = Runner(args.command, wspace_path, cache_dir)
+    fetch_args = ["--jobs", str(args.jobs), *shlex.split(args.fetch_args)]
+    locate_target = tree.levels[-1][-1]
+
+    results = list()
+
+    def phase(name, func):
+        runs = [func() for _ in range(args.repeat)]
+        results.append(_summary(mode, name, runs))
+        print(
+            f"{mode:>10} {name:>10}: median {results[-1]['median']:.3f}s",
+            file=sys.stderr,
+        )
+
+    def sync_cold():
+        _clean_workspace(wspace_path, cache_dir)
+        return runner.run("sync", *fetch_args)
+
+    def bump_all():
+        for name in tree.all_libraries:
+            synthetic.add_commit(tree, name, next(commit_index))
+
+        return runner.run("bump-all", *fetch_args)
+
+    phase("sync-cold", sync_cold)
+    phase("sync-warm", lambda: runner.run("sync", *fetch_args))
+    phase("sync-forced", lambda: runner.run("sync", "--force", *fetch_args))
+    phase("list", lambda: runner.run("list", "--all"))
+    phase("locate", lambda: runner.run("locate", locate_target))
+    phase("bump-all", bump_all)
+
+    return results
+
+
+###########################################
+# Main
+###########################################
+
+
+def _get_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=_REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Frundles scale benchmarks")
+
+    parser.add_argument("--libraries", type=int, default=20, help="Number of libraries")
+    parser.add_argument("--depth", type=int, default=2, help="Number of nesting levels")
+    parser.add_argument("--history", type=int, default=10, help="Commits per library")
+    parser.add_argument("--files", type=int, default=10, help="Files per library")
+    parser.add_argument(
+        "--diamonds",
+        type=int,
+        default=0,
+        help="Shared libraries required by every library of the deepest level",
+    )
+    parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per phase")
+    parser.add_argument("--jobs", type=int, default=1, help="Value of sync --jobs")
+    parser.add_argument(
+        "--fetch-args",
+        default="",
+        help="Additional arguments for the sync and bump-all commands",
+    )
+    parser.add_argument(
+        "--command",
+        type=shlex.split,
+        default=[sys.executable, "-m", "frundles"],
+        help="Command used to run frundles",
+    )
+    parser.add_argument("--work-dir", type=Path, help="Keep generated files there")
+    parser.add_argument(
+        "--output", "-o", default="-", help="JSON results file, '-' for stdout"
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if (args.libraries < 1) or (args.repeat < 1):
+        raise SystemExit("At least one library and one run per phase are needed")
+
+    scenario = synthetic.Scenario(
+        libraries=args.libraries,
+        depth=args.depth,
+        history=args.history,
+        files=args.files,
+        diamonds=args.diamonds,
+    )
+
+    tmp_dir = None
+    if args.work_dir is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="frundles-bench-")
+        work_dir = Path(tmp_dir.name)
+    else:
+        work_dir = args.work_dir.resolve()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    try:
+        print(f"Generating repositories in {work_dir}", file=sys.stderr)
+        tree = synthetic.generate(work_dir / "origins", scenario)
+
+        commit_index = iter(range(sys.maxsize))
+        modes = MODES if args.mode == "both" else (args.mode,)
+
+        results = list()
+        for mode in modes:
+            results += bench_mode(tree, work_dir, mode, args, commit_index)
+
+    except BenchmarkError as exc:
+        raise SystemExit(str(exc))
+
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    report = {
+        "version": _RESULTS_VERSION,
+        "revision": _get_revision(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenario": {
+            **vars(scenario),
+            "jobs": args.jobs,
+            "fetch_args": args.fetch_args,
+        },
+        "results": results,
+    }
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print("")
+    else:
+        with open(args.output, "w") as fhandle:
+            json.dump(report, fhandle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+# Synthetic workspace generator for benchmarks
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Builds a tree of local bare git repositories, served through file:// URLs, and a root
+workspace depending on them. Libraries are spread over several nesting levels: each
+library of a level is required by a library of the previous level, and libraries of the
+first level are required by the root workspace. Shared ("diamond") libraries are required
+by every library of the deepest level.
+
+Repositories are created with git fast-import, so that large histories and file counts
+are generated quickly.
+"""
+
+import subprocess
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+_COMMITTER = "Frundles bench <bench@frundles.invalid>"
+_START_TIME = 1700000000
+
+
+###########################################
+# Scenario description
+###########################################
+
+
+@dataclass
+class Scenario:
+    """Size of the generated dependency tree"""
+
+    """Number of libraries in the tree, excluding shared libraries"""
+    libraries: int = 20
+
+    """Number of nesting levels"""
+    depth: int = 2
+
+    """Number of commits in each library"""
+    history: int = 10
+
+    """Number of files in each library"""
+    files: int = 10
+
+    """Number of shared libraries, required by every library of the deepest level"""
+    diamonds: int = 0
+
+
+@dataclass
+class SyntheticTree:
+    """Generated repositories"""
+
+    """Folder containing the bare origin repositories"""
+    origins_dir: Path
+
+    """Friendly names of libraries, for each nesting level"""
+    levels: List[List[str]]
+
+    """Friendly names of shared libraries"""
+    shared: List[str]
+
+    """Friendly names of libraries required by each library"""
+    dependencies: Dict[str, List[str]] = field(default_factory=dict)
+
+    def origin(self, name: str):
+        return f"file://{self.origins_dir / name}.git"
+
+    @property
+    def all_libraries(self):
+        return [name for level in self.levels for name in level] + self.shared
+
+
+###########################################
+# Git helpers
+###########################################
+
+
+def _data(content: bytes) -> bytes:
+    return b"data %d\n" % len(content) + content + b"\n"
+
+
+def _commit_header(timestamp: int, message: str, parent: bool) -> bytes:
+    return (
+        b"commit refs/heads/main\n"
+        + f"committer {_COMMITTER} {timestamp} +0000\n".encode("utf-8")
+        + _data(message.encode("utf-8"))
+        + (b"from refs/heads/main^0\n" if parent else b"")
+    )
+
+
+def _inline_file(path: str, content: bytes) -> bytes:
+    return f"M 644 inline {path}\n".encode("utf-8") + _data(content)
+
+
+def _fast_import(repo_path: Path, stream: bytes):
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=repo_path,
+        input=stream,
+        check=True,
+    )
+
+
+def _workspace_file(dependencies: List[str], tree: SyntheticTree, mode: str = None):
+    lines = ["workspace:", "    catalog_dir: ip"]
+    if mode is not None:
+        lines.append(f"    mode: {mode}")
+
+    lines.append("libraries:")
+    for name in dependencies:
+        lines += [
+            f"    - origin: {tree.origin(name)}",
+            "      branch: main",
+            f"      friendly_name: {name}",
+        ]
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _create_repo(repo_path: Path, scenario: Scenario, extra_files: Dict[str, bytes]):
+    subprocess.run(
+        ["git", "init", "--quiet", "--bare", "--initial-branch=main", str(repo_path)],
+        check=True,
+    )
+
+    # First commit contains every file, next ones modify a single file each
+    stream = _commit_header(_START_TIME, "Initial commit", parent=False)
+    for i in range(scenario.files):
+        stream += _inline_file(
+            f"src/file_{i:05d}.txt", f"{repo_path.name} {i}\n".encode()
+        )
+    for path, content in extra_files.items():
+        stream += _inline_file(path, content)
+
+    # NOTE # Commits of a same stream are chained to the current branch head implicitly
+    for i in range(1, scenario.history):
+        stream += _commit_header(_START_TIME + i, f"Commit {i}", parent=False)
+        stream += _inline_file(
+            f"src/file_{i % max(scenario.files, 1):05d}.txt",
+            f"{repo_path.name} revision {i}\n".encode(),
+        )
+
+    _fast_import(repo_path, stream)
+
+
+###########################################
+# Tree generation
+###########################################
+
+
+def generate(origins_dir: Path, scenario: Scenario) -> SyntheticTree:
+    """Create the origin repositories for a scenario"""
+
+    origins_dir = Path(origins_dir).resolve()
+    origins_dir.mkdir(parents=True, exist_ok=True)
+
+    depth = max(scenario.depth, 1)
+    names = iter(f"lib-{i:04d}" for i in range(scenario.libraries + scenario.diamonds))
+
+    levels = list()
+    for level in range(depth):
+        size = scenario.libraries // depth + (
+            1 if level < scenario.libraries % depth else 0
+        )
+        levels.append([next(names) for _ in range(size)])
+
+    levels = [level for level in levels if level]
+    shared = list(names)
+
+    tree = SyntheticTree(origins_dir=origins_dir, levels=levels, shared=shared)
+
+    # Each library of a level is required by a library of the previous level
+    for parent_level, child_level in zip(levels, levels[1:]):
+        for i, name in enumerate(child_level):
+            parent = parent_level[i % len(parent_level)]
+            tree.dependencies.setdefault(parent, list()).append(name)
+
+    for name in levels[-1] if levels else []:
+        tree.dependencies.setdefault(name, list()).extend(shared)
+
+    for name in tree.all_libraries:
+        dependencies = tree.dependencies.get(name)
+        extra_files = (
+            {"frundles.yml": _workspace_file(dependencies, tree)}
+            if dependencies
+            else {}
+        )
+
+        _create_repo(origins_dir / f"{name}.git", scenario, extra_files)
+
+    return tree
+
+
+def add_commit(tree: SyntheticTree, name: str, index: int):
+    """Add a new commit on the main branch of a library"""
+
+    stream = _commit_header(
+        _START_TIME + 100000 + index, f"Update {index}", parent=True
+    )
+    stream += _inline_file("UPDATE.txt", f"{name} update {index}\n".encode())
+
+    _fast_import(tree.origins_dir / f"{name}.git", stream)
+
+
+def create_root_workspace(path: Path, tree: SyntheticTree, mode: str):
+    """Create the root workspace, requiring libraries of the first level"""
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    (path / "frundles.yml").write_bytes(
+        _workspace_file(tree.levels[0] if tree.levels else [], tree, mode=mode)
+    )
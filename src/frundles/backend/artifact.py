@@ -5,68 +5,696 @@
 - August 2024
 """
 
+import json
 import logging
+import os
+import shutil
+import subprocess
+import tarfile
 import tempfile
+import threading
 import traceback
 import urllib.parse
 
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 from ..model import (
     ItemIdentifier,
     FetchStatus,
+    FetchOptions,
     Library,
     WorkspaceInfo,
     RefSpec,
     RefSpecKind,
 )
-from git import Repo, InvalidGitRepositoryError
 
-from ..errors import InvalidOrigin
+# NOTE # GitPython is imported lazily by the functions using it, so that commands that
+# don't need it (locate, list) start faster.
+if TYPE_CHECKING:
+    from git import Repo
+
+from ..errors import (
+    ExternalDestinationNotEmpty,
+    GitProcessError,
+    InvalidOrigin,
+    NotAvailableOffline,
+    RefNotFound,
+)
+from ..exchange.atomic_write import atomic_write
 
 from . import catalog
+from . import origin_rewrite
+from . import object_cache
+from . import ref_cache
+from . import profiling
 
 
 log = logging.getLogger("backend.artifact")
 
+# Repositories sharing a same object store must not be fetched concurrently
+_store_locks_guard = threading.Lock()
+_store_locks: Dict[Path, threading.RLock] = dict()
+
 
 ###########################################
 # Utility functions
 ###########################################
 
 
-def _is_workspace_dirty(repo: Repo):
+def _get_git_dir(repo_dir: Path) -> Optional[Path]:
+    """Get the git directory of a repository, or None if the folder is not a repository.
+
+    Handles the case where .git is a file pointing to the actual git directory (worktrees, submodules)
+    """
+
+    dot_git = repo_dir / ".git"
+
+    if dot_git.is_dir():
+        return dot_git
+
+    elif dot_git.is_file():
+        content = dot_git.read_text().strip()
+        if content.startswith("gitdir:"):
+            return (repo_dir / content[len("gitdir:") :].strip()).resolve()
+
+    return None
+
+
+def _link_worktree(worktree_dir: Path, git_dir: Path):
+    """Make a worktree folder and its administrative folder in the object store point to
+    each other again.
+
+    Args:
+        git_dir: Administrative folder of the worktree, located in <store>/worktrees/<name>
+    """
+
+    (worktree_dir / ".git").write_text(f"gitdir: {git_dir}\n")
+
+    # Only the link from the store to the worktree is left to fix
+    subprocess.run(
+        [
+            "git",
+            "--git-dir",
+            str(git_dir.parent.parent),
+            "worktree",
+            "repair",
+            str(worktree_dir),
+        ],
+        capture_output=True,
+        check=True,
+    )
+
+
+def _repair_worktree(folder_path: Path) -> bool:
+    """Repair a catalog worktree whose links are broken, as the catalog has been moved or
+    copied: git worktrees and their object store refer to each other using absolute paths.
+
+    The object store is looked for in the catalog folder containing the worktree.
+
+    Returns:
+        True if the worktree has been repaired
+    """
+
+    dot_git = folder_path / ".git"
+    if not dot_git.is_file():
+        return False
+
+    content = dot_git.read_text().strip()
+    if not content.startswith("gitdir:"):
+        return False
+
+    old_git_dir = (folder_path / content[len("gitdir:") :].strip()).resolve()
+
+    # Links are fine if the administrative folder points back to this worktree
+    try:
+        if Path((old_git_dir / "gitdir").read_text().strip()).resolve() == (
+            dot_git.resolve()
+        ):
+            return False
+    except OSError:
+        pass
+
+    git_dir = (
+        folder_path.parent
+        / catalog.STORES_DIR
+        / old_git_dir.parent.parent.name
+        / "worktrees"
+        / old_git_dir.name
+    ).resolve()
+
+    if (git_dir == old_git_dir) or not (git_dir / "HEAD").is_file():
+        return False
+
+    log.warning(f"Catalog has been moved or copied, repair worktree {folder_path}")
+
+    try:
+        _link_worktree(folder_path, git_dir)
+        return True
+
+    except (OSError, subprocess.CalledProcessError) as exc:
+        log.warning(f"Could not repair worktree {folder_path}: {exc}")
+        return False
+
+
+def _get_common_dir(git_dir: Path) -> Path:
+    """Get the directory containing shared repository data (config, refs, objects).
+
+    This is the git directory itself, except for worktrees.
+    """
+
+    if (git_dir / "commondir").is_file():
+        return (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+    else:
+        return git_dir
+
+
+def _get_repo_common_dir(repo_dir: Path) -> Path:
+    """Get the directory containing shared repository data for a repository folder.
+
+    This is the .git folder of a regular repository, the object store of a worktree, or
+    the folder itself for a bare repository.
+    """
+
+    git_dir = _get_git_dir(repo_dir)
+    return _get_common_dir(git_dir) if git_dir is not None else Path(repo_dir)
+
+
+def _with_config(git, config: Optional[str]):
+    """Pass a git -c configuration option to the next GitPython command, if given"""
+
+    return git(c=config) if config is not None else git
+
+
+def _get_store_lock(common_dir: Path) -> threading.RLock:
+    common_dir = Path(common_dir).resolve()
+
+    with _store_locks_guard:
+        if common_dir not in _store_locks:
+            _store_locks[common_dir] = threading.RLock()
+
+        return _store_locks[common_dir]
+
+
+def _read_origin_url(git_dir: Path) -> Optional[str]:
+    """Read the URL of the 'origin' remote directly from the repository configuration file.
+
+    Returns:
+        The origin URL, or None if the repository has no 'origin' remote.
+    """
+
+    config_path = _get_common_dir(git_dir) / "config"
+    section = None
+
+    for line in config_path.read_text().splitlines():
+        line = line.strip()
+
+        if line.startswith("["):
+            section = line[1 : line.index("]")].strip()
+
+        elif section == 'remote "origin"':
+            key, sep, value = line.partition("=")
+            if sep and (key.strip().lower() == "url"):
+                return value.strip().strip('"')
+
+    return None
+
+
+def _read_head(git_dir: Path) -> Optional[str]:
+    """Read the commit SHA1 pointed by HEAD directly from the git directory files.
+
+    Returns:
+        The commit SHA1, or None if HEAD doesn't point to any commit.
+    """
+
+    head = (git_dir / "HEAD").read_text().strip()
+
+    # Detached HEAD, which is the usual case for catalog repositories
+    if not head.startswith("ref:"):
+        return head
+
+    # Symbolic reference: references are stored in the common directory for worktrees
+    ref_name = head[len("ref:") :].strip()
+    common_dir = _get_common_dir(git_dir)
+
+    for base_dir in (git_dir, common_dir):
+        loose_ref = base_dir / ref_name
+        if loose_ref.is_file():
+            return loose_ref.read_text().strip()
+
+    packed_refs = common_dir / "packed-refs"
+    if packed_refs.is_file():
+        for line in packed_refs.read_text().splitlines():
+            oid, _, name = line.partition(" ")
+            if name.strip() == ref_name:
+                return oid
+
+    return None
+
+
+# git arguments to list modifications of a repository workspace
+DIRTY_CHECK_ARGS = (
+    "-c",
+    "core.untrackedCache=true",
+    "status",
+    "--porcelain",
+    "-z",
+    "--untracked-files=normal",
+)
+
+
+def _is_workspace_dirty(repo_dir: Path):
     """Check if a repository workspace is clean.
 
     This checks that there is :
         - No diff with tracked files
         - No new untracked file
+
+    Both checks are done with a single git status call. Untracked directories are not
+    recursed into, and git's untracked cache is enabled to avoid scanning unchanged folders.
+    """
+
+    result = subprocess.run(
+        ["git", *DIRTY_CHECK_ARGS],
+        cwd=repo_dir,
+        capture_output=True,
+        check=True,
+    )
+
+    return len(result.stdout) > 0
+
+
+###########################################
+# Sparse checkouts
+###########################################
+
+
+def get_filter_args(options: FetchOptions) -> Tuple[str, ...]:
+    """Get the git fetch arguments for a blobless partial clone, if a sparse checkout is
+    requested: file contents are then only fetched when checked out.
+
+    File contents are fetched with the history in offline mode or when the object cache
+    is used, as fetching them at checkout would contact the origin instead.
     """
 
-    return repo.index.diff(None) or repo.untracked_files
+    if (
+        (not options.sparse_paths)
+        or options.offline
+        or (options.object_cache_dir is not None)
+    ):
+        return tuple()
+
+    return ("--filter=blob:none",)
 
 
-def _get_commit_sha1(lib: Library):
-    """Get the associated commit SHA1 for a given repository"""
+def get_sparse_checkout_args(
+    repo_dir: Path, options: FetchOptions
+) -> Optional[Tuple[str, ...]]:
+    """Get the git sparse-checkout arguments restricting a repository workspace to the
+    requested folders, or restoring the whole tree. None if nothing needs to be done."""
 
-    repo_url = lib.origin
-    ref_name = lib.identifier.refspec.value
-    ref_kind = lib.identifier.refspec.kind
+    if options.sparse_paths:
+        return ("set", "--cone", *options.sparse_paths)
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # print(f"Fetch to {tmpdir}")
+    git_dir = _get_git_dir(Path(repo_dir))
+    if (git_dir is not None) and (git_dir / "info" / "sparse-checkout").is_file():
+        return ("disable",)
 
-        repo = Repo.init(tmpdir)
-        origin = repo.create_remote("origin", url=repo_url)
+    return None
 
-        origin.fetch()
 
-        refspec_value = (
-            f"origin/{ref_name}" if ref_kind == RefSpecKind.Branch else ref_name
+def _checkout(
+    repo: "Repo", origin: str, target_refspec: RefSpec, options: FetchOptions
+):
+    """Check out a commit, restricted to the requested folders if any.
+
+    Files of a partial clone are fetched by the checkout: origin rewrite rules apply.
+    """
+
+    sparse_args = get_sparse_checkout_args(Path(repo.working_tree_dir), options)
+    if sparse_args is not None:
+        repo.git.sparse_checkout(*sparse_args)
+
+    if options.sparse_paths:
+        origin_rewrite.run(
+            origin,
+            options.mirrors,
+            lambda config: _with_config(repo.git, config).checkout(
+                target_refspec.value
+            ),
         )
-        commit_sha1 = repo.git.rev_parse(refspec_value)
+    else:
+        repo.git.checkout(target_refspec.value)
+
+
+@contextmanager
+def _offline_checkout(
+    common_dir: Path, origin: str, target_refspec: RefSpec, options: FetchOptions
+):
+    """Report a checkout failing offline because files of a partial clone are missing:
+    they can only be fetched from the origin."""
+
+    from git import GitCommandError
+
+    if (
+        (not options.offline)
+        or has_local_origin(str(origin))
+        or (not _is_partial_clone(common_dir))
+    ):
+        yield
+        return
+
+    try:
+        yield
+    except (GitCommandError, GitProcessError) as exc:
+        raise NotAvailableOffline(origin=origin, refspec=target_refspec) from exc
+
+
+def _parse_ls_remote(output: str) -> Dict[str, str]:
+    advertised = dict()
+    for line in output.splitlines():
+        oid, _, ref_name = line.partition("\t")
+        advertised[ref_name.strip()] = oid.strip()
+
+    return advertised
+
+
+def _ls_remote(
+    repo_url: str, *refs: str, options: Optional[FetchOptions] = None
+) -> Dict[str, str]:
+    """List references advertised by a remote repository, without fetching any object.
+
+    Args:
+        repo_url: URL of the remote repository
+        refs: full reference names to query (ex: refs/heads/main)
+        options: Options giving the mirrors of the remote repository
+
+    Returns:
+        A dictionary matching each advertised reference name to its SHA1. Peeled
+        annotated tags are reported with the ``^{}`` suffix, as in ``git ls-remote``.
+    """
+
+    from git import Git
+
+    git = Git()
+    options = options or FetchOptions()
+
+    return _parse_ls_remote(
+        origin_rewrite.run(
+            repo_url,
+            options.mirrors,
+            lambda config: _with_config(git, config).ls_remote(str(repo_url), *refs),
+        )
+    )
+
+
+def _get_queried_refs(refspec: RefSpec) -> Tuple[str, ...]:
+    """Full reference names to query to resolve a branch or tag refspec"""
+
+    if refspec.kind == RefSpecKind.Branch:
+        return (f"refs/heads/{refspec.value}",)
+    else:
+        full_ref = f"refs/tags/{refspec.value}"
+        return (full_ref, f"{full_ref}^{{}}")
+
+
+def _select_commit_sha1(lib: Library, advertised: Dict[str, str]) -> str:
+    """Find the commit SHA1 of a library refspec in the advertised references"""
+
+    refspec = lib.identifier.refspec
+
+    if refspec.kind == RefSpecKind.Branch:
+        commit_sha1 = advertised.get(f"refs/heads/{refspec.value}", None)
+
+    else:
+        # Annotated tags are advertised twice: the tag object itself, and the commit it
+        # points to with the ^{} suffix. Prefer the latter, as the lock file stores commits.
+        full_ref = f"refs/tags/{refspec.value}"
+        commit_sha1 = advertised.get(f"{full_ref}^{{}}", advertised.get(full_ref, None))
+
+    if commit_sha1 is None:
+        raise RefNotFound(origin=lib.origin, refspec=refspec)
+
+    return commit_sha1
+
+
+def _get_commit_sha1(lib: Library, options: Optional[FetchOptions] = None):
+    """Get the associated commit SHA1 for a given repository.
+
+    Only the references advertised by the remote are queried, so no object is downloaded.
+    """
+
+    refspec = lib.identifier.refspec
+
+    # A commit refspec is already resolved
+    if refspec.kind == RefSpecKind.Commit:
+        return refspec.value
+
+    advertised = _ls_remote(lib.origin, *_get_queried_refs(refspec), options=options)
+    return _select_commit_sha1(lib, advertised)
+
+
+def _get_cached_commit_sha1(lib: Library, options: FetchOptions) -> Optional[str]:
+    """Get the commit SHA1 of a library from the reference cache, if enabled"""
+
+    refspec = lib.identifier.refspec
+
+    if (options.ref_cache_dir is None) or options.refresh:
+        return None
+
+    max_age = None if refspec.kind == RefSpecKind.Tag else options.branch_ttl
+    commit_sha1 = ref_cache.get(options.ref_cache_dir, lib.origin, refspec, max_age)
+
+    if commit_sha1 is not None:
+        log.info(f"Using cached commit {commit_sha1} for {lib.identifier.identifier}")
+
+    return commit_sha1
+
+
+def _save_commit_sha1(lib: Library, options: FetchOptions, commit_sha1: str):
+    if options.ref_cache_dir is not None:
+        ref_cache.put(
+            options.ref_cache_dir, lib.origin, lib.identifier.refspec, commit_sha1
+        )
+
+
+def resolve_commit_sha1(lib: Library, options: Optional[FetchOptions] = None):
+    """Get the associated commit SHA1 for a given repository, using the reference cache if enabled"""
+
+    options = options or FetchOptions()
+
+    if lib.identifier.refspec.kind == RefSpecKind.Commit:
+        return lib.identifier.refspec.value
+
+    if options.offline and not has_local_origin(str(lib.origin)):
+        return _resolve_offline(lib, options)
+
+    commit_sha1 = _get_cached_commit_sha1(lib, options)
+
+    if commit_sha1 is None:
+        commit_sha1 = _get_commit_sha1(lib, options)
+        _save_commit_sha1(lib, options, commit_sha1)
+
+    return commit_sha1
+
+
+###########################################
+# Offline mode
+###########################################
+
+
+def _iter_local_sources(origin: str, options: FetchOptions):
+    """List local repositories that may contain objects of an origin.
+
+    The bundle of the origin comes first if a bundle folder is given, then the object
+    cache mirror, then repositories and object stores of the catalog folders cloned from
+    the same origin.
+    """
+
+    if options.bundle_dir is not None:
+        bundle_path = catalog.get_bundle_path(options.bundle_dir, origin)
+        if bundle_path.is_file():
+            yield bundle_path
+
+    if options.object_cache_dir is not None:
+        mirror_path = object_cache.get_mirror_path(options.object_cache_dir, origin)
+        if (mirror_path / "HEAD").is_file():
+            yield mirror_path
+
+    seen = set()
+
+    for catalog_dir in map(Path, options.catalog_dirs):
+        if not catalog_dir.is_dir():
+            continue
+
+        folders = list(catalog_dir.iterdir())
+        for stores_dir in (
+            catalog_dir / catalog.STORES_DIR,
+            catalog_dir / catalog.STORES_DIR / catalog.EXTERNAL_STORES_DIR,
+        ):
+            if stores_dir.is_dir():
+                folders += list(stores_dir.iterdir())
+
+        for folder in folders:
+            git_dir = folder if (folder / "HEAD").is_file() else _get_git_dir(folder)
+            if git_dir is None:
+                continue
+
+            try:
+                common_dir = _get_common_dir(git_dir).resolve()
+                if (common_dir in seen) or (
+                    str(_read_origin_url(common_dir)) != str(origin)
+                ):
+                    continue
+
+            except OSError:
+                continue
+
+            seen.add(common_dir)
+            yield common_dir
+
+
+def _git_has_commit(git_dir: Path, commit_sha1: str):
+    result = subprocess.run(
+        [
+            "git",
+            "--git-dir",
+            str(git_dir),
+            "cat-file",
+            "-e",
+            f"{commit_sha1}^{{commit}}",
+        ],
+        capture_output=True,
+    )
+
+    return result.returncode == 0
+
+
+def _is_partial_clone(git_dir: Path):
+    """Check if objects of a repository may be missing, to be fetched from its origin.
+
+    Clones are marked by extensions.partialClone, repositories fetched with a filter by the
+    remote.<name>.promisor setting.
+    """
+
+    result = subprocess.run(
+        [
+            "git",
+            "--git-dir",
+            str(git_dir),
+            "config",
+            "--get-regexp",
+            r"^(extensions\.partialclone|remote\..*\.promisor)$",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    for line in result.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if (key == "extensions.partialclone") or (value.lower() == "true"):
+            return True
+
+    return False
+
+
+def _resolve_offline(lib: Library, options: FetchOptions) -> str:
+    """Resolve a branch or tag without contacting the origin.
+
+    The reference cache is used whatever the age of its entries, then references of the
+    local repositories of the origin.
+    """
+
+    refspec = lib.identifier.refspec
+
+    if options.ref_cache_dir is not None:
+        commit_sha1 = ref_cache.get(options.ref_cache_dir, lib.origin, refspec)
+        if commit_sha1 is not None:
+            log.info(
+                f"Using cached commit {commit_sha1} for {lib.identifier.identifier}"
+            )
+            return commit_sha1
+
+    if refspec.kind == RefSpecKind.Branch:
+        refs = (f"refs/heads/{refspec.value}", f"refs/remotes/origin/{refspec.value}")
+    else:
+        refs = (f"refs/tags/{refspec.value}^{{commit}}",)
+
+    for git_dir in _iter_local_sources(lib.origin, options):
+        # Bundles only contain the locked commits
+        if not git_dir.is_dir():
+            continue
+
+        for ref in refs:
+            result = subprocess.run(
+                [
+                    "git",
+                    "--git-dir",
+                    str(git_dir),
+                    "rev-parse",
+                    "--verify",
+                    "--quiet",
+                    ref,
+                ],
+                capture_output=True,
+                text=True,
+            )
+
+            if result.returncode == 0:
+                log.warning(
+                    f"Resolved {lib.identifier.identifier} offline from {git_dir}, the reference may be outdated"
+                )
+                return result.stdout.strip()
+
+    raise NotAvailableOffline(origin=lib.origin, refspec=refspec)
+
+
+def _fetch_offline(
+    common_dir: Path, origin: str, target_refspec: RefSpec, options: FetchOptions
+):
+    """Get a commit from local repositories only, see _iter_local_sources.
+
+    Objects of the object cache mirror are borrowed, other repositories are fetched from.
+    """
+
+    commit_sha1 = target_refspec.value
+
+    if _git_has_commit(common_dir, commit_sha1):
+        return
+
+    mirror_path = (
+        object_cache.get_mirror_path(options.object_cache_dir, origin)
+        if options.object_cache_dir is not None
+        else None
+    )
+
+    for source in _iter_local_sources(origin, options):
+        if source == Path(common_dir).resolve():
+            continue
+
+        if source == mirror_path:
+            object_cache.borrow_objects(common_dir, source)
+        else:
+            subprocess.run(
+                [
+                    "git",
+                    "--git-dir",
+                    str(common_dir),
+                    "fetch",
+                    "--quiet",
+                    str(source),
+                    commit_sha1,
+                ],
+                capture_output=True,
+            )
+
+        if _git_has_commit(common_dir, commit_sha1):
+            log.info(f"Got {target_refspec} of {origin} from {source}")
+            return
 
-        return commit_sha1
+    raise NotAvailableOffline(origin=origin, refspec=target_refspec)
 
 
 ###########################################
@@ -75,8 +703,18 @@ def _get_commit_sha1(lib: Library):
 
 
 def check_status(
-    root_wspace: WorkspaceInfo, cur_wspace: WorkspaceInfo, lib_id: ItemIdentifier
+    root_wspace: WorkspaceInfo,
+    cur_wspace: WorkspaceInfo,
+    lib_id: ItemIdentifier,
+    dirty_check: bool = True,
 ):
+    """Get the current status of a library in the catalog.
+
+    Args:
+        dirty_check: Check for uncommitted modifications in the library folder. Can be disabled
+                     when the catalog is known to be untouched, as this is the most expensive check.
+    """
+
     folder_path = catalog.get_lib_path(root_wspace, cur_wspace, lib_id)
 
     # Step 1: Checked that folder exists
@@ -87,25 +725,40 @@ def check_status(
         return FetchStatus.Invalid
 
     # Step 2: Check properties of git repository
-    try:
-        repo = Repo(folder_path)
-        oid = repo.head.commit.hexsha
+    _repair_worktree(folder_path)
+    git_dir = _get_git_dir(folder_path)
 
-        # Commit doesn't correspond to target
-        if oid != lib_id.locked_refspec.value:
-            return FetchStatus.Modified
-
-        # Uncomitted modifications exists in repo
-        elif _is_workspace_dirty(repo):
-            return FetchStatus.Dirty
+    # Exported library: the marker file tells which commit has been extracted
+    if git_dir is None:
+        marker = _read_export_marker(folder_path)
 
+        if marker is None:
+            return FetchStatus.Invalid
+        elif marker.get("commit") != lib_id.locked_refspec.value:
+            return FetchStatus.Modified
         else:
             return FetchStatus.Ok
 
     # Directory is not a valid git repository
-    except InvalidGitRepositoryError:
+    elif not (git_dir / "HEAD").is_file():
+        return FetchStatus.Invalid
+
+    oid = _read_head(git_dir)
+
+    if oid is None:
         return FetchStatus.Invalid
 
+    # Commit doesn't correspond to target
+    elif oid != lib_id.locked_refspec.value:
+        return FetchStatus.Modified
+
+    # Uncomitted modifications exists in repo
+    elif dirty_check and _is_workspace_dirty(folder_path):
+        return FetchStatus.Dirty
+
+    else:
+        return FetchStatus.Ok
+
 
 ###########################################
 # Library status management
@@ -113,14 +766,15 @@ def check_status(
 
 
 def get_origin(repo_dir: Path):
-    if (repo_dir / ".git").is_dir():
+    git_dir = _get_git_dir(repo_dir)
+
+    if git_dir is not None:
         try:
-            repo = Repo(repo_dir)
+            url = _read_origin_url(
+                git_dir
+            )  # TODO # Check if remotes[0] can be used to get URL from default remotes with a name different than 'origin'?
 
-            if "origin" in repo.remotes:
-                url = (
-                    repo.remotes.origin.url
-                )  # TODO # Check if remotes[0] can be used to get URL from default remotes with a name different than 'origin'?
+            if url is not None:
                 return url
             else:
                 log.warning(
@@ -133,6 +787,22 @@ def get_origin(repo_dir: Path):
             log.debug(traceback.format_exc())
             return None
     else:
+        marker = _read_export_marker(Path(repo_dir))
+        return marker.get("origin") if marker is not None else None
+
+
+def get_head(repo_dir: Path) -> Optional[str]:
+    """Get the commit SHA1 checked out in a repository, None if it is not a valid repository"""
+
+    git_dir = _get_git_dir(Path(repo_dir))
+
+    if git_dir is None:
+        marker = _read_export_marker(Path(repo_dir))
+        return marker.get("commit") if marker is not None else None
+
+    try:
+        return _read_head(git_dir)
+    except OSError:
         return None
 
 
@@ -141,31 +811,573 @@ def has_local_origin(origin: str):
     return url.scheme in {"", "file"}
 
 
-def clone(target_dir: Path, origin: str, target_refspec: RefSpec):
+def resolve_local_origin(base_dir: Path, origin: str) -> str:
+    """Resolve a local origin against a base directory.
+
+    file:// URLs are absolute, and kept as is. Plain paths are made absolute, relative to
+    the base directory.
+    """
+
+    if urllib.parse.urlsplit(str(origin)).scheme == "file":
+        return str(origin)
+    else:
+        return str((Path(base_dir) / origin).resolve())
+
+
+def get_local_origin_path(origin: str) -> Path:
+    """Get the directory a local origin points to"""
+
+    url = urllib.parse.urlsplit(str(origin))
+
+    if url.scheme == "file":
+        return Path(urllib.parse.unquote(url.path))
+    else:
+        return Path(origin)
+
+
+def _has_commit(repo: "Repo", commit_sha1: str):
+    from git import GitCommandError
+
+    try:
+        repo.git.cat_file("-e", f"{commit_sha1}^{{commit}}")
+        return True
+    except GitCommandError:
+        return False
+
+
+def _fetch_shallow(
+    repo: "Repo", origin: str, target_refspec: RefSpec, options: FetchOptions
+):
+    """Fetch only the target commit, without history.
+
+    Returns:
+        True if the commit has been fetched, False if the remote refused to serve it.
+    """
+
+    from git import GitCommandError
+
+    try:
+        origin_rewrite.run(
+            origin,
+            options.mirrors,
+            lambda config: _with_config(repo.git, config).fetch(
+                "--depth=1", *get_filter_args(options), "origin", target_refspec.value
+            ),
+        )
+        return True
+
+    except GitCommandError as exc:
+        log.warning(
+            f"{origin} refused to serve {target_refspec} alone, fallback to full fetch"
+        )
+        log.debug(str(exc))
+        return False
+
+
+def _fetch(repo: "Repo", origin: str, target_refspec: RefSpec, options: FetchOptions):
+    """Fetch references for a repository, using the object cache or the shallow mode if enabled"""
+
+    common_dir = Path(repo.common_dir)
+
+    if options.offline and not has_local_origin(str(origin)):
+        _fetch_offline(common_dir, origin, target_refspec, options)
+        return
+
+    if (options.object_cache_dir is not None) and not has_local_origin(str(origin)):
+        with profiling.span("mirror", str(origin)):
+            mirror_path = object_cache.ensure_mirror(
+                options.object_cache_dir, origin, options.mirrors
+            )
+
+        object_cache.borrow_objects(common_dir, mirror_path)
+
+        if _has_commit(repo, target_refspec.value):
+            return
+
+        log.warning(
+            f"{target_refspec} not found in object cache for {origin}, fetch from origin"
+        )
+
+    elif options.shallow and _fetch_shallow(repo, origin, target_refspec, options):
+        return
+
+    # A shallow repository needs its whole history to reach any commit
+    if (common_dir / "shallow").is_file():
+        fetch_args = ("--unshallow", "origin")
+    else:
+        fetch_args = ("origin",)
+
+    origin_rewrite.run(
+        origin,
+        options.mirrors,
+        lambda config: _with_config(repo.git, config).fetch(
+            *get_filter_args(options), *fetch_args
+        ),
+    )
+
+
+def _open_store(store_dir: Path, origin: str) -> "Repo":
+    """Open the bare object store of a library, creating it if needed"""
+
+    from git import Repo
+
+    if not (store_dir / "HEAD").is_file():
+        log.info(f"Create object store for {origin} in {store_dir}")
+
+        repo = Repo.init(store_dir, bare=True, mkdir=True)
+        repo.create_remote("origin", url=str(origin))
+
+        return repo
+
+    existing_origin = _read_origin_url(store_dir)
+
+    if str(existing_origin) != str(origin):
+        raise InvalidOrigin(target_origin=origin, got_origin=existing_origin)
+
+    # NOTE # Sparse worktrees move the core.bare setting of the store to its config.worktree
+    # file, which GitPython doesn't read: commands are then run from the parent folder.
+    repo = Repo(store_dir)
+    repo.git.update_environment(GIT_DIR=str(store_dir))
+
+    return repo
+
+
+def _add_worktree(
+    target_dir: Path,
+    store_dir: Path,
+    origin: str,
+    target_refspec: RefSpec,
+    options: FetchOptions,
+):
+    """Check out a commit as a worktree of the library object store.
+
+    The origin is only fetched if the store doesn't contain the commit yet.
+    """
+
+    from git import Repo
+
+    with _get_store_lock(store_dir):
+        store = _open_store(store_dir, origin)
+
+        with profiling.span("fetch", str(origin)):
+            if not _has_commit(store, target_refspec.value):
+                _fetch(store, origin, target_refspec, options)
+
+        with profiling.span("checkout", str(target_dir)):
+            # Forget worktrees whose folder has been removed, so that it can be added again
+            store.git.worktree("prune")
+
+            try:
+                with _offline_checkout(store_dir, origin, target_refspec, options):
+                    # Sparse checkouts are configured in the worktree before checking files out
+                    if options.sparse_paths:
+                        store.git.worktree(
+                            "add",
+                            "--no-checkout",
+                            "--detach",
+                            str(target_dir.resolve()),
+                            target_refspec.value,
+                        )
+                        _checkout(Repo(target_dir), origin, target_refspec, options)
+
+                    else:
+                        store.git.worktree(
+                            "add",
+                            "--detach",
+                            str(target_dir.resolve()),
+                            target_refspec.value,
+                        )
+
+            except NotAvailableOffline:
+                # Don't leave an incomplete worktree behind, so that the next sync adds it again
+                shutil.rmtree(target_dir, ignore_errors=True)
+                raise
+
+
+def clone(
+    target_dir: Path,
+    origin: str,
+    target_refspec: RefSpec,
+    options: Optional[FetchOptions] = None,
+    store_dir: Optional[Path] = None,
+):
+    """Clone a library to a folder, checked out at the target reference.
+
+    Args:
+        store_dir: Object store shared with other checkouts of the library, see
+                   catalog.get_store_path. The library folder is then created as a
+                   worktree of this store, instead of a standalone repository.
+
+    If sparse paths are given in the options, only the history is fetched, and files
+    are fetched for the requested folders only when checked out.
+    """
+
+    from git import Repo
+
+    options = options or FetchOptions()
+
     target_dir = Path(target_dir)
+
+    if store_dir is not None:
+        target_dir.parent.mkdir(parents=True, exist_ok=True)
+        _add_worktree(target_dir, Path(store_dir), origin, target_refspec, options)
+        return
+
     target_dir.mkdir(exist_ok=False, parents=True)
 
-    repo = Repo.init(target_dir)
-    origin = repo.create_remote("origin", url=origin)
+    try:
+        repo = Repo.init(target_dir)
+        repo.create_remote("origin", url=str(origin))
+
+        with profiling.span("fetch", str(origin)):
+            _fetch(repo, origin, target_refspec, options)
 
-    origin.fetch()
+        with profiling.span("checkout", str(target_dir)):
+            _checkout(repo, origin, target_refspec, options)
 
-    repo.git.checkout(target_refspec.value)
+    except BaseException:
+        # Don't leave a broken repository behind, so that the next sync clones it again
+        shutil.rmtree(target_dir, ignore_errors=True)
+        raise
 
 
-def update(target_dir: Path, origin: str, target_refspec: RefSpec):
+def update(
+    target_dir: Path,
+    origin: str,
+    target_refspec: RefSpec,
+    options: Optional[FetchOptions] = None,
+):
+    from git import Repo
+
     log.info(f"Update repo at {target_dir} to reference {target_refspec}")
 
+    options = options or FetchOptions()
+
     # Check valid origin
     existing_origin = get_origin(target_dir)
 
     if str(existing_origin) != str(origin):
         raise InvalidOrigin(target_origin=origin, got_origin=existing_origin)
 
+    # Exported libraries are extracted again
+    if is_exported(Path(target_dir)):
+        export(target_dir, origin, target_refspec, options)
+        return
+
     # Open repo, fetch, checkout target reference
     repo = Repo(target_dir)
-    origin = repo.remotes.origin
 
-    origin.fetch()
+    # Worktrees of a same object store share their references
+    with profiling.span("fetch", str(origin)):
+        with _get_store_lock(Path(repo.common_dir)):
+            _fetch(repo, origin, target_refspec, options)
+
+    with profiling.span("checkout", str(target_dir)):
+        with _offline_checkout(Path(repo.common_dir), origin, target_refspec, options):
+            _checkout(repo, origin, target_refspec, options)
+
+
+###########################################
+# Exported libraries
+###########################################
+
+# Marker file describing the commit extracted in an exported library folder
+EXPORT_MARKER = ".frundles-export"
+
+
+def _read_export_marker(folder_path: Path) -> Optional[Dict[str, str]]:
+    """Read the export marker of a library folder, None if it is not an exported library"""
+
+    try:
+        return json.loads((folder_path / EXPORT_MARKER).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_exported(folder_path: Path):
+    """Check if a library folder is a plain tree extracted by export, without git repository"""
+
+    return (_get_git_dir(folder_path) is None) and (
+        _read_export_marker(folder_path) is not None
+    )
+
+
+def _extract_tree(git_dir: Path, commit_sha1: str, target_dir: Path):
+    """Extract the files of a commit to a folder, streaming the output of git archive"""
+
+    proc = subprocess.Popen(
+        ["git", "--git-dir", str(git_dir), "archive", "--format=tar", commit_sha1],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|") as archive:
+            # Extraction filters are only available in recent python versions
+            if hasattr(tarfile, "tar_filter"):
+                archive.extractall(target_dir, filter="tar")
+            else:
+                archive.extractall(target_dir)
+
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        returncode = proc.wait()
+
+    if returncode != 0:
+        raise GitProcessError(
+            ("archive", commit_sha1), returncode, stderr.decode("utf-8", "replace")
+        )
+
+
+def export(
+    target_dir: Path,
+    origin: str,
+    target_refspec: RefSpec,
+    options: Optional[FetchOptions] = None,
+):
+    """Extract the files of a commit to a folder, without git repository.
+
+    The commit is fetched alone in a temporary repository, or borrowed from the object cache
+    if enabled. A marker file records the extracted commit and its tree hash, so that the
+    status of the folder can be checked without reading the library files. An existing
+    export of the library is replaced.
+    """
+
+    from git import Repo
+
+    options = options or FetchOptions()
+
+    target_dir = Path(target_dir)
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+
+    # Work next to the target folder, so that the result can be moved in place
+    work_dir = Path(
+        tempfile.mkdtemp(prefix=f".{target_dir.name}-", dir=target_dir.parent)
+    )
+
+    try:
+        repo = Repo.init(work_dir / "repo", bare=True, mkdir=True)
+        repo.create_remote("origin", url=str(origin))
+
+        with profiling.span("fetch", str(origin)):
+            _fetch(repo, origin, target_refspec, replace(options, shallow=True))
+
+        with profiling.span("checkout", str(target_dir)):
+            tree_dir = work_dir / "tree"
+            tree_dir.mkdir()
+
+            _extract_tree(Path(repo.git_dir), target_refspec.value, tree_dir)
+
+            marker = {
+                "origin": str(origin),
+                "commit": target_refspec.value,
+                "tree": repo.git.rev_parse(f"{target_refspec.value}^{{tree}}"),
+            }
+            (tree_dir / EXPORT_MARKER).write_text(json.dumps(marker, indent=4) + "\n")
+
+            if target_dir.exists():
+                target_dir.rename(work_dir / "previous")
+
+            tree_dir.rename(target_dir)
+
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+###########################################
+# Externals
+###########################################
+
+# Well-known hash of the empty tree: extracting a whole commit is a diff from this tree
+_EMPTY_TREE_SHA1 = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+
+def _read_tree_diff(git_dir: Path, old_tree: str, new_tree: str):
+    """List files changed between two trees.
+
+    Returns:
+        A list of (status, mode, blob SHA1, path) tuples, giving the new mode and blob
+        of each file. See git diff-tree --raw for status letters.
+    """
+
+    output = subprocess.run(
+        [
+            "git",
+            "--git-dir",
+            str(git_dir),
+            "diff-tree",
+            "-r",
+            "-z",
+            "--no-renames",
+            old_tree,
+            new_tree,
+        ],
+        capture_output=True,
+        check=True,
+    ).stdout
+
+    tokens = output.split(b"\0")
+    changes = list()
+
+    for header, path in zip(tokens[0::2], tokens[1::2]):
+        _, new_mode, _, new_sha1, status = header.decode().lstrip(":").split(" ")
+        changes.append((status, new_mode, new_sha1, os.fsdecode(path)))
+
+    return changes
+
+
+def _remove_file(dest_path: Path, path: Path):
+    """Remove a file, and its parent folders if they become empty"""
+
+    path.unlink(missing_ok=True)
+
+    parent = path.parent
+    while (parent != dest_path) and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+        parent = parent.parent
+
+
+def _write_blobs(git_dir: Path, dest_path: Path, files):
+    """Write blobs to files, reading them from a single git cat-file process
+
+    Args:
+        files: List of (mode, blob SHA1, path) tuples
+    """
+
+    proc = subprocess.Popen(
+        ["git", "--git-dir", str(git_dir), "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+
+    try:
+        for mode, blob_sha1, path in files:
+            proc.stdin.write(f"{blob_sha1}\n".encode())
+            proc.stdin.flush()
+
+            header = proc.stdout.readline().split()
+            if (len(header) != 3) or (header[1] != b"blob"):
+                raise GitProcessError(("cat-file", blob_sha1), 0, "blob not found")
+
+            content = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)  # Trailing new line
+
+            file_path = dest_path / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+
+            if mode == "120000":
+                file_path.unlink(missing_ok=True)
+                os.symlink(os.fsdecode(content), file_path)
+
+            else:
+                if file_path.is_symlink():
+                    file_path.unlink()
+
+                with atomic_write(file_path, "wb") as fhandle:
+                    fhandle.write(content)
+
+                os.chmod(file_path, 0o755 if mode == "100755" else 0o644)
+
+    finally:
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.wait()
+
+
+def sync_external(
+    dest_path: Path,
+    store_dir: Path,
+    origin: str,
+    target_refspec: RefSpec,
+    options: Optional[FetchOptions] = None,
+):
+    """Bring the destination folder of an external to the target commit, without git repository.
+
+    The destination folder holds the files of the commit, and the same marker file as
+    exported libraries. When the folder was synced to another commit, only the files
+    changed between both commits are written or removed: unchanged files keep their
+    modification time, which matters for tools relying on it for incremental builds.
+
+    Args:
+        store_dir: Object store keeping the fetched commits, see catalog.get_external_store_path
+    """
+
+    options = options or FetchOptions()
+
+    dest_path = Path(dest_path)
+    store_dir = Path(store_dir)
+
+    marker = _read_export_marker(dest_path)
+
+    if (marker is not None) and (marker.get("commit") == target_refspec.value):
+        return
+
+    # Never overwrite files that don't come from a previous sync
+    if (marker is None) and dest_path.is_dir() and any(dest_path.iterdir()):
+        raise ExternalDestinationNotEmpty(dest_path)
+
+    log.info(f"Sync external from {origin} to {dest_path} at {target_refspec}")
+
+    # Only the synced commits are needed
+    fetch_options = replace(options, shallow=True)
+    old_commit = marker.get("commit") if marker is not None else None
+
+    with _get_store_lock(store_dir):
+        store = _open_store(store_dir, origin)
+
+        with profiling.span("fetch", str(origin)):
+            if not _has_commit(store, target_refspec.value):
+                _fetch(store, origin, target_refspec, fetch_options)
+
+            if (old_commit is not None) and not _has_commit(store, old_commit):
+                try:
+                    old_refspec = RefSpec(kind=RefSpecKind.Commit, value=old_commit)
+                    _fetch(store, origin, old_refspec, fetch_options)
+
+                except Exception as exc:
+                    log.debug(str(exc))
+
+                if not _has_commit(store, old_commit):
+                    log.warning(
+                        f"Previously synced commit {old_commit} is not available anymore, sync all files of {dest_path} again"
+                    )
+                    shutil.rmtree(dest_path)
+                    old_commit = None
+
+        with profiling.span("checkout", str(dest_path)):
+            # Written first, so that an interrupted sync is resumed instead of refused
+            if old_commit is None:
+                dest_path.mkdir(parents=True, exist_ok=True)
+                with atomic_write(dest_path / EXPORT_MARKER) as fhandle:
+                    json.dump({"origin": str(origin), "commit": None}, fhandle)
+
+            git_dir = Path(store.git_dir)
+            changes = _read_tree_diff(
+                git_dir, old_commit or _EMPTY_TREE_SHA1, target_refspec.value
+            )
+
+            # Removals first, as a file may replace a removed folder
+            for status, mode, blob_sha1, path in changes:
+                if status in {"D", "T"}:
+                    _remove_file(dest_path, dest_path / path)
+
+            _write_blobs(
+                git_dir,
+                dest_path,
+                [
+                    (mode, blob_sha1, path)
+                    for status, mode, blob_sha1, path in changes
+                    if (status != "D") and (mode != "160000")  # Submodules are ignored
+                ],
+            )
+
+            marker = {
+                "origin": str(origin),
+                "commit": target_refspec.value,
+                "tree": store.git.rev_parse(f"{target_refspec.value}^{{tree}}"),
+            }
 
-    repo.git.checkout(target_refspec.value)
+            with atomic_write(dest_path / EXPORT_MARKER) as fhandle:
+                fhandle.write(json.dumps(marker, indent=4) + "\n")
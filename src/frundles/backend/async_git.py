@@ -0,0 +1,574 @@
+"""
+# asyncio based git backend
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Alternative to the GitPython based functions of backend.artifact: git operations are run
+as asyncio subprocesses of the git command line tool, so that hundreds of remote
+operations can be driven from a single thread.
+
+Concurrency is bounded by a global limit, and by a per-host limit for operations reaching
+a remote server. Each git process can be given a timeout. When interrupted, pending
+operations are cancelled, their git processes are killed and partially cloned folders
+are removed.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import urllib.parse
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ..errors import GitProcessError, GitTimeout, InvalidOrigin
+from ..model import (
+    FetchOptions,
+    FetchStatus,
+    ItemIdentifier,
+    Library,
+    RefSpec,
+    RefSpecKind,
+    WorkspaceInfo,
+)
+
+from . import artifact
+from . import catalog
+from . import object_cache
+from . import origin_rewrite
+from . import profiling
+
+log = logging.getLogger("backend.async_git")
+
+_SCP_LIKE_RE = re.compile(r"^(?:[^@/]+@)?([^:/]+):")
+
+
+def get_host(origin: str) -> Optional[str]:
+    """Get the host name of a remote origin, None for local origins"""
+
+    origin = str(origin)
+
+    if "://" in origin:
+        url = urllib.parse.urlsplit(origin)
+        return url.hostname if url.scheme != "file" else None
+
+    # scp-like syntax: [user@]host:path
+    match = _SCP_LIKE_RE.match(origin)
+    return match.group(1) if match else None
+
+
+class AsyncGit:
+    """Runs git commands as asyncio subprocesses, with concurrency limits
+
+    Args:
+        jobs: Maximum number of concurrent git processes
+        max_per_host: Maximum number of concurrent git processes reaching a same host, 0 for no limit
+        timeout: Timeout of each git process in seconds, None for no timeout
+    """
+
+    def __init__(
+        self, jobs: int = 1, max_per_host: int = 0, timeout: Optional[float] = None
+    ):
+        self.jobs = max(jobs, 1)
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+
+        self.loop = asyncio.new_event_loop()
+
+        # Semaphores are created from the event loop, on first use
+        self._global_limit = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = dict()
+        self._store_locks: Dict[Path, asyncio.Lock] = dict()
+
+        # Never wait for credentials on a terminal from concurrent processes
+        self._env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+
+    def close(self):
+        self.loop.close()
+
+    def run_all(self, coroutines: Iterable) -> List:
+        """Run coroutines concurrently, and return their results in order.
+
+        Exceptions are returned instead of being raised. On Ctrl-C, pending operations are
+        cancelled before KeyboardInterrupt is raised again.
+        """
+
+        async def gather():
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+
+        task = self.loop.create_task(gather())
+
+        try:
+            return self.loop.run_until_complete(task)
+
+        except KeyboardInterrupt:
+            log.warning("Interrupted, cancelling pending git operations")
+            task.cancel()
+
+            try:
+                self.loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+
+            raise
+
+    ###########################################
+    # git processes
+    ###########################################
+
+    @asynccontextmanager
+    async def _limit(self, host: Optional[str]):
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self.jobs)
+
+        host_limit = None
+        if (host is not None) and (self.max_per_host > 0):
+            if host not in self._host_limits:
+                self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+            host_limit = self._host_limits[host]
+
+        # Wait for a host slot first, so that global slots are not held by waiting operations
+        if host_limit is not None:
+            await host_limit.acquire()
+
+        try:
+            async with self._global_limit:
+                yield
+
+        finally:
+            if host_limit is not None:
+                host_limit.release()
+
+    def _store_lock(self, common_dir: Path) -> asyncio.Lock:
+        """Repositories sharing a same object store must not be fetched concurrently"""
+
+        common_dir = Path(common_dir).resolve()
+
+        if common_dir not in self._store_locks:
+            self._store_locks[common_dir] = asyncio.Lock()
+
+        return self._store_locks[common_dir]
+
+    @staticmethod
+    async def _kill(proc: asyncio.subprocess.Process):
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+            await proc.wait()
+
+    @staticmethod
+    def _config_args(config: Optional[str]):
+        """git -c arguments for a configuration option, if given"""
+
+        return ("-c", config) if config is not None else tuple()
+
+    async def git(self, *args: str, cwd: Optional[Path] = None, origin=None) -> str:
+        """Run a git command, and return its output
+
+        Args:
+            cwd: Working directory of the command
+            origin: Remote origin reached by the command, for per-host limits
+        """
+
+        host = get_host(origin) if origin is not None else None
+
+        async with self._limit(host):
+            proc = await asyncio.create_subprocess_exec(
+                "git",
+                *args,
+                cwd=cwd,
+                env=self._env,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(), self.timeout
+                )
+
+            except asyncio.TimeoutError:
+                await self._kill(proc)
+                raise GitTimeout(args, self.timeout)
+
+            except asyncio.CancelledError:
+                await self._kill(proc)
+                raise
+
+        if proc.returncode != 0:
+            raise GitProcessError(
+                args, proc.returncode, stderr.decode("utf-8", errors="replace")
+            )
+
+        return stdout.decode("utf-8", errors="replace")
+
+    ###########################################
+    # Reference resolution
+    ###########################################
+
+    async def resolve_commit_sha1(self, lib: Library, options: FetchOptions):
+        """Get the associated commit SHA1 for a given repository, see artifact.resolve_commit_sha1"""
+
+        refspec = lib.identifier.refspec
+
+        if refspec.kind == RefSpecKind.Commit:
+            return refspec.value
+
+        if options.offline and not artifact.has_local_origin(str(lib.origin)):
+            return await self.loop.run_in_executor(
+                None, artifact._resolve_offline, lib, options
+            )
+
+        commit_sha1 = artifact._get_cached_commit_sha1(lib, options)
+
+        if commit_sha1 is None:
+            output = await origin_rewrite.run_async(
+                lib.origin,
+                options.mirrors,
+                lambda config: self.git(
+                    *self._config_args(config),
+                    "ls-remote",
+                    str(lib.origin),
+                    *artifact._get_queried_refs(refspec),
+                    origin=lib.origin,
+                ),
+            )
+
+            commit_sha1 = artifact._select_commit_sha1(
+                lib, artifact._parse_ls_remote(output)
+            )
+            artifact._save_commit_sha1(lib, options, commit_sha1)
+
+        return commit_sha1
+
+    ###########################################
+    # Library status
+    ###########################################
+
+    async def is_dirty(self, repo_dir: Path):
+        return len(await self.git(*artifact.DIRTY_CHECK_ARGS, cwd=repo_dir)) > 0
+
+    async def check_status(
+        self,
+        root_wspace: WorkspaceInfo,
+        cur_wspace: WorkspaceInfo,
+        lib_id: ItemIdentifier,
+        dirty_check: bool = True,
+    ):
+        """Get the current status of a library in the catalog, see artifact.check_status"""
+
+        # Other checks only read a few files from the git directory
+        lib_status = artifact.check_status(
+            root_wspace, cur_wspace, lib_id, dirty_check=False
+        )
+
+        folder_path = catalog.get_lib_path(root_wspace, cur_wspace, lib_id)
+
+        # Exported libraries have no repository to check
+        if (
+            (lib_status == FetchStatus.Ok)
+            and dirty_check
+            and not artifact.is_exported(folder_path)
+        ):
+            if await self.is_dirty(folder_path):
+                return FetchStatus.Dirty
+
+        return lib_status
+
+    ###########################################
+    # Clone and update
+    ###########################################
+
+    async def _has_commit(self, repo_dir: Path, commit_sha1: str):
+        try:
+            await self.git("cat-file", "-e", f"{commit_sha1}^{{commit}}", cwd=repo_dir)
+            return True
+        except GitProcessError:
+            return False
+
+    async def _fetch(
+        self,
+        repo_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        """Fetch references for a repository, see artifact._fetch"""
+
+        common_dir = artifact._get_repo_common_dir(repo_dir)
+
+        if options.offline and not artifact.has_local_origin(str(origin)):
+            await self.loop.run_in_executor(
+                None,
+                artifact._fetch_offline,
+                common_dir,
+                origin,
+                target_refspec,
+                options,
+            )
+            return
+
+        if (options.object_cache_dir is not None) and not artifact.has_local_origin(
+            str(origin)
+        ):
+            # Mirrors are protected by blocking file locks: use worker threads
+            async with self._limit(get_host(origin)):
+                with profiling.span("mirror", str(origin)):
+                    mirror_path = await self.loop.run_in_executor(
+                        None,
+                        object_cache.ensure_mirror,
+                        options.object_cache_dir,
+                        origin,
+                        options.mirrors,
+                    )
+
+            await self.loop.run_in_executor(
+                None, object_cache.borrow_objects, common_dir, mirror_path
+            )
+
+            if await self._has_commit(repo_dir, target_refspec.value):
+                return
+
+            log.warning(
+                f"{target_refspec} not found in object cache for {origin}, fetch from origin"
+            )
+
+        elif options.shallow:
+            try:
+                await origin_rewrite.run_async(
+                    origin,
+                    options.mirrors,
+                    lambda config: self.git(
+                        *self._config_args(config),
+                        "fetch",
+                        "--depth=1",
+                        *artifact.get_filter_args(options),
+                        "origin",
+                        target_refspec.value,
+                        cwd=repo_dir,
+                        origin=origin,
+                    ),
+                )
+                return
+
+            except GitProcessError as exc:
+                log.warning(
+                    f"{origin} refused to serve {target_refspec} alone, fallback to full fetch"
+                )
+                log.debug(str(exc))
+
+        # A shallow repository needs its whole history to reach any commit
+        if (common_dir / "shallow").is_file():
+            fetch_args = ("--unshallow", "origin")
+        else:
+            fetch_args = ("origin",)
+
+        await origin_rewrite.run_async(
+            origin,
+            options.mirrors,
+            lambda config: self.git(
+                *self._config_args(config),
+                "fetch",
+                *artifact.get_filter_args(options),
+                *fetch_args,
+                cwd=repo_dir,
+                origin=origin,
+            ),
+        )
+
+    async def _checkout(
+        self,
+        target_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        """Check out a commit, restricted to the requested folders if any, see
+        artifact._checkout"""
+
+        sparse_args = artifact.get_sparse_checkout_args(target_dir, options)
+        if sparse_args is not None:
+            await self.git("sparse-checkout", *sparse_args, cwd=target_dir)
+
+        if options.sparse_paths:
+            await origin_rewrite.run_async(
+                origin,
+                options.mirrors,
+                lambda config: self.git(
+                    *self._config_args(config),
+                    "checkout",
+                    "--quiet",
+                    target_refspec.value,
+                    cwd=target_dir,
+                ),
+            )
+        else:
+            await self.git("checkout", "--quiet", target_refspec.value, cwd=target_dir)
+
+    async def _fetch_and_checkout(
+        self,
+        target_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        with profiling.span("fetch", str(origin)):
+            await self._fetch(target_dir, origin, target_refspec, options)
+
+        with profiling.span("checkout", str(target_dir)):
+            await self._checkout(target_dir, origin, target_refspec, options)
+
+    async def _open_store(self, store_dir: Path, origin: str):
+        """Create the bare object store of a library if needed, see artifact._open_store"""
+
+        if not (store_dir / "HEAD").is_file():
+            log.info(f"Create object store for {origin} in {store_dir}")
+
+            store_dir.mkdir(parents=True, exist_ok=True)
+            await self.git("init", "--quiet", "--bare", cwd=store_dir)
+            await self.git("remote", "add", "origin", str(origin), cwd=store_dir)
+
+        else:
+            existing_origin = artifact._read_origin_url(store_dir)
+
+            if str(existing_origin) != str(origin):
+                raise InvalidOrigin(target_origin=origin, got_origin=existing_origin)
+
+    async def _add_worktree(
+        self,
+        target_dir: Path,
+        store_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        async with self._store_lock(store_dir):
+            await self._open_store(store_dir, origin)
+
+            with profiling.span("fetch", str(origin)):
+                if not await self._has_commit(store_dir, target_refspec.value):
+                    await self._fetch(store_dir, origin, target_refspec, options)
+
+            with profiling.span("checkout", str(target_dir)):
+                await self.git("worktree", "prune", cwd=store_dir)
+
+                with artifact._offline_checkout(
+                    store_dir, origin, target_refspec, options
+                ):
+                    # Sparse checkouts are configured in the worktree before checking files out
+                    await self.git(
+                        "worktree",
+                        "add",
+                        *(("--no-checkout",) if options.sparse_paths else tuple()),
+                        "--detach",
+                        str(target_dir.resolve()),
+                        target_refspec.value,
+                        cwd=store_dir,
+                    )
+
+                    if options.sparse_paths:
+                        await self._checkout(
+                            target_dir, origin, target_refspec, options
+                        )
+
+    async def clone(
+        self,
+        target_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+        store_dir: Optional[Path] = None,
+    ):
+        """Clone a library to a folder, see artifact.clone"""
+
+        target_dir = Path(target_dir)
+
+        if store_dir is not None:
+            target_dir.parent.mkdir(parents=True, exist_ok=True)
+
+            try:
+                await self._add_worktree(
+                    target_dir, Path(store_dir), origin, target_refspec, options
+                )
+
+            except BaseException:
+                # The worktree is forgotten by the store on the next prune
+                shutil.rmtree(target_dir, ignore_errors=True)
+                raise
+
+            return
+
+        target_dir.mkdir(exist_ok=False, parents=True)
+
+        try:
+            await self.git("init", "--quiet", cwd=target_dir)
+            await self.git("remote", "add", "origin", str(origin), cwd=target_dir)
+
+            await self._fetch_and_checkout(target_dir, origin, target_refspec, options)
+
+        except BaseException:
+            # Don't leave a partially cloned folder behind, it would be reported as invalid
+            shutil.rmtree(target_dir, ignore_errors=True)
+            raise
+
+    async def update(
+        self,
+        target_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        log.info(f"Update repo at {target_dir} to reference {target_refspec}")
+
+        # Check valid origin
+        existing_origin = artifact.get_origin(target_dir)
+
+        if str(existing_origin) != str(origin):
+            raise InvalidOrigin(target_origin=origin, got_origin=existing_origin)
+
+        target_dir = Path(target_dir)
+
+        # Exported libraries are extracted again
+        if artifact.is_exported(target_dir):
+            await self.export(target_dir, origin, target_refspec, options)
+            return
+
+        # Worktrees of a same object store share their references
+        async with self._store_lock(artifact._get_repo_common_dir(target_dir)):
+            with profiling.span("fetch", str(origin)):
+                await self._fetch(target_dir, origin, target_refspec, options)
+
+        with profiling.span("checkout", str(target_dir)):
+            with artifact._offline_checkout(
+                artifact._get_repo_common_dir(target_dir),
+                origin,
+                target_refspec,
+                options,
+            ):
+                await self._checkout(target_dir, origin, target_refspec, options)
+
+    async def export(
+        self,
+        target_dir: Path,
+        origin: str,
+        target_refspec: RefSpec,
+        options: FetchOptions,
+    ):
+        """Extract the files of a commit to a folder, see artifact.export.
+
+        The archive is streamed to the extraction in a worker thread, within the
+        concurrency limits. The git timeout doesn't apply.
+        """
+
+        async with self._limit(get_host(origin)):
+            await self.loop.run_in_executor(
+                None, artifact.export, target_dir, origin, target_refspec, options
+            )
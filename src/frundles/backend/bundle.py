@@ -0,0 +1,323 @@
+"""
+# Git bundles of locked libraries
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+A bundle folder contains one git bundle per origin of the workspace tree, with the
+history of all its locked commits. Bundles are built from the catalog repositories,
+without network access, and allow to synchronize the workspace on machines that can't
+reach the origins, see sync --from-bundle.
+
+The bundle folder can also be packed in a single tar archive, to ship one artifact to CI
+runners or customer sites.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..errors import InvalidBundle
+from ..model import BundleEntry, FetchOptions, WorkspaceMode
+
+from . import artifact
+from . import catalog
+from . import object_cache
+from . import workspace
+
+log = logging.getLogger("backend.bundle")
+
+
+###########################################
+# Locked commits collection
+###########################################
+
+
+def _collect_commits(root_path: Path):
+    """Find the locked commits of the workspace tree, and where they are stored.
+
+    Returns:
+        A dictionary matching each origin to its locked commits, another matching each
+        origin to the folders where its commits may be found, and the catalog directories
+        of the tree
+    """
+
+    root_wspace, _, externals, _ = workspace.load_workspace(root_path)
+    _, resolved = workspace._resolve_tree(root_path)
+
+    commits: Dict[str, List[str]] = dict()
+    folders: Dict[str, List[Path]] = dict()
+    catalog_dirs = [root_wspace.catalog_dir]
+
+    items = [(lib.origin, lib.identifier, lib.path) for lib in resolved] + [
+        (
+            ext.origin,
+            ext.identifier,
+            catalog.get_external_store_path(root_wspace, ext.identifier, ext.origin),
+        )
+        for ext in externals
+    ]
+
+    for origin, identifier, path in items:
+        if not identifier.is_locked():
+            log.warning(
+                f"{identifier.identifier} is not locked yet, synchronize the workspace first"
+            )
+            continue
+
+        origin_commits = commits.setdefault(str(origin), list())
+        if identifier.locked_refspec.value not in origin_commits:
+            origin_commits.append(identifier.locked_refspec.value)
+
+        if path is not None:
+            folders.setdefault(str(origin), list()).append(Path(path))
+
+    # In recurse mode, each nested workspace has its own catalog
+    if root_wspace.mode == WorkspaceMode.Recurse:
+        for lib in resolved:
+            catalog_dirs.append(workspace.load_workspace(lib.workspace)[0].catalog_dir)
+
+    return commits, folders, tuple(dict.fromkeys(catalog_dirs))
+
+
+def _find_sources(origin: str, commits: List[str], folders: List[Path], options):
+    """Find a repository with the whole history of each commit.
+
+    Shallow repositories are ignored: a bundle built from them can't be fetched. Partial
+    clones are ignored as well, as they lack the file contents.
+
+    Returns:
+        The repositories to take objects from, and the commits that were not found
+    """
+
+    candidates = list()
+    for folder in folders:
+        if folder.is_dir():
+            candidates.append(artifact._get_repo_common_dir(folder).resolve())
+    candidates += list(artifact._iter_local_sources(origin, options))
+
+    candidates = [
+        git_dir
+        for git_dir in dict.fromkeys(candidates)
+        if git_dir.is_dir()
+        and not (git_dir / "shallow").is_file()
+        and not artifact._is_partial_clone(git_dir)
+    ]
+
+    sources = list()
+    missing = list()
+
+    for commit_sha1 in commits:
+        git_dir = next(
+            (x for x in candidates if artifact._git_has_commit(x, commit_sha1)), None
+        )
+
+        if git_dir is None:
+            missing.append(commit_sha1)
+        elif git_dir not in sources:
+            sources.append(git_dir)
+
+    return sources, missing
+
+
+###########################################
+# Bundle creation
+###########################################
+
+
+def _git(git_dir: Path, *args: str):
+    subprocess.run(
+        ["git", "--git-dir", str(git_dir), *args], capture_output=True, check=True
+    )
+
+
+def _create_bundle(
+    output_dir: Path,
+    origin: str,
+    commits: List[str],
+    folders: List[Path],
+    options: FetchOptions,
+) -> BundleEntry:
+    """Bundle the history of the locked commits of an origin.
+
+    Commits are referenced by a temporary repository borrowing the objects of the catalog
+    repositories, so that no reference is added to the catalog.
+    """
+
+    entry = BundleEntry(origin=origin, commits=tuple(commits))
+
+    try:
+        sources, missing = _find_sources(origin, commits, folders, options)
+
+        if missing:
+            log.error(
+                f"Commits {', '.join(missing)} of {origin} are not available locally with their history, synchronize the workspace without --shallow or --export first"
+            )
+            return entry
+
+        bundle_path = catalog.get_bundle_path(output_dir, origin)
+
+        with tempfile.TemporaryDirectory(prefix=".frundles-bundle-") as tmp_dir:
+            git_dir = Path(tmp_dir) / "repo.git"
+            _git(git_dir, "init", "--quiet", "--bare")
+
+            (git_dir / "objects" / "info" / "alternates").write_text(
+                "".join(f"{x / 'objects'}\n" for x in sources)
+            )
+
+            for commit_sha1 in commits:
+                _git(git_dir, "update-ref", f"refs/frundles/{commit_sha1}", commit_sha1)
+
+            tmp_bundle_path = Path(tmp_dir) / bundle_path.name
+            _git(git_dir, "bundle", "create", "--quiet", str(tmp_bundle_path), "--all")
+
+            shutil.move(str(tmp_bundle_path), str(bundle_path))
+
+        log.info(f"Bundled {len(commits)} commit(s) of {origin} to {bundle_path}")
+
+        return BundleEntry(
+            origin=origin,
+            commits=tuple(commits),
+            path=bundle_path,
+            size=bundle_path.stat().st_size,
+        )
+
+    except (OSError, subprocess.CalledProcessError) as exc:
+        log.error(f"Could not create bundle for {origin}: {exc}")
+        log.debug(traceback.format_exc())
+        return entry
+
+
+def create_bundles(
+    root_path: Path,
+    output_path: Path,
+    archive: bool = False,
+    jobs: int = 1,
+) -> List[BundleEntry]:
+    """Create one bundle per origin of the workspace tree, from the current lock files.
+
+    Args:
+        root_path: Path of the root workspace
+        output_path: Folder to write bundles to, or archive file if archive is True
+        archive: Pack all bundles in a single tar archive
+        jobs: Maximum number of bundles to create concurrently
+
+    Returns:
+        The bundle of each origin. Bundles that couldn't be created have no path.
+    """
+
+    root_path = Path(root_path).resolve()
+    output_path = Path(output_path).resolve()
+
+    commits, folders, catalog_dirs = _collect_commits(root_path)
+
+    cache_dir = object_cache.default_cache_dir()
+    options = FetchOptions(
+        object_cache_dir=cache_dir if object_cache.is_supported() else None,
+        catalog_dirs=catalog_dirs,
+    )
+
+    # An archive is built from a temporary folder next to it
+    if archive:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_dir = Path(
+            tempfile.mkdtemp(prefix=".frundles-bundles-", dir=output_path.parent)
+        )
+    else:
+        output_dir = output_path
+
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            entries = list(
+                executor.map(
+                    lambda origin: _create_bundle(
+                        output_dir,
+                        origin,
+                        commits[origin],
+                        folders.get(origin, list()),
+                        options,
+                    ),
+                    sorted(commits.keys()),
+                )
+            )
+
+        if archive:
+            tmp_archive_path = output_dir / output_path.name
+
+            with tarfile.open(tmp_archive_path, "w") as tar:
+                for entry in entries:
+                    if entry.path is not None:
+                        tar.add(entry.path, arcname=entry.path.name)
+
+            os.replace(tmp_archive_path, output_path)
+
+            # Bundles are now in the archive
+            entries = [
+                replace(x, path=output_path) if x.path is not None else x
+                for x in entries
+            ]
+
+    finally:
+        if archive:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    return entries
+
+
+###########################################
+# Bundle usage
+###########################################
+
+
+@contextmanager
+def open_bundles(bundle_path: Optional[Path]):
+    """Get the folder containing bundles, extracting them first if an archive is given.
+
+    Yields:
+        The bundle folder, None if no bundle path is given
+    """
+
+    if bundle_path is None:
+        yield None
+        return
+
+    bundle_path = Path(bundle_path).resolve()
+
+    if bundle_path.is_dir():
+        yield bundle_path
+        return
+
+    with tempfile.TemporaryDirectory(prefix="frundles-bundles-") as tmp_dir:
+        log.info(f"Extract bundles from {bundle_path}")
+
+        try:
+            with tarfile.open(bundle_path, "r") as tar:
+                # Only plain bundle files are expected at the root of the archive
+                for member in tar.getmembers():
+                    if not (
+                        member.isfile() and (Path(member.name).name == member.name)
+                    ):
+                        continue
+
+                    # Extraction filters are only available in recent python versions
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extract(member, tmp_dir, filter="data")
+                    else:
+                        tar.extract(member, tmp_dir)
+
+        except (OSError, tarfile.TarError) as exc:
+            raise InvalidBundle(bundle_path, str(exc))
+
+        yield Path(tmp_dir)
@@ -5,8 +5,11 @@
 - August 2024
 """
 
+import hashlib
 import os
 import logging
+import re
+import urllib.parse
 
 from pathlib import Path
 
@@ -16,6 +19,12 @@ from ..errors import CatalogNotADirError, CatalogWriteAccessError
 
 log = logging.getLogger("backend.catalog")
 
+# Folder of the catalog containing the object stores shared by library worktrees
+STORES_DIR = ".stores"
+
+# Folder of the stores directory containing the object stores of externals
+EXTERNAL_STORES_DIR = "externals"
+
 
 ###########################################
 # Catalog directory management
@@ -37,6 +46,62 @@ def get_lib_path(
             return cur_wspace_info.catalog_dir / lib_id.identifier_path
 
 
+def _get_origin_digest(origin: str) -> str:
+    return hashlib.sha256(str(origin).encode("utf-8")).hexdigest()[:16]
+
+
+def get_store_path(
+    root_wspace_info: WorkspaceInfo, lib_id: ItemIdentifier, origin: str
+):
+    """Get the path of the object store shared by all locked commits of a library.
+
+    In aggregate mode, each locked commit of a library is checked out as a git worktree
+    of a single bare repository, so that its history is only fetched and stored once.
+    Stores are named after the library and a digest of its origin, as forks share the
+    name of the upstream library.
+    Returns None in recurse mode, where each library folder is a standalone repository.
+    """
+
+    if root_wspace_info.mode == WorkspaceMode.Aggregate:
+        return (
+            root_wspace_info.catalog_dir
+            / STORES_DIR
+            / f"{lib_id.name}-{_get_origin_digest(origin)}.git"
+        )
+    else:
+        return None
+
+
+def get_external_store_path(
+    wspace_info: WorkspaceInfo, ext_id: ItemIdentifier, origin: str
+):
+    """Get the path of the object store keeping the fetched commits of an external.
+
+    Externals are extracted to their destination folder without git repository: the store
+    allows to only write files changed between the previous and the new locked commit.
+    External stores are kept apart from library stores, and named the same way.
+    """
+
+    return (
+        wspace_info.catalog_dir
+        / STORES_DIR
+        / EXTERNAL_STORES_DIR
+        / f"{ext_id.name}-{_get_origin_digest(origin)}.git"
+    )
+
+
+def get_bundle_path(bundle_dir: Path, origin: str) -> Path:
+    """Get the path of the bundle containing the locked commits of an origin.
+
+    Bundles are named after the repository, followed by a digest of the origin URL to
+    tell apart repositories with the same name.
+    """
+
+    name = re.sub("[.]git$", "", Path(urllib.parse.urlsplit(str(origin)).path).name)
+
+    return Path(bundle_dir) / f"{name or 'repo'}-{_get_origin_digest(origin)}.bundle"
+
+
 def ensure_catalog_dir(wspace: WorkspaceInfo):
     catalog_dir = Path(wspace.catalog_dir).resolve()
     log.info(f"Check for {catalog_dir} as a catalog folder")
@@ -0,0 +1,270 @@
+"""
+# Catalog garbage collection
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Catalog folders are never removed by synchronizations: in aggregate mode for instance, each
+bump leaves the folder of the previous commit behind. The garbage collector finds catalog
+entries that are not referenced anymore by the lock files of the workspace tree, reports
+their disk usage, and removes them.
+
+Entries with uncommitted modifications or local commits, or that don't look like
+something frundles created, are never removed.
+"""
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+import traceback
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import List
+
+from ..model import CatalogEntry, WorkspaceMode
+
+from . import artifact
+from . import catalog
+from . import workspace
+
+log = logging.getLogger("backend.catalog_gc")
+
+# Folders of locked commits end with the commit SHA1, see ItemIdentifier.locked_identifier_path
+_COMMIT_SUFFIX = re.compile(r"[-:]([0-9a-f]{40}|[0-9a-f]{64})$")
+
+
+###########################################
+# Reachability
+###########################################
+
+
+def _find_reachable(root_path: Path):
+    """Find the catalog folders used by the workspace tree, without network access.
+
+    Returns:
+        The catalog directories to scan, matched to the workspace they belong to, and the
+        set of referenced folders
+    """
+
+    root_wspace, _, externals, _ = workspace.load_workspace(root_path)
+    _, resolved = workspace._resolve_tree(root_path)
+
+    catalog_dirs = {root_wspace.catalog_dir.resolve(): root_path}
+    reachable = set()
+
+    for lib in resolved:
+        if lib.path is not None:
+            reachable.add(lib.path.resolve())
+
+            # Worktrees keep the store they were created from
+            if (lib.path / ".git").is_file():
+                reachable.add(artifact._get_repo_common_dir(lib.path).resolve())
+
+        # In recurse mode, each nested workspace has its own catalog
+        if root_wspace.mode == WorkspaceMode.Recurse:
+            wsinfo = workspace.load_workspace(lib.workspace)[0]
+            catalog_dirs[wsinfo.catalog_dir.resolve()] = lib.workspace
+
+        if lib.identifier.is_locked():
+            store_dir = catalog.get_store_path(root_wspace, lib.identifier, lib.origin)
+            if store_dir is not None:
+                reachable.add(store_dir.resolve())
+
+    for ext in externals:
+        reachable.add(Path(ext.dest_path).resolve())
+        reachable.add(
+            catalog.get_external_store_path(
+                root_wspace, ext.identifier, ext.origin
+            ).resolve()
+        )
+
+    return catalog_dirs, reachable
+
+
+def _list_entries(catalog_dir: Path, wspace_path: Path):
+    """List folders of a catalog directory, including object stores"""
+
+    # A catalog containing its own workspace would list the workspace files as entries
+    if Path(wspace_path).resolve().is_relative_to(catalog_dir):
+        log.error(f"Catalog {catalog_dir} contains its workspace, ignoring it")
+        return
+
+    if not catalog_dir.is_dir():
+        return
+
+    for path in catalog_dir.iterdir():
+        if path.name == catalog.STORES_DIR:
+            for store_dir in path.iterdir():
+                if store_dir.name == catalog.EXTERNAL_STORES_DIR:
+                    yield from (x for x in store_dir.iterdir() if x.is_dir())
+                elif store_dir.is_dir():
+                    yield store_dir
+        elif path.is_dir() and not path.is_symlink():
+            yield path
+
+
+###########################################
+# Entries inspection
+###########################################
+
+
+def _disk_usage(path: Path) -> int:
+    """Disk space used by a folder, in bytes. Hard linked files are only counted once."""
+
+    total = 0
+    seen_inodes = set()
+    stack = [path]
+
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    st = entry.stat(follow_symlinks=False)
+
+                    if (st.st_dev, st.st_ino) in seen_inodes:
+                        continue
+                    seen_inodes.add((st.st_dev, st.st_ino))
+
+                    # Allocated blocks are not available on all platforms
+                    total += (
+                        st.st_blocks * 512 if hasattr(st, "st_blocks") else st.st_size
+                    )
+
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+
+        except OSError as exc:
+            log.warning(f"Could not compute disk usage of {path}: {exc}")
+
+    return total
+
+
+def _has_local_commits(path: Path) -> bool:
+    """Check if the checked out commit of a catalog entry may only exist locally.
+
+    Folders named after their locked commit must still be at this commit. For other
+    folders, the checked out commit must be reachable from a remote branch.
+    """
+
+    match = _COMMIT_SUFFIX.search(path.name)
+    if match is not None:
+        return artifact.get_head(path) != match.group(1)
+
+    result = subprocess.run(
+        ["git", "rev-list", "--max-count=1", "HEAD", "--not", "--remotes"],
+        cwd=path,
+        capture_output=True,
+        check=True,
+    )
+
+    return len(result.stdout) > 0
+
+
+def _is_dirty(path: Path) -> bool:
+    """Check if a catalog entry may contain modifications that would be lost.
+
+    Object stores and exported libraries can always be rebuilt. Folders that are neither a
+    repository nor an export are not managed by frundles, and considered dirty.
+    """
+
+    if (path / "HEAD").is_file() and (path / "objects").is_dir():
+        return False  # Bare repository, ie. object store
+
+    elif artifact.is_exported(path):
+        return False
+
+    elif artifact._get_git_dir(path) is None:
+        return True
+
+    try:
+        return artifact._is_workspace_dirty(path) or _has_local_commits(path)
+    except subprocess.CalledProcessError:
+        return True
+
+
+def _inspect(path: Path) -> CatalogEntry:
+    return CatalogEntry(path=path, size=_disk_usage(path), dirty=_is_dirty(path))
+
+
+def _remove(entry: CatalogEntry) -> CatalogEntry:
+    try:
+        shutil.rmtree(entry.path)
+        return replace(entry, removed=True)
+
+    except OSError as exc:
+        log.error(f"Could not remove {entry.path}: {exc}")
+        log.debug(traceback.format_exc())
+        return entry
+
+
+###########################################
+# Garbage collection
+###########################################
+
+
+def collect_garbage(
+    root_path: Path, jobs: int = 1, dry_run: bool = False
+) -> List[CatalogEntry]:
+    """Find and remove catalog entries not referenced by the workspace tree anymore.
+
+    Args:
+        root_path: Path of the root workspace
+        jobs: Maximum number of entries to inspect or remove concurrently
+        dry_run: Only report unreferenced entries, without removing them
+
+    Returns:
+        The unreferenced entries, with their disk usage. Dirty entries are kept.
+    """
+
+    root_path = Path(root_path).resolve()
+    catalog_dirs, reachable = _find_reachable(root_path)
+
+    candidates = sorted(
+        path.resolve()
+        for catalog_dir, wspace_path in catalog_dirs.items()
+        for path in _list_entries(catalog_dir, wspace_path)
+        if path.resolve() not in reachable
+    )
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        entries = list(executor.map(_inspect, candidates))
+
+        # Object stores of kept worktrees must be kept as well
+        used_stores = {
+            artifact._get_repo_common_dir(entry.path).resolve()
+            for entry in entries
+            if entry.dirty
+        }
+        entries = [
+            replace(entry, dirty=True) if entry.path in used_stores else entry
+            for entry in entries
+        ]
+
+        for entry in entries:
+            if entry.dirty:
+                log.warning(
+                    f"{entry.path} is not referenced anymore, but may contain modifications: keeping it"
+                )
+
+        if dry_run:
+            return entries
+
+        entries = list(
+            executor.map(
+                lambda entry: entry if entry.dirty else _remove(entry), entries
+            )
+        )
+
+    # Forget worktrees whose folder has been removed
+    for store_dir in reachable:
+        if store_dir.parent.name == catalog.STORES_DIR and store_dir.is_dir():
+            subprocess.run(
+                ["git", "--git-dir", str(store_dir), "worktree", "prune"],
+                capture_output=True,
+            )
+
+    return entries
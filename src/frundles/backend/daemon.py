@@ -0,0 +1,252 @@
+"""
+# Frundles workspace daemon
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+A long-lived process serving locate/list requests for a root workspace over a Unix
+domain socket. Parsed workspace information stays in memory, and is reloaded when
+workspace files change (see backend.workspace_cache).
+
+The protocol is line based, so that it can be used from TCL scripts. A request is a
+single line, made of tab separated fields:
+
+    locate<TAB><start path><TAB><friendly name>
+    list<TAB><start path>[<TAB>all]
+    ping
+
+The response starts with a status line, either ``OK <count>`` followed by ``count``
+result lines, or ``ERR <message>``. Results of the list command are made of the library
+identifier, its friendly name, and the path of the workspace declaring it relative to the
+current workspace, separated by tabs. Several requests can be sent on the same connection.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import traceback
+
+from pathlib import Path
+from typing import List, Optional
+
+from ..errors import DaemonError
+from . import workspace
+
+
+log = logging.getLogger("backend.daemon")
+
+
+###########################################
+# Socket location
+###########################################
+
+
+def is_supported():
+    return hasattr(socketserver, "UnixStreamServer")
+
+
+def get_socket_path(root_wspace_path: Path) -> Path:
+    """Get the socket path of the daemon serving a root workspace.
+
+    The FRUNDLES_SOCKET environment variable can be used to override it.
+    """
+
+    if os.getenv("FRUNDLES_SOCKET"):
+        return Path(os.getenv("FRUNDLES_SOCKET"))
+
+    digest = hashlib.sha256(str(Path(root_wspace_path).resolve()).encode("utf-8"))
+
+    return _get_socket_dir() / f"{digest.hexdigest()[:24]}.sock"
+
+
+def _get_socket_dir() -> Path:
+    runtime_dir = Path(os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir())
+    return runtime_dir / f"frundles-{os.getuid()}"
+
+
+def _check_socket_dir(socket_dir: Path):
+    """Refuse the default socket folder if another user could have prepared it.
+
+    Without XDG_RUNTIME_DIR, the folder is created in the shared temporary directory,
+    where its name can be taken first by anyone: it must be a real directory owned by the
+    current user, and only accessible by this user.
+    """
+
+    st = os.lstat(socket_dir)
+
+    if stat.S_ISLNK(st.st_mode) or not stat.S_ISDIR(st.st_mode):
+        raise DaemonError(f"Socket folder {socket_dir} is not a directory")
+
+    if st.st_uid != os.getuid():
+        raise DaemonError(
+            f"Socket folder {socket_dir} is owned by uid {st.st_uid}, not by the current user"
+        )
+
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        raise DaemonError(
+            f"Socket folder {socket_dir} has mode {oct(stat.S_IMODE(st.st_mode))}, expected 0o700"
+        )
+
+
+###########################################
+# Requests handling
+###########################################
+
+
+def _handle_request(fields: List[str]) -> List[str]:
+    """Process a request, and return the result lines"""
+
+    command, args = fields[0], fields[1:]
+
+    if command == "ping":
+        return []
+
+    elif command == "locate" and len(args) == 2:
+        cur_wspace_path = workspace.find_current_workspace(Path(args[0]))
+        lib_path = workspace.locate(cur_wspace_path, args[1])
+
+        return [] if lib_path is None else [str(lib_path)]
+
+    elif command == "list" and len(args) in (1, 2):
+        cur_wspace_path = workspace.find_current_workspace(Path(args[0]))
+        libraries = workspace.list_libraries(
+            cur_wspace_path, transitive=(args[1:] == ["all"])
+        )
+
+        return [
+            "\t".join(
+                (
+                    lib.identifier.identifier,
+                    lib.identifier.friendly_name or "",
+                    os.path.relpath(lib.workspace, cur_wspace_path),
+                )
+            )
+            for lib in libraries
+        ]
+
+    else:
+        raise DaemonError(f"Invalid request: {' '.join(fields)}")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            if not line:
+                continue
+
+            try:
+                result = _handle_request(line.split("\t"))
+                response = [f"OK {len(result)}", *result]
+
+            except Exception as exc:
+                log.debug(traceback.format_exc())
+                response = [f"ERR {str(exc)}".replace("\n", " ")]
+
+            self.wfile.write(("\n".join(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def serve(socket_path: Path):
+    """Serve requests on the given socket path, until interrupted"""
+
+    # NOTE # Defined here, as UnixStreamServer is not available on all platforms
+    class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    socket_path = Path(socket_path)
+
+    if socket_path.parent == _get_socket_dir():
+        socket_path.parent.mkdir(mode=0o700, exist_ok=True)
+        _check_socket_dir(socket_path.parent)
+    else:
+        socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    # Remove stale socket file, if no daemon answers on it
+    if socket_path.exists():
+        if connect(socket_path) is not None:
+            raise DaemonError(f"A daemon is already listening on {socket_path}")
+
+        socket_path.unlink()
+
+    with _DaemonServer(str(socket_path), _RequestHandler) as server:
+        log.info(f"Listening on {socket_path}")
+
+        try:
+            server.serve_forever()
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+###########################################
+# Client
+###########################################
+
+
+def connect(socket_path: Path) -> Optional[socket.socket]:
+    """Connect to a daemon, returns None if no daemon is listening"""
+
+    if not Path(socket_path).exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(str(socket_path))
+        return sock
+
+    except OSError:
+        sock.close()
+        return None
+
+
+def request(sock: socket.socket, *fields: str) -> List[str]:
+    """Send a request to a daemon, and return the result lines"""
+
+    sock.sendall(("\t".join(fields) + "\n").encode("utf-8"))
+
+    with sock.makefile("r", encoding="utf-8", newline="\n") as fhandle:
+        status = fhandle.readline().rstrip("\n")
+
+        if status.startswith("OK ") and status[len("OK ") :].isdigit():
+            count = int(status[len("OK ") :])
+            return [fhandle.readline().rstrip("\n") for _ in range(count)]
+
+        elif status.startswith("ERR "):
+            raise DaemonError(status[len("ERR ") :])
+
+        else:
+            raise DaemonError(f"Invalid response from daemon: '{status}'")
+
+
+def query(root_wspace_path: Path, *fields: str) -> Optional[List[str]]:
+    """Send a single request to the daemon serving a root workspace.
+
+    Returns:
+        The result lines, or None if no daemon is running for this workspace.
+    """
+
+    if not is_supported():
+        return None
+
+    socket_path = get_socket_path(root_wspace_path)
+    socket_dir = socket_path.parent
+
+    # Don't trust a daemon listening in a folder prepared by another user
+    if (socket_dir == _get_socket_dir()) and os.path.lexists(socket_dir):
+        try:
+            _check_socket_dir(socket_dir)
+        except DaemonError as exc:
+            log.warning(f"Ignoring daemon: {exc}")
+            return None
+
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+
+    with sock:
+        return request(sock, *fields)
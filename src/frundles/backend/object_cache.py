@@ -0,0 +1,176 @@
+"""
+# Frundles machine-wide object cache
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+The object cache stores a bare mirror of each origin repository. Catalog repositories
+borrow their objects from the mirror using git alternates, so that the history of a
+given origin is only downloaded and stored once on a machine.
+
+Mirrors are shared between frundles processes, so each access is protected by a file lock.
+Each mirror is refreshed at most once per run.
+"""
+
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Tuple
+
+from ..model import OriginRewrite
+
+from . import origin_rewrite
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+
+log = logging.getLogger("backend.object_cache")
+
+_refreshed_mirrors_lock = threading.Lock()
+_refreshed_mirrors = set()
+
+
+###########################################
+# Cache directory management
+###########################################
+
+
+def is_supported():
+    """Object cache relies on file locks, which are only available on POSIX systems"""
+
+    return fcntl is not None
+
+
+def default_cache_dir() -> Path:
+    """Get the default cache directory, following the XDG base directory specification.
+
+    The FRUNDLES_CACHE_DIR environment variable can be used to override it.
+    """
+
+    if os.getenv("FRUNDLES_CACHE_DIR"):
+        return Path(os.getenv("FRUNDLES_CACHE_DIR"))
+
+    xdg_cache_home = os.getenv("XDG_CACHE_HOME") or (Path.home() / ".cache")
+    return Path(xdg_cache_home) / "frundles"
+
+
+def get_mirror_path(cache_dir: Path, origin: str) -> Path:
+    """Get the path of the mirror repository for a given origin URL"""
+
+    origin_digest = hashlib.sha256(str(origin).encode("utf-8")).hexdigest()
+    return Path(cache_dir) / "mirrors" / f"{origin_digest[:24]}.git"
+
+
+@contextmanager
+def _mirror_lock(mirror_path: Path, exclusive: bool):
+    lock_path = mirror_path.with_suffix(".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "a") as fhandle:
+        fcntl.flock(fhandle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fhandle, fcntl.LOCK_UN)
+
+
+###########################################
+# Mirror management
+###########################################
+
+
+def ensure_mirror(
+    cache_dir: Path, origin: str, rules: Tuple[OriginRewrite, ...] = tuple()
+) -> Path:
+    """Ensure the mirror for the given origin exists and is up to date.
+
+    The mirror is created if needed, and refreshed with an incremental fetch the first
+    time it is requested during the current run.
+
+    Args:
+        rules: Origin rewrite rules used to fetch, see backend.origin_rewrite
+
+    Returns:
+        Path to the mirror repository
+    """
+
+    from git import Repo
+
+    mirror_path = get_mirror_path(cache_dir, origin)
+
+    with _mirror_lock(mirror_path, exclusive=True):
+        with _refreshed_mirrors_lock:
+            if mirror_path in _refreshed_mirrors:
+                return mirror_path
+
+        if not (mirror_path / "HEAD").is_file():
+            log.info(f"Create object cache mirror for {origin} in {mirror_path}")
+
+            repo = Repo.init(mirror_path, bare=True)
+            with repo.config_writer() as config:
+                config.set_value('remote "origin"', "url", str(origin))
+                config.set_value('remote "origin"', "fetch", "+refs/*:refs/*")
+                config.set_value('remote "origin"', "mirror", "true")
+
+                # Catalog repositories depend on the mirror objects: never prune them
+                config.set_value("gc", "pruneExpire", "never")
+                config.set_value("gc", "reflogExpireUnreachable", "never")
+
+        else:
+            log.info(f"Refresh object cache mirror for {origin}")
+            repo = Repo(mirror_path)
+
+        origin_rewrite.run(
+            origin,
+            rules,
+            lambda config: (repo.git(c=config) if config else repo.git).fetch("origin"),
+        )
+
+        with _refreshed_mirrors_lock:
+            _refreshed_mirrors.add(mirror_path)
+
+    return mirror_path
+
+
+def borrow_objects(git_dir: Path, mirror_path: Path):
+    """Configure a repository to use the mirror objects through git alternates, then
+    fetch references from the mirror. No object is copied.
+
+    Args:
+        git_dir: git directory of the repository
+        mirror_path: Path to the mirror repository
+    """
+
+    alternates_path = Path(git_dir) / "objects" / "info" / "alternates"
+    mirror_objects = str((mirror_path / "objects").resolve())
+
+    existing = (
+        alternates_path.read_text().splitlines() if alternates_path.is_file() else []
+    )
+    if mirror_objects not in existing:
+        alternates_path.parent.mkdir(parents=True, exist_ok=True)
+        alternates_path.write_text("\n".join(existing + [mirror_objects]) + "\n")
+
+    with _mirror_lock(mirror_path, exclusive=False):
+        subprocess.run(
+            [
+                "git",
+                "--git-dir",
+                str(git_dir),
+                "fetch",
+                "--quiet",
+                str(mirror_path),
+                "+refs/heads/*:refs/remotes/origin/*",
+                "+refs/tags/*:refs/tags/*",
+            ],
+            capture_output=True,
+            check=True,
+        )
@@ -0,0 +1,83 @@
+"""
+# Origin rewrite rules
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Remote operations can be redirected to mirrors of the origins, for instance a server on
+the local network of a build farm. Rules match origin URLs by prefix, and give a list of
+mirror prefixes tried in order, before the origin itself.
+
+Rewrites are passed to each remote git command as url.<mirror>.insteadOf configuration
+options: repositories, lock files and library identifiers keep the original origin.
+"""
+
+import logging
+
+from typing import Callable, List, Optional, Tuple
+
+from ..model import OriginRewrite
+
+log = logging.getLogger("backend.origin_rewrite")
+
+
+def find_rule(origin: str, rules: Tuple[OriginRewrite, ...]) -> Optional[OriginRewrite]:
+    """Find the rule applying to an origin. As with git, the longest matching prefix wins,
+    and the first rule wins for a same prefix."""
+
+    matching = [rule for rule in rules if str(origin).startswith(rule.prefix)]
+    return max(matching, key=lambda rule: len(rule.prefix), default=None)
+
+
+def get_attempts(origin: str, rules: Tuple[OriginRewrite, ...]) -> List[Optional[str]]:
+    """Configuration values to pass with git -c to reach an origin through each of its
+    mirrors, in order. The last attempt, None, reaches the origin itself."""
+
+    rule = find_rule(origin, rules)
+    if rule is None:
+        return [None]
+
+    return [f"url.{mirror}.insteadOf={rule.prefix}" for mirror in rule.mirrors] + [None]
+
+
+def _warn_failed(origin: str, config: str, exc: Exception):
+    mirror = config[len("url.") : config.index(".insteadOf=")]
+
+    log.warning(f"Could not reach {origin} through mirror {mirror}, trying next")
+    log.debug(str(exc))
+
+
+def run(origin: str, rules: Tuple[OriginRewrite, ...], operation: Callable):
+    """Run a remote operation through each mirror of an origin, until one succeeds.
+
+    Args:
+        operation: Called with the git configuration value of the attempt, None for the
+                   origin itself
+
+    Returns:
+        The result of the first successful attempt
+    """
+
+    *mirror_attempts, last_attempt = get_attempts(origin, rules)
+
+    for config in mirror_attempts:
+        try:
+            return operation(config)
+        except Exception as exc:
+            _warn_failed(origin, config, exc)
+
+    return operation(last_attempt)
+
+
+async def run_async(origin: str, rules: Tuple[OriginRewrite, ...], operation: Callable):
+    """Same as run, with an operation returning a coroutine"""
+
+    *mirror_attempts, last_attempt = get_attempts(origin, rules)
+
+    for config in mirror_attempts:
+        try:
+            return await operation(config)
+        except Exception as exc:
+            _warn_failed(origin, config, exc)
+
+    return await operation(last_attempt)
@@ -0,0 +1,295 @@
+"""
+# Timing spans for backend phases
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Backend phases are wrapped in spans:
+
+    with profiling.span("fetch", lib.identifier.identifier):
+        ...
+
+When profiling is disabled, which is the default, span() returns a shared no-op context
+manager, so that hooks can stay in place at close to no cost.
+
+Spans can be nested: the self time of a span excludes the time spent in the spans opened
+inside it by the same thread or asyncio task. Spans of worker threads or concurrent tasks
+overlap the span that started them instead.
+"""
+
+import asyncio
+import threading
+import time
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROFILE_FORMATS = ("chrome", "json")
+
+
+###########################################
+# Span recording
+###########################################
+
+
+@dataclass(frozen=True)
+class SpanRecord:
+    """A timed backend phase"""
+
+    """Name of the phase"""
+    phase: str
+
+    """Item processed in the phase, usually a library identifier"""
+    item: Optional[str]
+
+    """Start time, in nanoseconds, relative to the start of the profiling session"""
+    start_ns: int
+
+    """Duration of the phase, in nanoseconds"""
+    duration_ns: int
+
+    """Duration of the phase, excluding the phases nested in it, in nanoseconds"""
+    self_ns: int
+
+    """Identifier of the thread running the phase"""
+    thread_id: int
+
+
+class Profiler:
+    def __init__(self):
+        self.origin_ns = time.perf_counter_ns()
+        self.records: List[SpanRecord] = list()
+
+    def record(
+        self,
+        phase: str,
+        item: Optional[str],
+        start_ns: int,
+        end_ns: int,
+        child_ns: int = 0,
+    ):
+        # NOTE # list.append is atomic, no lock needed when called from worker threads
+        self.records.append(
+            SpanRecord(
+                phase=phase,
+                item=item,
+                start_ns=start_ns - self.origin_ns,
+                duration_ns=end_ns - start_ns,
+                self_ns=end_ns - start_ns - child_ns,
+                thread_id=threading.get_ident(),
+            )
+        )
+
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        # No running event loop
+        return None
+
+
+class _Span:
+    __slots__ = (
+        "profiler",
+        "phase",
+        "item",
+        "start_ns",
+        "task",
+        "parent",
+        "child_ns",
+        "token",
+    )
+
+    def __init__(self, profiler: Profiler, phase: str, item: Optional[str]):
+        self.profiler = profiler
+        self.phase = phase
+        self.item = item
+
+    def __enter__(self):
+        # Context variables are inherited by asyncio tasks, but these run concurrently
+        parent = _current_span.get()
+        self.task = _current_task()
+        self.parent = (
+            parent if (parent is not None) and (parent.task is self.task) else None
+        )
+
+        self.child_ns = 0
+        self.token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        end_ns = time.perf_counter_ns()
+        _current_span.reset(self.token)
+
+        if self.parent is not None:
+            self.parent.child_ns += end_ns - self.start_ns
+
+        self.profiler.record(
+            self.phase, self.item, self.start_ns, end_ns, self.child_ns
+        )
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_profiler: Optional[Profiler] = None
+_current_span: ContextVar[Optional[_Span]] = ContextVar("span", default=None)
+
+
+def span(phase: str, item: Optional[str] = None):
+    """Time the enclosed block, if profiling is enabled"""
+
+    if _profiler is None:
+        return _NULL_SPAN
+
+    return _Span(_profiler, phase, item)
+
+
+def enable() -> Profiler:
+    """Start a profiling session"""
+
+    global _profiler
+    _profiler = Profiler()
+
+    return _profiler
+
+
+def disable():
+    """Stop the current profiling session"""
+
+    global _profiler
+    _profiler = None
+
+
+###########################################
+# Reports
+###########################################
+
+
+def summary_table(records: List[SpanRecord], slowest: int = 10) -> str:
+    """Aggregate spans by phase, and list the slowest processed items.
+
+    Phases are summed using their self time, so that nested phases are not counted twice.
+    Mean and maximum durations include nested phases.
+    """
+
+    from tabulate import tabulate
+
+    phases: Dict[str, List[SpanRecord]] = dict()
+    for record in records:
+        phases.setdefault(record.phase, list()).append(record)
+
+    phase_rows = [
+        (
+            phase,
+            len(spans),
+            sum(x.self_ns for x in spans) / 1e9,
+            sum(x.duration_ns for x in spans) / len(spans) / 1e6,
+            max(x.duration_ns for x in spans) / 1e6,
+        )
+        for phase, spans in sorted(
+            phases.items(), key=lambda x: sum(y.self_ns for y in x[1]), reverse=True
+        )
+    ]
+
+    slowest_rows = [
+        (record.phase, record.item, record.duration_ns / 1e6)
+        for record in sorted(records, key=lambda x: x.duration_ns, reverse=True)
+        if record.item is not None
+    ][:slowest]
+
+    return "\n\n".join(
+        (
+            tabulate(
+                phase_rows,
+                headers=[
+                    "Phase",
+                    "Calls",
+                    "Self total (s)",
+                    "Mean (ms)",
+                    "Max (ms)",
+                ],
+                tablefmt="github",
+                floatfmt=".3f",
+            ),
+            tabulate(
+                slowest_rows,
+                headers=["Phase", "Item", "Duration (ms)"],
+                tablefmt="github",
+                floatfmt=".3f",
+            ),
+        )
+    )
+
+
+def _to_chrome_trace(records: List[SpanRecord]):
+    """Trace event format, as loaded by chrome://tracing or Perfetto"""
+
+    thread_ids = dict()
+
+    events = list()
+    for record in records:
+        tid = thread_ids.setdefault(record.thread_id, len(thread_ids))
+
+        events.append(
+            {
+                "name": (
+                    record.phase
+                    if record.item is None
+                    else f"{record.phase} {record.item}"
+                ),
+                "cat": record.phase,
+                "ph": "X",
+                "ts": record.start_ns / 1e3,
+                "dur": record.duration_ns / 1e3,
+                "pid": 0,
+                "tid": tid,
+                "args": {"item": record.item},
+            }
+        )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _to_json(records: List[SpanRecord]):
+    thread_ids = dict()
+
+    return {
+        "spans": [
+            {
+                "phase": record.phase,
+                "item": record.item,
+                "start": record.start_ns / 1e9,
+                "duration": record.duration_ns / 1e9,
+                "self": record.self_ns / 1e9,
+                "thread": thread_ids.setdefault(record.thread_id, len(thread_ids)),
+            }
+            for record in records
+        ]
+    }
+
+
+def save(records: List[SpanRecord], path: Path, profile_format: str = "chrome"):
+    """Save spans to a file, using the chrome trace event format or plain JSON"""
+
+    import json
+
+    data = (
+        _to_chrome_trace(records) if profile_format == "chrome" else _to_json(records)
+    )
+
+    with open(path, "w") as fhandle:
+        json.dump(data, fhandle, indent=1)
@@ -0,0 +1,98 @@
+"""
+# Persistent reference resolution cache
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Resolving a branch or a tag means querying the remote repository. Resolved commits are
+saved in the user cache directory, one small file per (origin, refspec kind, value)
+triplet, so that several workspaces (or nested workspaces) depending on the same
+reference only query the remote once.
+
+Tags are assumed to never move, and are kept indefinitely. Branch entries are only used
+if they are younger than a configurable delay.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from pathlib import Path
+from typing import Optional
+
+from ..exchange.atomic_write import atomic_write
+from ..model import RefSpec
+
+log = logging.getLogger("backend.ref_cache")
+
+
+def _entry_path(cache_dir: Path, origin: str, refspec: RefSpec) -> Path:
+    key = f"{origin}\n{refspec.kind.value}\n{refspec.value}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    return Path(cache_dir) / "refs" / digest[:2] / f"{digest[2:32]}.json"
+
+
+def get(
+    cache_dir: Path, origin: str, refspec: RefSpec, max_age: Optional[float] = None
+) -> Optional[str]:
+    """Get the cached commit SHA1 of a reference.
+
+    Args:
+        max_age: Maximum age of the entry in seconds, None to accept entries of any age
+
+    Returns:
+        The commit SHA1, None if not in cache or too old
+    """
+
+    if (max_age is not None) and (max_age <= 0):
+        return None
+
+    try:
+        with open(_entry_path(cache_dir, origin, refspec), "r") as fhandle:
+            entry = json.load(fhandle)
+
+        # Protect against hash collisions
+        if (entry["origin"], entry["refspec"]) != (str(origin), str(refspec)):
+            return None
+
+        if (max_age is not None) and (time.time() - entry["resolved_at"] > max_age):
+            return None
+
+        return entry["commit"]
+
+    except FileNotFoundError:
+        return None
+
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        log.debug(
+            f"Ignoring invalid reference cache entry for {origin} {refspec}: {exc}"
+        )
+        return None
+
+
+def put(cache_dir: Path, origin: str, refspec: RefSpec, commit_sha1: str):
+    """Save the resolved commit SHA1 of a reference"""
+
+    entry_path = _entry_path(cache_dir, origin, refspec)
+
+    try:
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with atomic_write(entry_path) as fhandle:
+            json.dump(
+                {
+                    "origin": str(origin),
+                    "refspec": str(refspec),
+                    "commit": commit_sha1,
+                    "resolved_at": time.time(),
+                },
+                fhandle,
+            )
+
+    except OSError as exc:
+        # The cache is only an optimization: don't fail if it can't be written
+        log.debug(
+            f"Could not write reference cache entry for {origin} {refspec}: {exc}"
+        )
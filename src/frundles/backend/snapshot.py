@@ -0,0 +1,367 @@
+"""
+# Catalog cache keys and snapshots
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+CI systems cache folders by key. The cache key of a workspace is a digest of its locked
+dependency tree: it only changes when a locked commit, an origin or the workspace mode
+changes.
+
+A snapshot is a compressed archive of the catalog folder and external destinations of a
+workspace. Once a snapshot is restored, a sync stamp is saved if the restored folders match
+the lock files, so that the next synchronization takes the fast path instead of fetching
+libraries again.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import time
+
+from pathlib import Path
+from typing import List
+
+from ..errors import (
+    InvalidSnapshot,
+    SnapshotDestinationNotEmpty,
+    SnapshotNotSelfContained,
+    UnlockedRefSpec,
+)
+from ..exchange.atomic_write import atomic_write
+
+from . import artifact
+from . import sync_stamp
+from . import workspace
+
+log = logging.getLogger("backend.snapshot")
+
+# Description of the snapshot, stored at the root of the archive
+SNAPSHOT_INFO_NAME = ".frundles-snapshot.json"
+
+_CACHE_KEY_VERSION = 1
+_SNAPSHOT_VERSION = 1
+
+_COMPRESSIONS = {
+    ".gz": "gz",
+    ".tgz": "gz",
+    ".bz2": "bz2",
+    ".tbz2": "bz2",
+    ".xz": "xz",
+    ".txz": "xz",
+}
+
+
+def _is_relative_to(path: Path, other: Path):
+    try:
+        path.relative_to(other)
+        return True
+    except ValueError:
+        return False
+
+
+###########################################
+# Cache key
+###########################################
+
+
+def compute_cache_key(root_path: Path) -> str:
+    """Compute a digest of the locked dependency tree of a workspace.
+
+    Only the root workspace files are read, so that the key can be computed before the
+    catalog is restored: nested workspaces are part of the locked commit of their library,
+    and in aggregate mode, their libraries are locked in the root lock file.
+
+    Raises:
+        UnlockedRefSpec: A library or external of the root workspace is not locked yet
+    """
+
+    root_path = Path(root_path).resolve()
+    root_wspace, libraries, externals, locked_refspecs = workspace.load_workspace(
+        root_path
+    )
+
+    for item in (*libraries, *externals):
+        if not item.identifier.is_locked():
+            raise UnlockedRefSpec(item.identifier)
+
+    data = {
+        "version": _CACHE_KEY_VERSION,
+        "mode": root_wspace.mode.value,
+        "catalog_dir": os.path.relpath(root_path / root_wspace.catalog_dir, root_path),
+        "libraries": sorted(
+            [
+                lib.identifier.identifier,
+                str(lib.origin),
+                lib.identifier.locked_refspec.value,
+            ]
+            for lib in libraries
+        ),
+        "externals": sorted(
+            [
+                ext.identifier.identifier,
+                str(ext.origin),
+                ext.identifier.locked_refspec.value,
+                os.path.relpath(root_path / ext.dest_path, root_path),
+            ]
+            for ext in externals
+        ),
+        "locked": sorted(
+            f"{lib_id.identifier}:{refspec.value}"
+            for lib_id, refspec in (locked_refspecs or dict()).items()
+        ),
+    }
+
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+###########################################
+# Snapshot creation
+###########################################
+
+
+def _get_snapshot_folders(root_path: Path) -> List[Path]:
+    """Get the folders managed by frundles in a workspace, relative to the workspace.
+
+    In recurse mode, nested catalogs are inside the library folders of the root catalog.
+    """
+
+    root_wspace, _, externals, _ = workspace.load_workspace(root_path)
+
+    folders = list()
+    for folder in [root_wspace.catalog_dir] + [ext.dest_path for ext in externals]:
+        folder = (root_path / folder).resolve()
+
+        if not _is_relative_to(folder, root_path):
+            raise SnapshotNotSelfContained(
+                folder, f"folder is outside of workspace {root_path}"
+            )
+
+        if folder.is_dir():
+            folders.append(folder)
+
+    # Folders inside another one are already archived with it
+    return [
+        folder.relative_to(root_path)
+        for folder in folders
+        if not any((x != folder) and _is_relative_to(folder, x) for x in folders)
+    ]
+
+
+def save_snapshot(root_path: Path, archive_path: Path) -> List[Path]:
+    """Pack the catalog folder and external destinations of a workspace in an archive.
+
+    The compression is chosen from the archive extension, gzip by default.
+
+    Returns:
+        The saved folders, relative to the workspace
+
+    Raises:
+        SnapshotNotSelfContained: A repository borrows objects from outside the workspace
+    """
+
+    root_path = Path(root_path).resolve()
+    archive_path = Path(archive_path).resolve()
+
+    folders = _get_snapshot_folders(root_path)
+    if not folders:
+        raise InvalidSnapshot(
+            archive_path, "nothing to save, synchronize the workspace first"
+        )
+
+    roots = [root_path / folder for folder in folders]
+
+    try:
+        cache_key = compute_cache_key(root_path)
+    except UnlockedRefSpec:
+        cache_key = None
+
+    info = {
+        "version": _SNAPSHOT_VERSION,
+        "root": str(root_path),
+        "cache_key": cache_key,
+        "folders": [folder.as_posix() for folder in folders],
+    }
+
+    def check_member(tarinfo: tarfile.TarInfo):
+        # Objects borrowed from outside the snapshot would be missing once restored
+        if tarinfo.isfile() and tarinfo.name.endswith("objects/info/alternates"):
+            alternates_path = root_path / tarinfo.name
+            objects_dir = alternates_path.parent.parent
+
+            for line in alternates_path.read_text().splitlines():
+                if line.strip() and not line.startswith("#"):
+                    alternate = (objects_dir / line.strip()).resolve()
+
+                    if not any(_is_relative_to(alternate, x) for x in roots):
+                        raise SnapshotNotSelfContained(
+                            objects_dir.parent,
+                            f"objects are borrowed from {alternate}, synchronize the workspace without --object-cache first",
+                        )
+
+        return tarinfo
+
+    compression = _COMPRESSIONS.get(archive_path.suffix, "gz")
+    log.info(f"Save {', '.join(map(str, folders))} to {archive_path}")
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with atomic_write(archive_path, "wb") as fhandle:
+        with tarfile.open(fileobj=fhandle, mode=f"w:{compression}") as tar:
+            info_data = json.dumps(info, indent=1).encode("utf-8")
+            info_member = tarfile.TarInfo(SNAPSHOT_INFO_NAME)
+            info_member.size = len(info_data)
+            info_member.mtime = int(time.time())
+            tar.addfile(info_member, io.BytesIO(info_data))
+
+            for folder in folders:
+                tar.add(
+                    root_path / folder, arcname=folder.as_posix(), filter=check_member
+                )
+
+    return folders
+
+
+###########################################
+# Snapshot restoration
+###########################################
+
+
+def _read_info(archive_path: Path, info_path: Path):
+    try:
+        with open(info_path, "r") as fhandle:
+            info = json.load(fhandle)
+
+    except (OSError, ValueError) as exc:
+        raise InvalidSnapshot(archive_path, f"can't read snapshot description: {exc}")
+
+    if info.get("version") != _SNAPSHOT_VERSION:
+        raise InvalidSnapshot(
+            archive_path, f"unsupported snapshot version {info.get('version')}"
+        )
+
+    folders = [Path(x) for x in info.get("folders", list())]
+    if any(folder.is_absolute() or (".." in folder.parts) for folder in folders):
+        raise InvalidSnapshot(archive_path, "folders must be inside the workspace")
+
+    return info, folders
+
+
+def _repair_worktrees(root_path: Path, old_root_path: Path, worktree_dirs: List[Path]):
+    """Git worktrees and their object store refer to each other using absolute paths: make
+    them point to the new location of the workspace."""
+
+    for worktree_dir in worktree_dirs:
+        worktree_dir = root_path / worktree_dir
+        content = (worktree_dir / ".git").read_text().strip()
+
+        if not content.startswith("gitdir:"):
+            continue
+
+        old_git_dir = Path(content[len("gitdir:") :].strip())
+        if not old_git_dir.is_absolute():
+            continue
+
+        if not _is_relative_to(old_git_dir, old_root_path):
+            log.warning(f"{worktree_dir} refers to {old_git_dir}, outside of workspace")
+            continue
+
+        git_dir = root_path / old_git_dir.relative_to(old_root_path)
+
+        try:
+            artifact._link_worktree(worktree_dir, git_dir)
+        except (OSError, subprocess.CalledProcessError) as exc:
+            log.warning(f"Could not repair worktree {worktree_dir}: {exc}")
+
+
+def restore_snapshot(root_path: Path, archive_path: Path, force: bool = False) -> bool:
+    """Restore the folders saved in a snapshot archive to their place in the workspace.
+
+    Args:
+        root_path: Path of the root workspace
+        archive_path: Snapshot archive, see save_snapshot
+        force: Replace existing folders instead of raising an error
+
+    Returns:
+        True if the restored folders match the lock files, so that the next
+        synchronization takes the fast path
+
+    Raises:
+        SnapshotDestinationNotEmpty: A folder of the snapshot already exists in the workspace
+    """
+
+    root_path = Path(root_path).resolve()
+    archive_path = Path(archive_path).resolve()
+
+    log.info(f"Restore catalog snapshot {archive_path} to {root_path}")
+
+    # Extracted next to the final location, so that folders are moved instead of copied
+    with tempfile.TemporaryDirectory(
+        prefix=".frundles-snapshot-", dir=root_path
+    ) as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+
+        try:
+            with tarfile.open(archive_path, "r:*") as tar:
+                worktree_dirs = [
+                    Path(member.name).parent
+                    for member in tar.getmembers()
+                    if member.isfile() and (Path(member.name).name == ".git")
+                ]
+
+                # Extraction filters are only available in recent python versions
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(tmp_dir, filter="data")
+                else:
+                    tar.extractall(tmp_dir)
+
+        except (OSError, tarfile.TarError) as exc:
+            raise InvalidSnapshot(archive_path, str(exc))
+
+        info, folders = _read_info(archive_path, tmp_dir / SNAPSHOT_INFO_NAME)
+
+        # Check all destinations first, so that nothing is replaced on error
+        for folder in folders:
+            dest_path = root_path / folder
+
+            if not (tmp_dir / folder).is_dir():
+                raise InvalidSnapshot(archive_path, f"{folder} is missing")
+
+            if dest_path.is_dir() and any(dest_path.iterdir()) and not force:
+                raise SnapshotDestinationNotEmpty(dest_path)
+
+        for folder in folders:
+            dest_path = root_path / folder
+
+            if dest_path.is_dir() and not dest_path.is_symlink():
+                shutil.rmtree(dest_path)
+            elif dest_path.exists() or dest_path.is_symlink():
+                dest_path.unlink()
+
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_dir / folder, dest_path)
+
+    old_root_path = Path(info["root"])
+    if old_root_path != root_path:
+        _repair_worktrees(root_path, old_root_path, worktree_dirs)
+
+    try:
+        if info.get("cache_key") != compute_cache_key(root_path):
+            log.warning(
+                "Snapshot was saved for other locked commits, the next synchronization will update it"
+            )
+    except UnlockedRefSpec:
+        pass
+
+    # Confirm the restored state, as a synchronization would
+    _, _, externals, _ = workspace.load_workspace(root_path)
+    manifest = workspace.write_manifest(root_path)
+    sync_stamp.write(root_path, manifest, externals)
+
+    return sync_stamp.is_up_to_date(root_path)
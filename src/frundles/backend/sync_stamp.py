@@ -0,0 +1,198 @@
+"""
+# No-op synchronization detection
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+After a successful synchronization, a stamp is saved in the root workspace. It contains
+the hash of the frundles.yml and frundles.lock files of every workspace of the tree, and
+the commit checked out in each catalog repository, along with the options that change how
+libraries are materialized in the catalog.
+
+A later synchronization first checks the stamp: files are compared using stat calls, and
+only hashed again if their stat information changed. If nothing changed, and the
+synchronization is requested with the same materialization options, the whole
+synchronization can be skipped.
+
+Please note that uncommitted modifications in catalog repositories are not detected this
+way: the fast path skips the dirty check.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ..exchange.atomic_write import atomic_write
+from ..model import External, FetchOptions, ResolvedLibrary
+
+from . import artifact
+
+log = logging.getLogger("backend.sync_stamp")
+
+STAMP_PATH = Path(".frundles") / "sync-stamp.json"
+
+_STAMP_VERSION = 2
+_WATCHED_FILES = ("frundles.yml", "frundles.lock")
+
+
+###########################################
+# Stamp entries
+###########################################
+
+
+def _file_entry(path: Path):
+    """Stat information and content hash of a file, None if it doesn't exist"""
+
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as fhandle:
+            digest = hashlib.sha256(fhandle.read()).hexdigest()
+
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    return {"stat": [st.st_ino, st.st_size, st.st_mtime_ns], "sha256": digest}
+
+
+def _options_entry(options: Optional[FetchOptions]):
+    """Options changing the content of library folders. Other options only change how
+    objects are retrieved."""
+
+    options = options or FetchOptions()
+    return {"shallow": options.shallow, "export": options.export}
+
+
+def _is_file_unchanged(path: Path, entry) -> bool:
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return entry is None
+
+    if entry is None:
+        return False
+
+    # Cheap path: same stat information
+    if [st.st_ino, st.st_size, st.st_mtime_ns] == entry["stat"]:
+        return True
+
+    # File may have been touched or rewritten with the same content
+    with open(path, "rb") as fhandle:
+        return hashlib.sha256(fhandle.read()).hexdigest() == entry["sha256"]
+
+
+###########################################
+# Stamp management
+###########################################
+
+
+def write(
+    root_path: Path,
+    libraries: List[ResolvedLibrary],
+    externals: Sequence[External] = tuple(),
+    options: Optional[FetchOptions] = None,
+):
+    """Save the stamp after a synchronization.
+
+    The stamp is only saved if every library of the tree, and every external of the root
+    workspace, is checked out at its locked commit. Otherwise, any previous stamp is removed.
+
+    Args:
+        options: Options the synchronization was run with
+    """
+
+    root_path = Path(root_path).resolve()
+    stamp_path = root_path / STAMP_PATH
+
+    folders = {root_path: None}
+    items = [(lib.identifier, lib.path) for lib in libraries] + [
+        (ext.identifier, ext.dest_path) for ext in externals
+    ]
+
+    for item_id, item_path in items:
+        head = artifact.get_head(item_path) if item_path is not None else None
+
+        if (
+            (head is None)
+            or (not item_id.is_locked())
+            or (head != item_id.locked_refspec.value)
+        ):
+            log.info(
+                f"{item_id.identifier} is not at its locked commit, no sync stamp saved"
+            )
+            stamp_path.unlink(missing_ok=True)
+            return
+
+        folders[item_path] = head
+
+    data = {
+        "version": _STAMP_VERSION,
+        "options": _options_entry(options),
+        "folders": {
+            str(folder): {
+                "files": {name: _file_entry(folder / name) for name in _WATCHED_FILES},
+                "head": head,
+            }
+            for folder, head in folders.items()
+        },
+    }
+
+    try:
+        stamp_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with atomic_write(stamp_path) as fhandle:
+            json.dump(data, fhandle, indent=1)
+
+    except OSError as exc:
+        log.warning(f"Could not save sync stamp to {stamp_path}: {exc}")
+
+
+def is_up_to_date(root_path: Path, options: Optional[FetchOptions] = None) -> bool:
+    """Check if nothing changed since the last successful synchronization
+
+    Args:
+        options: Options of the requested synchronization
+    """
+
+    root_path = Path(root_path).resolve()
+    stamp_path = root_path / STAMP_PATH
+
+    try:
+        with open(stamp_path, "r") as fhandle:
+            data = json.load(fhandle)
+
+    except FileNotFoundError:
+        return False
+
+    except (OSError, ValueError) as exc:
+        log.warning(f"Ignoring invalid sync stamp {stamp_path}: {exc}")
+        return False
+
+    if data.get("version") != _STAMP_VERSION:
+        return False
+
+    if data.get("options") != _options_entry(options):
+        log.info("Synchronization options changed since last synchronization")
+        return False
+
+    folders = data.get("folders", dict())
+    if str(root_path) not in folders:
+        return False
+
+    for folder_s, entry in folders.items():
+        folder = Path(folder_s)
+
+        for name, file_entry in entry["files"].items():
+            if not _is_file_unchanged(folder / name, file_entry):
+                log.info(f"{folder / name} changed since last synchronization")
+                return False
+
+        head: Optional[str] = entry["head"]
+        if (head is not None) and (artifact.get_head(folder) != head):
+            log.info(f"Checked out commit changed in {folder}")
+            return False
+
+    return True
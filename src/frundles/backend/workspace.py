@@ -9,17 +9,31 @@
 import logging
 import traceback
 
+from contextlib import contextmanager
+from dataclasses import replace
 from functools import partial
-from typing import Dict, List, FrozenSet, Tuple, Optional
+from typing import Dict, List, FrozenSet, Tuple, Optional, TYPE_CHECKING
 from pathlib import Path
-from ..errors import WorkspaceNotFound, LibraryNotFound, CannotBumpFixedCommit
+from ..errors import (
+    WorkspaceNotFound,
+    LibraryNotFound,
+    CannotBumpFixedCommit,
+    ManifestSyntaxError,
+    NotAvailableOffline,
+    OfflineSyncIncomplete,
+    UnlockedRefSpec,
+)
 
-from ..exchange import workspace_file, lock_file
+from ..exchange import workspace_file, lock_file, manifest_file
 from ..model import (
+    External,
     ItemIdentifier,
     RefSpec,
     Library,
+    ResolvedLibrary,
     FetchStatus,
+    FetchOptions,
+    GitBackend,
     RefSpecKind,
     WorkspaceInfo,
     WorkspaceMode,
@@ -27,6 +41,13 @@ from ..model import (
 
 from . import catalog
 from . import artifact
+from . import workspace_cache
+from . import profiling
+from . import sync_stamp
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from . import async_git
 
 log = logging.getLogger("backend.workspace")
 
@@ -87,12 +108,30 @@ def find_root_workspace(start_path: Path):
 def load_workspace(path: Path, ignore_lockfile=False):
     """Load workspace information.
 
+    Parsed information is cached, and reused as long as the workspace files are not modified.
+
     Args:
         path: path of workspace information to load
         ignore_lockfile: ignore lockfile information if True
     """
 
     path = Path(path).resolve()
+    sig = workspace_cache.signature(path)
+
+    cached = workspace_cache.get(path, ignore_lockfile, sig)
+    if cached is not None:
+        log.debug(f"Using cached workspace information for {path}")
+        return cached
+
+    with profiling.span("load", str(path)):
+        result = _parse_workspace(path, ignore_lockfile)
+
+    workspace_cache.put(path, ignore_lockfile, sig, result)
+
+    return result
+
+
+def _parse_workspace(path: Path, ignore_lockfile: bool):
     workspace_git_origin = artifact.get_origin(path)
     ws_is_local_origin = artifact.has_local_origin(workspace_git_origin or "")
 
@@ -107,24 +146,33 @@ def load_workspace(path: Path, ignore_lockfile=False):
     # Resolve local dependencies, if needed
     def resolve_local_lib_dependency(path: Path, lib: Library):
         if artifact.has_local_origin(lib.origin):
-            if not ws_is_local_origin:
+            # Absolute paths and file:// URLs don't depend on the workspace location
+            if artifact.get_local_origin_path(lib.origin).is_absolute():
+                lib = lib.change_origin(artifact.resolve_local_origin(path, lib.origin))
+            elif not ws_is_local_origin:
                 log.warning(
                     f"Depedency to {lib.origin} for workspace located in {path} points to a local directory, but this workspace has a non-local remote URL. This may lead to some weird stuff. Assuming a path relative to the local directory"
                 )
-                lib = lib.change_origin((path / lib.origin).resolve())
+                lib = lib.change_origin(artifact.resolve_local_origin(path, lib.origin))
             else:
                 if workspace_git_origin:
                     lib = lib.change_origin(
-                        (Path(workspace_git_origin) / lib.origin).resolve()
+                        artifact.resolve_local_origin(
+                            artifact.get_local_origin_path(workspace_git_origin),
+                            lib.origin,
+                        )
                     )
                 else:
                     log.warning(
                         f"Assuming {path} start path to resolve dependency to local repository {lib.origin}"
                     )
-                    lib = lib.change_origin((path / lib.origin).resolve())
+                    lib = lib.change_origin(
+                        artifact.resolve_local_origin(path, lib.origin)
+                    )
         return lib
 
     libraries = [resolve_local_lib_dependency(path, lib) for lib in libraries]
+    externals = [resolve_local_lib_dependency(path, ext) for ext in externals]
 
     # Load locked references from lock file, if it exists
     def resolve_locked_lib(lib: Library, locked_libs: Dict[ItemIdentifier, RefSpec]):
@@ -146,11 +194,259 @@ def load_workspace(path: Path, ignore_lockfile=False):
     return wsinfo, libraries, externals, locked_libs
 
 
+def _query_commit_sha1(lib: Library, options: FetchOptions):
+    """Resolve the most recent commit for a library. Errors are returned instead of being raised,
+    so that a failing remote doesn't interrupt the other concurrent queries."""
+
+    try:
+        with profiling.span("resolve", lib.identifier.identifier):
+            return artifact.resolve_commit_sha1(lib, options)
+    except Exception as exc:
+        log.debug(traceback.format_exc())
+        return exc
+
+
+def _library_options(lib: Library, options: FetchOptions) -> FetchOptions:
+    """Get the options used to retrieve a library, with the folders to check out"""
+
+    return replace(options, sparse_paths=lib.paths) if lib.paths else options
+
+
+def _sync_library(
+    root_wspace: WorkspaceInfo,
+    wspace: WorkspaceInfo,
+    lib: Library,
+    lib_old_identifier: Optional[Library],
+    options: FetchOptions,
+):
+    """Bring the catalog folder of a locked library to its target commit.
+
+    Returns the raised exception if an error occured, None otherwise.
+    """
+
+    options = _library_options(lib, options)
+
+    try:
+        with profiling.span("status", lib.identifier.identifier):
+            lib_status = artifact.check_status(
+                root_wspace, wspace, lib.identifier, dirty_check=options.dirty_check
+            )
+
+        if lib_status == FetchStatus.NotCloned:
+            target_dir = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
+            log.info(f"Clone {lib.identifier.identifier} library to {target_dir}")
+
+            with profiling.span("clone", lib.identifier.identifier):
+                if options.export:
+                    artifact.export(
+                        target_dir, lib.origin, lib.identifier.locked_refspec, options
+                    )
+                else:
+                    artifact.clone(
+                        target_dir,
+                        lib.origin,
+                        lib.identifier.locked_refspec,
+                        options,
+                        store_dir=catalog.get_store_path(
+                            root_wspace, lib.identifier, lib.origin
+                        ),
+                    )
+
+        elif lib_status == FetchStatus.Dirty:
+            _warn_dirty(lib)
+
+        elif lib_status == FetchStatus.Invalid:
+            _warn_invalid(lib, root_wspace, wspace)
+
+        elif lib_status == FetchStatus.Modified:
+            # If target folder is not at correct commit, check if we are not bumping the reference. This can occur for instance when
+            # bumping reference in recurse mode. So check using old refspec, and if the folder is at this reference, this means we need
+            # to update to the new one.
+
+            if (
+                lib_old_identifier
+                and artifact.check_status(
+                    root_wspace,
+                    wspace,
+                    lib_old_identifier.identifier,
+                    dirty_check=options.dirty_check,
+                )
+                == FetchStatus.Ok
+            ):
+                target_dir = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
+
+                with profiling.span("update", lib.identifier.identifier):
+                    artifact.update(
+                        target_dir, lib.origin, lib.identifier.locked_refspec, options
+                    )
+
+            else:
+                _warn_modified(lib)
+
+        # NOTE # Folders left behind by bumps in aggregate mode are removed by frundles gc
+
+        return None
+
+    except Exception as exc:
+        log.debug(traceback.format_exc())
+        return exc
+
+
+async def _query_commit_sha1_async(
+    git: "async_git.AsyncGit", lib: Library, options: FetchOptions
+):
+    """Same as _query_commit_sha1, using the asyncio git backend"""
+
+    try:
+        with profiling.span("resolve", lib.identifier.identifier):
+            return await git.resolve_commit_sha1(lib, options)
+    except Exception as exc:
+        log.debug(traceback.format_exc())
+        return exc
+
+
+async def _sync_library_async(
+    git: "async_git.AsyncGit",
+    root_wspace: WorkspaceInfo,
+    wspace: WorkspaceInfo,
+    lib: Library,
+    lib_old_identifier: Optional[Library],
+    options: FetchOptions,
+):
+    """Same as _sync_library, using the asyncio git backend"""
+
+    options = _library_options(lib, options)
+
+    try:
+        with profiling.span("status", lib.identifier.identifier):
+            lib_status = await git.check_status(
+                root_wspace, wspace, lib.identifier, dirty_check=options.dirty_check
+            )
+
+        target_dir = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
+
+        if lib_status == FetchStatus.NotCloned:
+            log.info(f"Clone {lib.identifier.identifier} library to {target_dir}")
+
+            with profiling.span("clone", lib.identifier.identifier):
+                if options.export:
+                    await git.export(
+                        target_dir, lib.origin, lib.identifier.locked_refspec, options
+                    )
+                else:
+                    await git.clone(
+                        target_dir,
+                        lib.origin,
+                        lib.identifier.locked_refspec,
+                        options,
+                        store_dir=catalog.get_store_path(
+                            root_wspace, lib.identifier, lib.origin
+                        ),
+                    )
+
+        elif lib_status == FetchStatus.Dirty:
+            _warn_dirty(lib)
+
+        elif lib_status == FetchStatus.Invalid:
+            _warn_invalid(lib, root_wspace, wspace)
+
+        elif lib_status == FetchStatus.Modified:
+            # See _sync_library: update only if the folder is at the reference being bumped
+            if (
+                lib_old_identifier
+                and await git.check_status(
+                    root_wspace,
+                    wspace,
+                    lib_old_identifier.identifier,
+                    dirty_check=options.dirty_check,
+                )
+                == FetchStatus.Ok
+            ):
+                with profiling.span("update", lib.identifier.identifier):
+                    await git.update(
+                        target_dir, lib.origin, lib.identifier.locked_refspec, options
+                    )
+
+            else:
+                _warn_modified(lib)
+
+        return None
+
+    except Exception as exc:
+        log.debug(traceback.format_exc())
+        return exc
+
+
+def _warn_dirty(lib: Library):
+    log.warning(
+        f"{lib.identifier.identifier} has untracked modifications. This could break your project as it's inconsistent."
+    )
+
+
+def _warn_invalid(lib: Library, root_wspace: WorkspaceInfo, wspace: WorkspaceInfo):
+    log.error(
+        f"{catalog.get_lib_path(root_wspace, wspace, lib.identifier)} exists but is not a valid checkout of {lib.identifier.identifier}. Remove it and synchronize again to fetch the library."
+    )
+
+
+def _warn_modified(lib: Library):
+    log.warning(
+        f"{lib.identifier.identifier} isn't pointing to the target commit, meaning that is it may be modified by hand. This could break your project as it's inconsistent."
+    )
+
+
+def _with_root_mirrors(root_wspace: WorkspaceInfo, options: FetchOptions):
+    """Add the origin rewrite rules of the root workspace to the fetch options.
+
+    Rules given by the user configuration come first, so that they win for a same prefix.
+    Rules of nested workspaces are ignored: mirrors depend on where the sync runs.
+    """
+
+    if not root_wspace.mirrors:
+        return options
+
+    return replace(options, mirrors=options.mirrors + root_wspace.mirrors)
+
+
+def _record_unavailable(unavailable: Optional[List[str]], item, exc: Exception):
+    """Keep track of items missing locally in offline mode, to report them all at once"""
+
+    if (unavailable is not None) and isinstance(exc, NotAvailableOffline):
+        unavailable.append(f"{item.identifier.identifier}: {exc}")
+
+
+@contextmanager
+def _concurrency_context(jobs: int, options: FetchOptions):
+    """Open the executor or the asyncio git backend used to process libraries concurrently
+
+    Yields:
+        Keyword arguments for _fetch_artifacts
+    """
+
+    if options.git_backend == GitBackend.Asyncio:
+        from . import async_git
+
+        git = async_git.AsyncGit(
+            jobs=jobs, max_per_host=options.max_per_host, timeout=options.git_timeout
+        )
+
+        try:
+            yield {"git": git}
+        finally:
+            git.close()
+
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            yield {"executor": executor}
+
+
 def _fetch_artifacts(
     root_wspace: WorkspaceInfo,
     wspace: WorkspaceInfo,
     fetch_mode: WorkspaceMode,
-    lockfile_path: Path,
+    lockfile: lock_file.LockFileSession,
     libraries: List[Library],
     resolved_refspecs: Dict[ItemIdentifier, RefSpec] = None,
     synced_libraries: FrozenSet[ItemIdentifier] = frozenset(),
@@ -158,7 +454,27 @@ def _fetch_artifacts(
     allow_lockfile_replace: bool = False,
     bump_all: bool = False,
     bump_list: Optional[List[ItemIdentifier]] = None,
+    executor: Optional["Executor"] = None,
+    options: Optional[FetchOptions] = None,
+    git: Optional["async_git.AsyncGit"] = None,
+    unavailable: Optional[List[str]] = None,
 ):
+    """Fetch libraries of a workspace, and process nested workspaces recursively.
+
+    Libraries of a same workspace are processed level by level: remote references are resolved
+    first, then catalog folders are cloned/checked, and finally nested workspaces are processed
+    in declaration order. When an executor or the asyncio git backend is given, remote queries
+    and catalog operations of the same level run concurrently. Lock file updates and
+    duplicate/circular dependency checks always happen sequentially, in declaration order, so
+    the result is the same as a serial sync.
+
+    Args:
+        executor: Optional executor used to run independent operations concurrently
+        options: Options controlling how libraries are retrieved
+        git: Optional asyncio git backend, used instead of the executor
+        unavailable: Optional list collecting libraries missing locally in offline mode
+    """
+
     resolved_refspecs = dict(
         resolved_refspecs or dict()
     )  # Create a copy to avoid side effect if modified unintentionally
@@ -167,6 +483,40 @@ def _fetch_artifacts(
     new_resolved_refspecs = dict()
 
     bump_list = bump_list or list()
+    options = options or FetchOptions()
+
+    # Shallow mode enabled for a workspace also applies to its nested workspaces
+    if wspace.shallow and not options.shallow:
+        options = replace(options, shallow=True)
+
+    # Same for export mode
+    if wspace.export and not options.export:
+        options = replace(options, export=True)
+
+    # Repositories of the catalog can serve other libraries in offline mode
+    if wspace.catalog_dir not in options.catalog_dirs:
+        options = replace(
+            options, catalog_dirs=options.catalog_dirs + (wspace.catalog_dir,)
+        )
+
+    run_all = executor.map if executor is not None else map
+
+    def is_bump_requested(lib: Library):
+        return bump_all or (lib.identifier.unlock() in bump_list)
+
+    def is_already_synced(lib: Library, planned_libraries):
+        return (fetch_mode == WorkspaceMode.Aggregate) and (
+            (lib.identifier in synced_libraries)
+            or (lib.identifier in new_synced_libraries)
+            or (lib.identifier in planned_libraries)
+        )
+
+    ###########################################################
+    # Filter out circular and already synced dependencies
+    ###########################################################
+
+    candidates = list()
+    candidates_ids = set()
 
     for lib in libraries:
         # If a circular dependency is detected, error
@@ -180,157 +530,113 @@ def _fetch_artifacts(
             )
 
         # If library is already synced and in aggregate mode, ignore
-        elif (fetch_mode == WorkspaceMode.Aggregate) and (
-            (lib.identifier in synced_libraries)
-            or (lib.identifier in new_synced_libraries)
-        ):
+        elif is_already_synced(lib, candidates_ids):
             log.warning(f"Library {lib.identifier} is already synced, ignoring")
 
-        # Sync library
         else:
-            log.info(f"Attempt to sync library {lib.identifier.identifier}")
-
-            try:
-                ###########################################################
-                # Check most recent revision if bump requested for lib
-                ###########################################################
-
-                lib_old_identifier = (
-                    None  # Will be populated if reference will be bumped
-                )
-
-                # If bump mode activated, get most recent revision for library
-                if bump_all or lib.identifier.unlock() in bump_list:
-                    log.info(
-                        f"Bump requested for {lib.identifier.identifier}, check most recent revision"
-                    )
-                    oid = artifact._get_commit_sha1(lib)
-                    lib_old_identifier = lib
+            candidates.append(lib)
+            candidates_ids.add(lib.identifier)
+
+    ###########################################################
+    # Query remotes for bumped or not yet locked libraries
+    ###########################################################
+
+    # Each unlocked identifier is only queried once, even if it appears several times
+    query_libs = dict()
+    for lib in candidates:
+        if is_bump_requested(lib) or (
+            (not lib.identifier.is_locked())
+            and (lib.identifier not in resolved_refspecs)
+        ):
+            query_libs.setdefault(lib.identifier.unlock(), lib)
 
-                    lib = lib.lock(
-                        RefSpec(kind=RefSpecKind.Commit, value=oid)
-                    )  # Lock to new identifier
-
-                ###########################################################
-                # Ensure library refspec is locked to a specific commit
-                ###########################################################
-
-                if not lib.identifier.is_locked():
-                    if (lib.identifier in resolved_refspecs) or (
-                        lib.identifier in new_resolved_refspecs
-                    ):
-                        # Lock the reference
-                        lib = lib.lock(
-                            (resolved_refspecs | new_resolved_refspecs)[lib.identifier]
-                        )
+    if git is not None:
+        oids = git.run_all(
+            _query_commit_sha1_async(git, lib, options) for lib in query_libs.values()
+        )
+    else:
+        oids = run_all(
+            partial(_query_commit_sha1, options=options), query_libs.values()
+        )
 
-                        # Avoid circular dependencies
-                        # FIXME # Duplicated code
-                        if lib.identifier in set(fetch_stack):
-                            fetch_order = (
-                                " -> ".join(
-                                    map(lambda x: x.locked_identifier, fetch_stack)
-                                )
-                                + f" -> {lib.identifier.locked_identifier}"
-                            )
-                            log.error(
-                                f"CIRCULAR DEPENDECY DETECTED: {fetch_order}. Not processing this dependency!"
-                            )
-                            continue  # Skip this one
-
-                        # If library (with now locked reference) is already synced, ignore
-                        # FIXME # Duplicated code
-                        elif (fetch_mode == WorkspaceMode.Aggregate) and (
-                            (lib.identifier in synced_libraries)
-                            or (lib.identifier in new_synced_libraries)
-                        ):
-                            log.warning(
-                                f"Library {lib.identifier.identifier} is already synced, ignoring"
-                            )
-                            continue  # Already fetched, skip to next lib
-
-                    # Commit must be resolved
-                    # NOTE # If lib not previously in lock file but bump requested, this should not be called.
-                    else:
-                        log.warning(
-                            f"{lib.identifier.identifier} is not locked, resolve commit"
-                        )
-                        oid = artifact._get_commit_sha1(lib)
-                        lib = lib.lock(RefSpec(kind=RefSpecKind.Commit, value=oid))
+    queried_oids = dict(zip(query_libs.keys(), oids))
 
-                        log.info(
-                            f"Resolved commit to {oid}, saving to lock file {lockfile_path}"
-                        )
+    def get_queried_oid(lib: Library):
+        oid = queried_oids[lib.identifier.unlock()]
+        if isinstance(oid, Exception):
+            raise oid
 
-                        lock_file.add_to_lock_file(
-                            lockfile_path,
-                            lib.identifier,
-                            replace_existing=allow_lockfile_replace,
-                        )
+        return oid
 
-                        new_resolved_refspecs[lib.identifier.unlock()] = (
-                            lib.identifier.locked_refspec
-                        )
+    ###########################################################
+    # Lock references, in declaration order
+    ###########################################################
 
-                ###########################################################
-                # Check status for library
-                ###########################################################
+    planned = list()  # List of (lib, lib_old_identifier) tuples to sync
+    planned_ids = set()
 
-                lib_status = artifact.check_status(root_wspace, wspace, lib.identifier)
+    for lib in candidates:
+        log.info(f"Attempt to sync library {lib.identifier.identifier}")
 
-                if lib_status == FetchStatus.NotCloned:
-                    target_dir = catalog.get_lib_path(
-                        root_wspace, wspace, lib.identifier
-                    )
-                    log.info(
-                        f"Clone {lib.identifier.identifier} library to {target_dir}"
-                    )
-                    artifact.clone(
-                        target_dir, lib.origin, lib.identifier.locked_refspec
-                    )
+        try:
+            lib_old_identifier = None  # Will be populated if reference will be bumped
 
-                elif lib_status == FetchStatus.Dirty:
-                    log.warning(
-                        f"{lib.identifier.identifier} has untracked modifications. This could break your project as it's inconsistent."
+            # If bump mode activated, use most recent revision for library
+            if is_bump_requested(lib):
+                log.info(
+                    f"Bump requested for {lib.identifier.identifier}, check most recent revision"
+                )
+                oid = get_queried_oid(lib)
+                lib_old_identifier = lib
+
+                lib = lib.lock(
+                    RefSpec(kind=RefSpecKind.Commit, value=oid)
+                )  # Lock to new identifier
+
+            # Ensure library refspec is locked to a specific commit
+            if not lib.identifier.is_locked():
+                if (lib.identifier in resolved_refspecs) or (
+                    lib.identifier in new_resolved_refspecs
+                ):
+                    # Lock the reference
+                    lib = lib.lock(
+                        (resolved_refspecs | new_resolved_refspecs)[lib.identifier]
                     )
 
-                elif lib_status == FetchStatus.Modified:
-                    # If target folder is not at correct commit, check if we are not bumping the reference. This can occur for instance when
-                    # bumping reference in recurse mode. So check using old refspec, and if the folder is at this reference, this means we need
-                    # to update to the new one.
-
-                    if (
-                        lib_old_identifier
-                        and artifact.check_status(
-                            root_wspace, wspace, lib_old_identifier.identifier
+                    # Avoid circular dependencies
+                    # FIXME # Duplicated code
+                    if lib.identifier in set(fetch_stack):
+                        fetch_order = (
+                            " -> ".join(map(lambda x: x.locked_identifier, fetch_stack))
+                            + f" -> {lib.identifier.locked_identifier}"
                         )
-                        == FetchStatus.Ok
-                    ):
-                        target_dir = catalog.get_lib_path(
-                            root_wspace, wspace, lib.identifier
-                        )
-
-                        artifact.update(
-                            target_dir, lib.origin, lib.identifier.locked_refspec
+                        log.error(
+                            f"CIRCULAR DEPENDECY DETECTED: {fetch_order}. Not processing this dependency!"
                         )
+                        continue  # Skip this one
 
-                    else:
+                    # If library (with now locked reference) is already synced, ignore
+                    # FIXME # Duplicated code
+                    elif is_already_synced(lib, planned_ids):
                         log.warning(
-                            f"{lib.identifier.identifier} isn't pointing to the target commit, meaning that is it may be modified by hand. This could break your project as it's inconsistent."
+                            f"Library {lib.identifier.identifier} is already synced, ignoring"
                         )
+                        continue  # Already fetched, skip to next lib
 
-                # TODO # Ask to remove old folder if bump in aggregate mode?
+                # Commit must be resolved
+                # NOTE # If lib not previously in lock file but bump requested, this should not be called.
+                else:
+                    log.warning(
+                        f"{lib.identifier.identifier} is not locked, resolve commit"
+                    )
+                    oid = get_queried_oid(lib)
+                    lib = lib.lock(RefSpec(kind=RefSpecKind.Commit, value=oid))
 
-                ###########################################################
-                # If bump was requested, save new reference to lock file
-                ###########################################################
-                if lib_old_identifier is not None:
                     log.info(
-                        f"Save new refspec for {lib.identifier.identifier} to lockfile {lockfile_path}"
+                        f"Resolved commit to {oid}, saving to lock file {lockfile.path}"
                     )
 
-                    lock_file.add_to_lock_file(
-                        lockfile_path,
+                    lockfile.add(
                         lib.identifier,
                         replace_existing=allow_lockfile_replace,
                     )
@@ -339,53 +645,175 @@ def _fetch_artifacts(
                         lib.identifier.locked_refspec
                     )
 
-                ###########################################################
-                # Process library if it's a workspace
-                ###########################################################
+            planned.append((lib, lib_old_identifier))
+            planned_ids.add(lib.identifier)
 
-                lib_folder = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
-                if is_workspace(lib_folder):
-                    log.info(
-                        f"'{lib_folder}' contains frundles data, process it recursively"
-                    )
+        except Exception as exc:
+            log.error(
+                f"An error occured while retrieving library {lib.identifier.identifier}: {str(exc)}"
+            )
+            log.debug(traceback.format_exc())
+            _record_unavailable(unavailable, lib, exc)
 
-                    lib_wsinfo, lib_ws_libraries, lib_ws_externals, _ = load_workspace(
-                        lib_folder
-                    )
+    ###########################################################
+    # Check status, clone or update libraries
+    ###########################################################
 
-                    if root_wspace.mode == WorkspaceMode.Recurse:
-                        catalog.ensure_catalog_dir(lib_wsinfo)
-
-                    lib_new_synced_libraries, lib_new_resolved_refspecs = (
-                        _fetch_artifacts(
-                            root_wspace,
-                            lib_wsinfo,
-                            fetch_mode=fetch_mode,
-                            lockfile_path=lockfile_path,
-                            libraries=lib_ws_libraries,
-                            resolved_refspecs=resolved_refspecs | new_resolved_refspecs,
-                            synced_libraries=synced_libraries | new_synced_libraries,
-                            fetch_stack=fetch_stack + (lib.identifier,),
-                        )
-                    )
+    if git is not None:
+        sync_errors = git.run_all(
+            _sync_library_async(git, root_wspace, wspace, lib, lib_old_id, options)
+            for lib, lib_old_id in planned
+        )
+    else:
+        sync_errors = list(
+            run_all(
+                lambda x: _sync_library(root_wspace, wspace, x[0], x[1], options),
+                planned,
+            )
+        )
 
-                    new_resolved_refspecs.update(lib_new_resolved_refspecs)
-                    new_synced_libraries.update(lib_new_synced_libraries)
+    fetched = list()
+    for (lib, lib_old_identifier), exc in zip(planned, sync_errors):
+        if exc is not None:
+            log.error(
+                f"An error occured while retrieving library {lib.identifier.identifier}: {str(exc)}"
+            )
+            _record_unavailable(unavailable, lib, exc)
+        else:
+            fetched.append((lib, lib_old_identifier))
+            new_synced_libraries.add(lib.identifier)
+
+    ###########################################################
+    # Save bumped references, process nested workspaces
+    ###########################################################
+
+    for lib, lib_old_identifier in fetched:
+        try:
+            # If bump was requested, save new reference to lock file
+            if lib_old_identifier is not None:
+                log.info(
+                    f"Save new refspec for {lib.identifier.identifier} to lockfile {lockfile.path}"
+                )
 
-                # Add to synced libraries
-                new_synced_libraries.add(lib.identifier)
+                lockfile.add(
+                    lib.identifier,
+                    replace_existing=allow_lockfile_replace,
+                )
 
-            except Exception as exc:
-                log.error(
-                    f"An error occured while retrieving library {lib.identifier.identifier}: {str(exc)}"
+                new_resolved_refspecs[lib.identifier.unlock()] = (
+                    lib.identifier.locked_refspec
                 )
-                log.debug(traceback.format_exc())
+
+            # Process library if it's a workspace
+            lib_folder = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
+            if is_workspace(lib_folder):
+                log.info(
+                    f"'{lib_folder}' contains frundles data, process it recursively"
+                )
+
+                lib_wsinfo, lib_ws_libraries, lib_ws_externals, _ = load_workspace(
+                    lib_folder
+                )
+
+                if root_wspace.mode == WorkspaceMode.Recurse:
+                    catalog.ensure_catalog_dir(lib_wsinfo)
+
+                lib_new_synced_libraries, lib_new_resolved_refspecs = _fetch_artifacts(
+                    root_wspace,
+                    lib_wsinfo,
+                    fetch_mode=fetch_mode,
+                    lockfile=lockfile,
+                    libraries=lib_ws_libraries,
+                    resolved_refspecs=resolved_refspecs | new_resolved_refspecs,
+                    synced_libraries=synced_libraries | new_synced_libraries,
+                    fetch_stack=fetch_stack + (lib.identifier,),
+                    executor=executor,
+                    options=options,
+                    git=git,
+                    unavailable=unavailable,
+                )
+
+                new_resolved_refspecs.update(lib_new_resolved_refspecs)
+                new_synced_libraries.update(lib_new_synced_libraries)
+
+        except Exception as exc:
+            log.error(
+                f"An error occured while retrieving library {lib.identifier.identifier}: {str(exc)}"
+            )
+            log.debug(traceback.format_exc())
 
     return frozenset(new_synced_libraries), new_resolved_refspecs
 
 
+def _sync_externals(
+    wspace: WorkspaceInfo,
+    lockfile: lock_file.LockFileSession,
+    externals: List[External],
+    allow_lockfile_replace: bool = False,
+    bump_all: bool = False,
+    options: Optional[FetchOptions] = None,
+    unavailable: Optional[List[str]] = None,
+) -> List[External]:
+    """Lock externals of a workspace, and bring their destination folders to the locked commit.
+
+    Externals are processed sequentially, once libraries are synced. Errors are logged, and
+    don't interrupt the other externals.
+
+    Returns:
+        The list of externals, locked if their reference could be resolved
+    """
+
+    options = options or FetchOptions()
+    result = list()
+
+    if wspace.catalog_dir not in options.catalog_dirs:
+        options = replace(
+            options, catalog_dirs=options.catalog_dirs + (wspace.catalog_dir,)
+        )
+
+    for ext in externals:
+        try:
+            if bump_all or not ext.identifier.is_locked():
+                with profiling.span("resolve", ext.identifier.identifier):
+                    oid = artifact.resolve_commit_sha1(ext, options)
+
+                ext = ext.lock(RefSpec(kind=RefSpecKind.Commit, value=oid))
+
+                log.info(
+                    f"Resolved {ext.identifier.identifier} to {oid}, saving to lock file {lockfile.path}"
+                )
+                lockfile.add(ext.identifier, replace_existing=allow_lockfile_replace)
+
+            with profiling.span("external", ext.identifier.identifier):
+                artifact.sync_external(
+                    ext.dest_path,
+                    catalog.get_external_store_path(
+                        wspace, ext.identifier, ext.origin
+                    ),
+                    ext.origin,
+                    ext.identifier.locked_refspec,
+                    options,
+                )
+
+        except Exception as exc:
+            log.error(
+                f"An error occured while retrieving external {ext.identifier.identifier}: {str(exc)}"
+            )
+            log.debug(traceback.format_exc())
+            _record_unavailable(unavailable, ext, exc)
+
+        result.append(ext)
+
+    return result
+
+
 def sync_workspace(
-    path: Path, bump_all: bool = False, bump_list: Optional[List[ItemIdentifier]] = None
+    path: Path,
+    bump_all: bool = False,
+    bump_list: Optional[List[ItemIdentifier]] = None,
+    jobs: int = 1,
+    options: Optional[FetchOptions] = None,
+    force: bool = False,
 ):
     """Sync workspace. This means to fetch missing dependencies, and check status of current fetched libraries.
 
@@ -393,6 +821,9 @@ def sync_workspace(
         path: Path of workspace to synchronize
         bump_all: Bump all workspace libraries
         bump_list: Bump given item identifiers only
+        jobs: Maximum number of libraries to process concurrently
+        options: Options controlling how libraries are retrieved
+        force: Synchronize even if nothing changed since the last synchronization
     """
 
     path = Path(path).resolve()
@@ -402,9 +833,23 @@ def sync_workspace(
         len(bump_list) > 0
     )  # Enable root lockfile replace if bump mode activated
 
+    # Skip synchronization if nothing changed since the last one. Bumps need to query remotes.
+    if not (force or allow_lockfile_replace):
+        with profiling.span("stamp"):
+            up_to_date = sync_stamp.is_up_to_date(path, options)
+
+        if up_to_date:
+            log.info(
+                "Nothing changed since the last synchronization, skipping. Use --force to synchronize anyway."
+            )
+            return
+
+    options = options or FetchOptions()
+
     # Load workspace information
     root_wspace, libraries, externals, resolved_refspecs = load_workspace(path)
     resolved_refspecs = resolved_refspecs or dict()
+    options = _with_root_mirrors(root_wspace, options)
 
     log.info(
         f"Syncing workspace located at {path}, using mode '{root_wspace.mode.value}'"
@@ -415,40 +860,103 @@ def sync_workspace(
     catalog.ensure_catalog_dir(root_wspace)
 
     # Sync libraries
-    synced_libraries, resolved_refspecs = _fetch_artifacts(
-        root_wspace=root_wspace,
-        wspace=root_wspace,
-        fetch_mode=root_wspace.mode,
-        lockfile_path=path / "frundles.lock",  # FIXME # Refactor in function
-        libraries=libraries,
-        resolved_refspecs=resolved_refspecs,
+    lockfile = lock_file.LockFileSession(
+        path / "frundles.lock", resolved_refspecs
+    )  # FIXME # Refactor in function
+
+    unavailable = list()
+
+    with _concurrency_context(jobs, options) as concurrency:
+        synced_libraries, resolved_refspecs = _fetch_artifacts(
+            root_wspace=root_wspace,
+            wspace=root_wspace,
+            fetch_mode=root_wspace.mode,
+            lockfile=lockfile,
+            libraries=libraries,
+            resolved_refspecs=resolved_refspecs,
+            allow_lockfile_replace=allow_lockfile_replace,
+            bump_all=bump_all,
+            bump_list=bump_list,
+            options=options,
+            unavailable=unavailable,
+            **concurrency,
+        )
+
+    externals = _sync_externals(
+        root_wspace,
+        lockfile,
+        externals,
         allow_lockfile_replace=allow_lockfile_replace,
         bump_all=bump_all,
-        bump_list=bump_list,
+        options=options,
+        unavailable=unavailable,
     )
 
+    # Save all new locked references at once
+    with profiling.span("lockfile"):
+        lockfile.commit()
 
-def bump_workspace_library(path: Path, friendly_name: str):
+    _finish_sync(path, externals, unavailable, options)
+
+
+def _finish_sync(
+    path: Path,
+    externals: List[External],
+    unavailable: List[str],
+    options: FetchOptions,
+):
+    """Save the resolved manifest and the sync stamp.
+
+    Neither is written if items were missing in offline mode, so that the next sync
+    retries them, and that the manifest doesn't list missing libraries.
+    """
+
+    if unavailable:
+        raise OfflineSyncIncomplete(unavailable)
+
+    manifest = write_manifest(path)
+    sync_stamp.write(path, manifest, externals, options)
+
+
+def _index_by_name(libraries, with_identifiers: bool = False) -> Dict[str, object]:
+    """Index libraries by friendly name, and optionally by identifier.
+
+    The first library declaring a name wins, as with a linear search in declaration order.
+    """
+
+    index = dict()
+    for lib in libraries:
+        if with_identifiers:
+            index.setdefault(lib.identifier.identifier, lib)
+        if lib.identifier.friendly_name is not None:
+            index.setdefault(lib.identifier.friendly_name, lib)
+
+    return index
+
+
+def bump_workspace_library(
+    path: Path,
+    friendly_name: str,
+    jobs: int = 1,
+    options: Optional[FetchOptions] = None,
+):
     """Bump a specific target library
 
     Args:
         friendly_name: friendly name or identifier of library to bump
+        jobs: Maximum number of libraries to process concurrently
+        options: Options controlling how libraries are retrieved
     """
 
+    options = options or FetchOptions()
+
     # Load workspace information
     wsinfo, libraries, externals, resolved_refspecs = load_workspace(path)
+    options = _with_root_mirrors(wsinfo, options)
 
     # Identify library from config
-    try:
-        lib = next(
-            filter(
-                lambda x: (x.identifier.friendly_name == friendly_name)
-                or (x.identifier.identifier == friendly_name),
-                libraries,
-            )
-        )
-
-    except StopIteration:
+    lib = _index_by_name(libraries, with_identifiers=True).get(friendly_name)
+    if lib is None:
         raise LibraryNotFound(wspace_dir=path, friendly_name=friendly_name)
 
     # -> Command doesn't make sense for fixed commit
@@ -456,35 +964,252 @@ def bump_workspace_library(path: Path, friendly_name: str):
         raise CannotBumpFixedCommit(wspace_dir=path, lib=lib)
 
     # Ok, let's do the proper bump stuff
-    _fetch_artifacts(
-        root_wspace=wsinfo,
-        wspace=wsinfo,
-        fetch_mode=wsinfo.mode,
-        lockfile_path=path / "frundles.lock",  # FIXME # Refactor in function
-        libraries=[lib],  # Only update bumping ref
-        resolved_refspecs=resolved_refspecs,
-        allow_lockfile_replace=True,
-        bump_all=False,
-        bump_list=[lib.identifier.unlock()],  # Bump library
+    lockfile = lock_file.LockFileSession(
+        path / "frundles.lock", resolved_refspecs
+    )  # FIXME # Refactor in function
+
+    unavailable = list()
+
+    with _concurrency_context(jobs, options) as concurrency:
+        _fetch_artifacts(
+            root_wspace=wsinfo,
+            wspace=wsinfo,
+            fetch_mode=wsinfo.mode,
+            lockfile=lockfile,
+            libraries=[lib],  # Only update bumping ref
+            resolved_refspecs=resolved_refspecs,
+            allow_lockfile_replace=True,
+            bump_all=False,
+            bump_list=[lib.identifier.unlock()],  # Bump library
+            options=options,
+            unavailable=unavailable,
+            **concurrency,
+        )
+
+    # Externals are not bumped, but the stamp needs them to be synced
+    externals = _sync_externals(
+        wsinfo, lockfile, externals, options=options, unavailable=unavailable
     )
 
+    with profiling.span("lockfile"):
+        lockfile.commit()
 
-def locate(path: Path, friendly_name: str):
+    _finish_sync(path, externals, unavailable, options)
+
+
+###########################################
+# Resolved dependency manifest
+###########################################
+
+MANIFEST_PATH = Path(".frundles") / "resolved.json"
+
+
+def _chain_id(lib_id: ItemIdentifier):
+    return lib_id.locked_identifier if lib_id.is_locked() else lib_id.identifier
+
+
+def _resolve_tree(root_path: Path):
+    """Resolve the whole dependency tree from the files present on disk, without network access.
+
+    Nested workspaces are processed in the same order as sync does. In aggregate mode, a library
+    is reported for every workspace declaring it, but its nested workspace is only processed once.
+
+    Returns:
+        The signature of each folder the result depends on, and the list of resolved libraries
+    """
+
+    root_path = Path(root_path).resolve()
+
+    signatures = {root_path: workspace_cache.signature(root_path)}
+    root_wspace, root_libraries, _, root_refspecs = load_workspace(root_path)
+    root_refspecs = root_refspecs or dict()
+
+    resolved = list()
+    seen = set()
+
+    def visit(wspace_path: Path, wspace: WorkspaceInfo, libraries, parents):
+        nested = list()
+
+        for lib in libraries:
+            # Nested workspaces libraries are locked in the root lock file
+            if (not lib.identifier.is_locked()) and (lib.identifier in root_refspecs):
+                lib = lib.lock(root_refspecs[lib.identifier])
+
+            lib_chain_id = _chain_id(lib.identifier)
+            if lib_chain_id in parents:
+                continue  # Circular dependency, ignored by sync as well
+
+            try:
+                lib_path = catalog.get_lib_path(root_wspace, wspace, lib.identifier)
+            except UnlockedRefSpec:
+                lib_path = None  # Not synced yet
+
+            resolved.append(
+                ResolvedLibrary(
+                    identifier=lib.identifier,
+                    origin=lib.origin,
+                    path=lib_path,
+                    workspace=wspace_path,
+                    parents=parents,
+                )
+            )
+
+            if lib_path is not None:
+                # Also detect libraries that become workspaces, or get removed
+                signatures[lib_path] = workspace_cache.signature(lib_path)
+
+                if root_wspace.mode == WorkspaceMode.Aggregate:
+                    if lib.identifier in seen:
+                        continue
+                    seen.add(lib.identifier)
+
+                if is_workspace(lib_path):
+                    nested.append((lib_path, parents + (lib_chain_id,)))
+
+        for lib_path, lib_parents in nested:
+            lib_wsinfo, lib_ws_libraries, _, _ = load_workspace(lib_path)
+            visit(lib_path, lib_wsinfo, lib_ws_libraries, lib_parents)
+
+    visit(root_path, root_wspace, root_libraries, tuple())
+
+    return signatures, resolved
+
+
+def write_manifest(root_path: Path) -> List[ResolvedLibrary]:
+    """Save the resolved dependency tree of a workspace to its manifest file
+
+    Returns:
+        The resolved libraries
+    """
 
-    root_wspace_path = find_root_workspace(path)
+    root_path = Path(root_path).resolve()
+    manifest_path = root_path / MANIFEST_PATH
 
-    root_wspace, _, _, _ = load_workspace(root_wspace_path)
+    log.info(f"Save resolved dependency manifest to {manifest_path}")
 
-    # TODO# Maybe some optimization if root_wspace_path == path?
-    cur_wspace, libraries, externals, _ = load_workspace(path)
+    with profiling.span("manifest"):
+        signatures, libraries = _resolve_tree(root_path)
+
+        try:
+            manifest_file.to_file(manifest_path, root_path, signatures, libraries)
+
+        except OSError as exc:
+            # The manifest is only an optimization: don't fail the sync if it can't be written
+            log.warning(f"Could not save resolved manifest to {manifest_path}: {exc}")
+
+    return libraries
+
+
+def load_manifest(root_path: Path) -> Optional[List[ResolvedLibrary]]:
+    """Load the resolved dependency tree from the manifest file.
+
+    Returns None if the manifest doesn't exist, or if it is stale.
+    """
+
+    root_path = Path(root_path).resolve()
+    manifest_path = root_path / MANIFEST_PATH
 
     try:
-        lib = next(
-            filter(lambda x: x.identifier.friendly_name == friendly_name, libraries)
+        manifest_root, signatures, libraries = manifest_file.from_file(manifest_path)
+
+    except FileNotFoundError:
+        return None
+
+    except ManifestSyntaxError as exc:
+        log.warning(f"Ignoring resolved manifest: {exc}")
+        return None
+
+    if manifest_root != root_path:
+        log.info(f"Resolved manifest {manifest_path} was built for {manifest_root}")
+        return None
+
+    for sig_path, sig in signatures.items():
+        if workspace_cache.signature(sig_path) != sig:
+            log.info(f"Resolved manifest is stale, {sig_path} has been modified")
+            return None
+
+    return libraries
+
+
+def _get_resolved_subtree(path: Path, transitive: bool):
+    """Get resolved libraries of a workspace from the manifest, or by loading the whole tree.
+
+    Libraries are sorted by depth. Returns None if the workspace is not part of the dependency
+    tree of its root workspace.
+    """
+
+    path = Path(path).resolve()
+    root_wspace_path = find_root_workspace(path).resolve()
+
+    libraries = load_manifest(root_wspace_path)
+    if libraries is None:
+        log.info("No up to date resolved manifest, load the whole dependency tree")
+        _, libraries = _resolve_tree(root_wspace_path)
+
+    if path == root_wspace_path:
+        prefix = tuple()
+    else:
+        owner = next(
+            (lib for lib in libraries if (lib.path is not None) and lib.path == path),
+            None,
         )
-        lib_path = catalog.get_lib_path(root_wspace, cur_wspace, lib.identifier)
 
-        return lib_path
+        if owner is None:
+            return None
+
+        prefix = owner.parents + (_chain_id(owner.identifier),)
+
+    subtree = [
+        lib
+        for lib in libraries
+        if (lib.parents[: len(prefix)] == prefix)
+        and (transitive or (len(lib.parents) == len(prefix)))
+    ]
+
+    return sorted(subtree, key=lambda x: len(x.parents))
+
+
+def list_libraries(path: Path, transitive: bool = False) -> List[ResolvedLibrary]:
+    """List libraries of a workspace
+
+    Args:
+        path: Path of the workspace
+        transitive: Also list libraries required by nested workspaces
+    """
+
+    subtree = _get_resolved_subtree(path, transitive)
+    if subtree is not None:
+        return subtree
+
+    # Workspace is not reachable from the root workspace
+    root_wspace, _, _, _ = load_workspace(find_root_workspace(path))
+    cur_wspace, libraries, _, _ = load_workspace(path)
+
+    def get_path(lib: Library):
+        try:
+            return catalog.get_lib_path(root_wspace, cur_wspace, lib.identifier)
+        except UnlockedRefSpec:
+            return None
+
+    return [
+        ResolvedLibrary(
+            identifier=lib.identifier,
+            origin=lib.origin,
+            path=get_path(lib),
+            workspace=Path(path),
+        )
+        for lib in libraries
+    ]
+
+
+def locate(path: Path, friendly_name: str):
+    """Find where a library is stored.
+
+    Libraries declared in the current workspace are searched first, then libraries required
+    by nested workspaces, closest first.
+    """
+
+    lib = _index_by_name(list_libraries(path, transitive=True)).get(friendly_name)
 
-    except StopIteration:
-        return None  # This library doesn't exist in the workspace
+    # None if this library doesn't exist in the workspace
+    return lib.path if lib is not None else None
@@ -0,0 +1,309 @@
+"""
+# Frundles parsed workspace cache
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Loading a workspace means parsing its YAML file, its lock file and its git configuration.
+The parsed result is cached in memory and in the user cache directory, so that repeated
+calls (even from different processes) skip parsing entirely.
+
+Cache entries are invalidated using the stat information (inode, size, modification time)
+of the files the workspace information is built from.
+
+Entries of the user cache directory are stored as plain JSON data, and the model objects
+are built again when loading them: a cache entry can't run code.
+"""
+
+import hashlib
+import logging
+import json
+import os
+import threading
+import time
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ..exchange.atomic_write import atomic_write
+from ..model import (
+    ArtifactKind,
+    External,
+    ItemIdentifier,
+    Library,
+    OriginRewrite,
+    RefSpec,
+    RefSpecKind,
+    WorkspaceInfo,
+    WorkspaceMode,
+)
+
+from . import artifact
+from .object_cache import default_cache_dir
+
+
+log = logging.getLogger("backend.workspace_cache")
+
+_CACHE_VERSION = 5
+
+# Files modified less than this delay ago are not trusted, as a new modification in the
+# same timestamp granularity window would not be detected.
+_RACY_DELAY_NS = 2_000_000_000
+
+_WATCHED_FILES = ("frundles.yml", "frundles.lock", artifact.EXPORT_MARKER)
+
+_memory_cache = dict()
+_memory_cache_lock = threading.Lock()
+
+
+###########################################
+# Cache keys
+###########################################
+
+
+def _stat_signature(path: Path):
+    try:
+        st = os.stat(path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _git_signature(wspace_path: Path) -> Tuple:
+    """Signature of the files the origin of a workspace repository is read from: the .git
+    file of worktrees, and the configuration file of the repository."""
+
+    dot_git = wspace_path / ".git"
+
+    try:
+        git_dir = artifact._get_git_dir(wspace_path)
+        config_path = (
+            artifact._get_common_dir(git_dir) / "config"
+            if git_dir is not None
+            else None
+        )
+    except (OSError, ValueError):
+        return (_stat_signature(dot_git), None)
+
+    return (
+        _stat_signature(dot_git) if dot_git.is_file() else None,
+        _stat_signature(config_path) if config_path is not None else None,
+    )
+
+
+def signature(wspace_path: Path) -> Tuple:
+    """Compute the signature of the files a workspace is loaded from.
+
+    The signature shall be computed before loading the workspace, so that a modification
+    happening while loading invalidates the cache entry.
+    """
+
+    wspace_path = Path(wspace_path)
+
+    return tuple(
+        _stat_signature(wspace_path / name) for name in _WATCHED_FILES
+    ) + _git_signature(wspace_path)
+
+
+def _is_racy(sig: Tuple):
+    now_ns = time.time_ns()
+    return any(
+        (file_sig is not None) and (now_ns - file_sig[2] < _RACY_DELAY_NS)
+        for file_sig in sig
+    )
+
+
+def _entry_path(wspace_path: Path, ignore_lockfile: bool) -> Path:
+    key = f"{Path(wspace_path).resolve()}:{ignore_lockfile}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return default_cache_dir() / "workspaces" / f"{digest[:24]}.json"
+
+
+###########################################
+# Plain data encoding
+###########################################
+
+
+def _as_tuple(value):
+    """Convert back nested JSON lists to tuples"""
+
+    if isinstance(value, list):
+        return tuple(_as_tuple(x) for x in value)
+    else:
+        return value
+
+
+def _encode_refspec(refspec: Optional[RefSpec]):
+    return [refspec.kind.value, refspec.value] if refspec is not None else None
+
+
+def _decode_refspec(data) -> Optional[RefSpec]:
+    return RefSpec(kind=RefSpecKind(data[0]), value=data[1]) if data else None
+
+
+def _encode_identifier(item_id: ItemIdentifier):
+    return {
+        "kind": item_id.kind.value,
+        "name": item_id.name,
+        "refspec": _encode_refspec(item_id.refspec),
+        "locked_refspec": _encode_refspec(item_id.locked_refspec),
+        "friendly_name": item_id.friendly_name,
+    }
+
+
+def _decode_identifier(data) -> ItemIdentifier:
+    return ItemIdentifier(
+        kind=ArtifactKind(data["kind"]),
+        name=data["name"],
+        refspec=_decode_refspec(data["refspec"]),
+        locked_refspec=_decode_refspec(data["locked_refspec"]),
+        friendly_name=data["friendly_name"],
+    )
+
+
+def _encode(value: Tuple):
+    """Encode the result of workspace.load_workspace to plain data"""
+
+    wsinfo, libraries, externals, locked_libs = value
+
+    return {
+        "workspace": {
+            "catalog_dir": str(wsinfo.catalog_dir),
+            "mode": wsinfo.mode.value if wsinfo.mode is not None else None,
+            "shallow": wsinfo.shallow,
+            "export": wsinfo.export,
+            "mirrors": [[x.prefix, list(x.mirrors)] for x in wsinfo.mirrors],
+        },
+        "libraries": [
+            {
+                "identifier": _encode_identifier(lib.identifier),
+                "origin": str(lib.origin),
+                "paths": list(lib.paths),
+            }
+            for lib in libraries
+        ],
+        "externals": [
+            {
+                "identifier": _encode_identifier(ext.identifier),
+                "origin": str(ext.origin),
+                "dest_path": str(ext.dest_path),
+            }
+            for ext in externals
+        ],
+        "locked": (
+            [
+                [_encode_identifier(item_id), _encode_refspec(refspec)]
+                for item_id, refspec in locked_libs.items()
+            ]
+            if locked_libs is not None
+            else None
+        ),
+    }
+
+
+def _decode(data) -> Tuple:
+    """Build back the result of workspace.load_workspace from plain data"""
+
+    wsdata = data["workspace"]
+    wsinfo = WorkspaceInfo(
+        catalog_dir=Path(wsdata["catalog_dir"]),
+        mode=WorkspaceMode(wsdata["mode"]) if wsdata["mode"] is not None else None,
+        shallow=wsdata["shallow"],
+        export=wsdata["export"],
+        mirrors=tuple(
+            OriginRewrite(prefix=prefix, mirrors=tuple(mirrors))
+            for prefix, mirrors in wsdata["mirrors"]
+        ),
+    )
+
+    libraries = [
+        Library(
+            identifier=_decode_identifier(entry["identifier"]),
+            origin=entry["origin"],
+            paths=tuple(entry["paths"]),
+        )
+        for entry in data["libraries"]
+    ]
+
+    externals = [
+        External(
+            identifier=_decode_identifier(entry["identifier"]),
+            origin=entry["origin"],
+            dest_path=Path(entry["dest_path"]),
+        )
+        for entry in data["externals"]
+    ]
+
+    locked_libs = (
+        {
+            _decode_identifier(item_id): _decode_refspec(refspec)
+            for item_id, refspec in data["locked"]
+        }
+        if data["locked"] is not None
+        else None
+    )
+
+    return wsinfo, libraries, externals, locked_libs
+
+
+###########################################
+# Cache access
+###########################################
+
+
+def get(wspace_path: Path, ignore_lockfile: bool, sig: Tuple) -> Optional[Tuple]:
+    """Get cached workspace information, or None if not available or outdated"""
+
+    key = (str(wspace_path), ignore_lockfile)
+
+    with _memory_cache_lock:
+        entry = _memory_cache.get(key, None)
+
+    if entry is not None and entry[0] == sig:
+        return entry[1]
+
+    try:
+        with open(_entry_path(wspace_path, ignore_lockfile), "r") as fhandle:
+            data = json.load(fhandle)
+
+        if (data["version"] != _CACHE_VERSION) or (_as_tuple(data["sig"]) != sig):
+            return None
+
+        value = _decode(data["value"])
+
+    except FileNotFoundError:
+        return None
+
+    except Exception as exc:
+        # Corrupted or incompatible entry, ignore it
+        log.debug(f"Could not read workspace cache entry for {wspace_path}: {exc}")
+        return None
+
+    with _memory_cache_lock:
+        _memory_cache[key] = (sig, value)
+
+    return value
+
+
+def put(wspace_path: Path, ignore_lockfile: bool, sig: Tuple, value: Tuple):
+    """Store parsed workspace information"""
+
+    with _memory_cache_lock:
+        _memory_cache[(str(wspace_path), ignore_lockfile)] = (sig, value)
+
+    if _is_racy(sig):
+        return
+
+    entry_path = _entry_path(wspace_path, ignore_lockfile)
+
+    try:
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = {"version": _CACHE_VERSION, "sig": sig, "value": _encode(value)}
+
+        with atomic_write(entry_path) as fhandle:
+            json.dump(data, fhandle)
+
+    except OSError as exc:
+        # The cache is only an optimization: don't fail if it can't be written
+        log.debug(f"Could not write workspace cache entry for {wspace_path}: {exc}")
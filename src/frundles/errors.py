@@ -83,3 +83,83 @@ class CannotBumpFixedCommit(Exception):
         super().__init__(
             f"Library '{lib.identifier.identifier}' in workspace at {wspace_dir} cannot be bumped, as it is commit fixed"
         )
+
+
+class RefNotFound(Exception):
+    def __init__(self, origin: str, refspec):
+        super().__init__(f"Reference {refspec} not advertised by remote {origin}")
+
+
+class DaemonError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class ManifestSyntaxError(Exception):
+    def __init__(self, path: Path, error_explanation: str):
+        super().__init__(f"Invalid resolved manifest {path}: {error_explanation}")
+
+
+class GitProcessError(Exception):
+    def __init__(self, args, returncode: int, stderr: str):
+        super().__init__(
+            f"git {' '.join(map(str, args))} failed with exit code {returncode}: {stderr.strip()}"
+        )
+
+
+class GitTimeout(Exception):
+    def __init__(self, args, timeout: float):
+        super().__init__(f"git {' '.join(map(str, args))} timed out after {timeout}s")
+
+
+class ExternalDestinationNotEmpty(Exception):
+    def __init__(self, dest_path: Path):
+        super().__init__(
+            f"Destination folder {dest_path} of external is not empty, and was not created by frundles"
+        )
+
+
+class NotAvailableOffline(Exception):
+    def __init__(self, origin: str, refspec):
+        super().__init__(
+            f"{refspec} of {origin} is not available locally, and offline mode is enabled"
+        )
+
+
+class OfflineSyncIncomplete(Exception):
+    def __init__(self, missing):
+        listing = "".join(f"\n  - {item}" for item in missing)
+        super().__init__(
+            f"{len(missing)} item(s) could not be synchronized from local copies:{listing}"
+        )
+
+
+class InvalidBundle(Exception):
+    def __init__(self, path: Path, error_explanation: str):
+        super().__init__(
+            f"Invalid bundle folder or archive {path}: {error_explanation}"
+        )
+
+
+class InvalidSnapshot(Exception):
+    def __init__(self, path: Path, error_explanation: str):
+        super().__init__(f"Invalid catalog snapshot {path}: {error_explanation}")
+
+
+class SnapshotNotSelfContained(Exception):
+    def __init__(self, path: Path, error_explanation: str):
+        super().__init__(f"Can't add {path} to catalog snapshot: {error_explanation}")
+
+
+class SnapshotDestinationNotEmpty(Exception):
+    def __init__(self, dest_path: Path):
+        super().__init__(
+            f"{dest_path} already exists and is not empty, use --force to replace it with the snapshot content"
+        )
+
+
+class InvalidSparsePath(Exception):
+    def __init__(self, libname: str, path: str):
+        super().__init__(
+            f"Invalid path '{path}' for library {libname}: expected a folder relative to the repository root"
+        )
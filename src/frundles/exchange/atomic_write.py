@@ -0,0 +1,42 @@
+"""
+# Atomic file writing helper
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import os
+import tempfile
+
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w"):
+    """Open a temporary file for writing, renamed to the target path when the context exits.
+
+    This ensures that an interrupted write never leaves a partial file. If an exception
+    occurs, the temporary file is removed and the target file is left untouched.
+
+    Args:
+        path: Target file path
+        mode: Opening mode, "w" or "wb"
+    """
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(fd, mode) as fhandle:
+            yield fhandle
+
+        # Temporary files are only readable by the user: keep usual permissions
+        os.chmod(tmp_path, (path.stat().st_mode & 0o777) if path.exists() else 0o644)
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -6,11 +6,13 @@
 """
 
 import re
+
 from pathlib import Path
-from typing import Dict, FrozenSet
+from typing import Dict, FrozenSet, Optional
 
 from ..errors import LockFileSyntaxError, DuplicateLockfileIdentifier, UnlockedRefSpec
 from ..model import ItemIdentifier, RefSpec, RefSpecKind, ArtifactKind
+from .atomic_write import atomic_write
 
 _SHA1_RE = re.compile(r"^[0-9a-fA-F]{40}$")
 
@@ -98,13 +100,86 @@ def from_file(path: Path) -> Dict[ItemIdentifier, RefSpec]:
     return libs
 
 
+def _encode_entry(lib_id: ItemIdentifier) -> str:
+    return f"{lib_id.kind.value}:{lib_id.name}:{lib_id.refspec.kind.value}:{lib_id.refspec.value}:{lib_id.locked_refspec.value}"
+
+
 def to_file(path: Path, libs: FrozenSet[ItemIdentifier]):
-    with open(path, "w") as fhandle:
-        for lib_id in libs:
-            print(
-                f"{lib_id.kind.value}:{lib_id.name}:{lib_id.refspec.kind.value}:{lib_id.refspec.value}:{lib_id.locked_refspec.value}",
-                file=fhandle,
-            )
+    """Save locked references to a lock file.
+
+    Entries are sorted to get a stable output. The file is written to a temporary file first,
+    then renamed, so that an interrupted write never leaves a partial lock file.
+
+    Args:
+        path: Path to lock file
+        libs: Set of locked item identifiers
+    """
+
+    lines = sorted(_encode_entry(lib_id) for lib_id in libs)
+
+    with atomic_write(path) as fhandle:
+        for line in lines:
+            print(line, file=fhandle)
+
+
+class LockFileSession:
+    """In-memory view of a lock file.
+
+    Locked references are added in memory, and saved to the file once using the commit() method.
+    """
+
+    def __init__(
+        self, path: Path, libs: Optional[Dict[ItemIdentifier, RefSpec]] = None
+    ):
+        """Load existing lock file information, if the file exists
+
+        Args:
+            path: Path to lock file
+            libs: Already parsed lock file content, if available. Avoids to parse the file again.
+        """
+
+        self.path = Path(path)
+        self.modified = False
+
+        if libs is not None:
+            self.libs = dict(libs)
+        else:
+            try:
+                self.libs = from_file(self.path)
+            except FileNotFoundError:
+                # Default: Start from an empty file
+                self.libs = dict()
+
+    def add(self, lib_id: ItemIdentifier, replace_existing: bool = False):
+        """Add a locked reference
+
+        Args:
+            lib_id: Identifier of target library
+            replace_existing: Replace exisitng locked reference if it exists. Raise an error otherwise.
+        """
+
+        # Check if target lib_id is correctly locked
+        if not lib_id.is_locked():
+            raise UnlockedRefSpec(lib_id)
+
+        # Check if identifier already exist in file?
+        unlocked_id = lib_id.unlock()
+
+        if (unlocked_id in self.libs) and not replace_existing:
+            # Identifier already exist in file and no replacement allowed
+            raise DuplicateLockfileIdentifier(unlocked_id)
+
+        # Replace identifier with its new version, the file is only rewritten if it changed
+        if self.libs.get(unlocked_id) != lib_id.locked_refspec:
+            self.libs[unlocked_id] = lib_id.locked_refspec
+            self.modified = True
+
+    def commit(self):
+        """Save locked references to the lock file, if anything changed"""
+
+        if self.modified:
+            to_file(self.path, {k.lock(v) for k, v in self.libs.items()})
+            self.modified = False
 
 
 def add_to_lock_file(
@@ -118,29 +193,6 @@ def add_to_lock_file(
         replace_existing: Replace exisitng locked reference if it exists in file. Raise an error otherwise.
     """
 
-    # Check if target lib_id is correctly locked
-    if not lib_id.is_locked():
-        raise UnlockedRefSpec(lib_id)
-
-    # Load existing lock file information if it exists
-    try:
-        libs = from_file(path)
-    except FileNotFoundError:
-        # Default: Prepare an empty file
-        libs = dict()
-
-    # Check if identifier already exist in file?
-    unlocked_id = lib_id.unlock()
-
-    if ((unlocked_id in libs) and replace_existing) or (unlocked_id not in libs):
-        # Replace identifier with its new version
-        libs[unlocked_id] = lib_id.locked_refspec
-    else:
-        # Identifier already exist in file and no replacement allowed
-        raise DuplicateLockfileIdentifier(unlocked_id)
-
-    # Lock references
-    locked_libs = {k.lock(v) for k, v in libs.items()}
-
-    # Save to file
-    to_file(path, locked_libs)
+    session = LockFileSession(path)
+    session.add(lib_id, replace_existing=replace_existing)
+    session.commit()
@@ -0,0 +1,142 @@
+"""
+# Resolved dependencies manifest encoder/decoder
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import json
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..errors import ManifestSyntaxError
+from ..model import ItemIdentifier, RefSpec, RefSpecKind, ArtifactKind, ResolvedLibrary
+from .atomic_write import atomic_write
+
+_MANIFEST_VERSION = 1
+
+
+###########################################
+# Decode
+###########################################
+
+
+def _as_tuple(value):
+    """Convert back nested JSON lists to tuples"""
+
+    if isinstance(value, list):
+        return tuple(_as_tuple(x) for x in value)
+    else:
+        return value
+
+
+def _decode_library(entry: dict) -> ResolvedLibrary:
+    locked = entry["locked"]
+
+    lib_id = ItemIdentifier(
+        kind=ArtifactKind(entry["kind"]),
+        name=entry["name"],
+        refspec=RefSpec(
+            kind=RefSpecKind(entry["refspec_kind"]), value=entry["refspec"]
+        ),
+        locked_refspec=(
+            RefSpec(kind=RefSpecKind.Commit, value=locked) if locked else None
+        ),
+        friendly_name=entry["friendly_name"],
+    )
+
+    return ResolvedLibrary(
+        identifier=lib_id,
+        origin=entry["origin"],
+        path=Path(entry["path"]) if entry["path"] else None,
+        workspace=Path(entry["workspace"]),
+        parents=tuple(entry["parents"]),
+    )
+
+
+def from_file(path: Path) -> Tuple[Path, Dict[Path, Tuple], List[ResolvedLibrary]]:
+    """Parses a resolved manifest
+
+    Args:
+        path: Path to the manifest file
+
+    Returns:
+        The root workspace path, the signature of each file the manifest was built from,
+        and the list of resolved libraries
+    """
+
+    try:
+        with open(path, "r") as fhandle:
+            data = json.load(fhandle)
+
+    except json.JSONDecodeError as exc:
+        raise ManifestSyntaxError(path, str(exc))
+
+    if data.get("version") != _MANIFEST_VERSION:
+        raise ManifestSyntaxError(path, f"Unsupported version {data.get('version')}")
+
+    try:
+        root_path = Path(data["root"])
+        signatures = {
+            Path(wspace_path): _as_tuple(sig)
+            for wspace_path, sig in data["signatures"].items()
+        }
+        libraries = [_decode_library(entry) for entry in data["libraries"]]
+
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ManifestSyntaxError(path, f"Invalid content: {exc}")
+
+    return root_path, signatures, libraries
+
+
+###########################################
+# Encode
+###########################################
+
+
+def _encode_library(lib: ResolvedLibrary) -> dict:
+    lib_id = lib.identifier
+    locked: Optional[str] = lib_id.locked_refspec.value if lib_id.is_locked() else None
+
+    return {
+        "kind": lib_id.kind.value,
+        "name": lib_id.name,
+        "refspec_kind": lib_id.refspec.kind.value,
+        "refspec": lib_id.refspec.value,
+        "locked": locked,
+        "friendly_name": lib_id.friendly_name,
+        "origin": str(lib.origin),
+        "path": str(lib.path) if lib.path is not None else None,
+        "workspace": str(lib.workspace),
+        "parents": list(lib.parents),
+    }
+
+
+def to_file(
+    path: Path,
+    root_path: Path,
+    signatures: Dict[Path, Tuple],
+    libraries: List[ResolvedLibrary],
+):
+    """Save a resolved manifest
+
+    Args:
+        path: Path to the manifest file
+        root_path: Path of the root workspace
+        signatures: Signature of each file the manifest was built from, used to detect stale data
+        libraries: Resolved libraries of the whole dependency tree
+    """
+
+    data = {
+        "version": _MANIFEST_VERSION,
+        "root": str(root_path),
+        "signatures": {str(k): v for k, v in signatures.items()},
+        "libraries": [_encode_library(lib) for lib in libraries],
+    }
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    with atomic_write(path) as fhandle:
+        json.dump(data, fhandle, indent=2)
+        fhandle.write("\n")
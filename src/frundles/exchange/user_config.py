@@ -0,0 +1,42 @@
+"""
+# User configuration file
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Settings specific to a machine rather than to a workspace, such as origin rewrite rules,
+are read from `$XDG_CONFIG_HOME/frundles/config.yml`. The FRUNDLES_CONFIG environment
+variable can be used to give another file.
+"""
+
+import os
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ..model import OriginRewrite
+from .workspace_file import _load_yaml, parse_origin_rewrites
+
+
+def default_path() -> Path:
+    if os.getenv("FRUNDLES_CONFIG"):
+        return Path(os.getenv("FRUNDLES_CONFIG"))
+
+    xdg_config_home = os.getenv("XDG_CONFIG_HOME") or (Path.home() / ".config")
+    return Path(xdg_config_home) / "frundles" / "config.yml"
+
+
+def load_mirrors(path: Optional[Path] = None) -> Tuple[OriginRewrite, ...]:
+    """Load origin rewrite rules from the user configuration file.
+
+    Returns an empty tuple if the file doesn't exist.
+    """
+
+    try:
+        with open(path or default_path(), "r") as fhandle:
+            data = _load_yaml(fhandle) or dict()
+
+    except FileNotFoundError:
+        return tuple()
+
+    return parse_origin_rewrites(data.get("mirrors", None))
@@ -6,12 +6,11 @@
 """
 
 import re
-import yaml
 
 import urllib.parse
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 from ..model import (
     ArtifactKind,
@@ -19,11 +18,12 @@ from ..model import (
     WorkspaceMode,
     ItemIdentifier,
     Library,
+    OriginRewrite,
     RefSpec,
     RefSpecKind,
     External,
 )
-from ..errors import MultipleRefSpec, DuplicateFriendlyName
+from ..errors import MultipleRefSpec, DuplicateFriendlyName, InvalidSparsePath
 
 
 ###########################################
@@ -31,6 +31,17 @@ from ..errors import MultipleRefSpec, DuplicateFriendlyName
 ###########################################
 
 
+def _load_yaml(fhandle):
+    """Load YAML data. PyYAML is imported lazily, as cached workspace information doesn't need it."""
+
+    import yaml
+
+    # Use the libyaml based loader if available, much faster than the pure python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    return yaml.load(fhandle, Loader=loader)
+
+
 def _extract_name_from_repo_url(x: str):
     url_scheme, url_netloc, url_path, url_query, url_fragment = urllib.parse.urlsplit(x)
     last_path_token = Path(url_path).parts[-1]
@@ -71,9 +82,45 @@ def _parse_refspec(name: str, data: Dict[str, any]) -> RefSpec:
     return refspec, locked_refspec
 
 
+def _parse_paths(name: str, data: Dict[str, any]) -> Tuple[str, ...]:
+    """Parse the folders to check out for a library, given as a string or a list"""
+
+    paths = data.get("paths", None) or list()
+    if isinstance(paths, str):
+        paths = [paths]
+
+    result = list()
+    for path in paths:
+        path_s = str(path).strip("/")
+
+        if (not path_s) or (".." in PurePosixPath(path_s).parts):
+            raise InvalidSparsePath(name, str(path))
+
+        if path_s not in result:
+            result.append(path_s)
+
+    return tuple(result)
+
+
+def parse_origin_rewrites(data: Dict[str, any]) -> Tuple[OriginRewrite, ...]:
+    """Parse origin rewrite rules, given as a mapping from an origin prefix to a mirror URL
+    prefix, or to a list of mirror URL prefixes to try in order"""
+
+    return tuple(
+        OriginRewrite(
+            prefix=str(prefix),
+            mirrors=tuple(map(str, [mirrors] if isinstance(mirrors, str) else mirrors)),
+        )
+        for prefix, mirrors in (data or dict()).items()
+    )
+
+
 def parse_workspace_info(cwd: Path, data: Dict[str, any]) -> WorkspaceInfo:
     catalog_dir = Path(data["catalog_dir"])
     workspace_mode = data.get("mode", None)
+    shallow = bool(data.get("shallow", False))
+    export = bool(data.get("export", False))
+    mirrors = parse_origin_rewrites(data.get("mirrors", None))
 
     # Try to parse workspace mode if given
     if workspace_mode is not None:
@@ -83,7 +130,13 @@ def parse_workspace_info(cwd: Path, data: Dict[str, any]) -> WorkspaceInfo:
     if not catalog_dir.is_absolute():
         catalog_dir = cwd / catalog_dir
 
-    return WorkspaceInfo(catalog_dir=catalog_dir, mode=workspace_mode)
+    return WorkspaceInfo(
+        catalog_dir=catalog_dir,
+        mode=workspace_mode,
+        shallow=shallow,
+        export=export,
+        mirrors=mirrors,
+    )
 
 
 def parse_library_definition(cwd: Path, data: Dict[str, any]) -> Library:
@@ -113,7 +166,7 @@ def parse_library_definition(cwd: Path, data: Dict[str, any]) -> Library:
     lib_id = lib_id.add_friendly_name(friendly_name)
 
     # Build the final Library object
-    lib = Library(identifier=lib_id, origin=origin)
+    lib = Library(identifier=lib_id, origin=origin, paths=_parse_paths(name, data))
 
     return lib
 
@@ -128,9 +181,12 @@ def parse_external_definition(cwd, data: Dict[str, any]) -> External:
     # Parse refspecs
     refspec, locked_refspec = _parse_refspec(name, data)
 
-    # Parse destination folder
+    # Parse destination folder, relative to the workspace folder if needed
     dest_path = Path(dest_path)
 
+    if not dest_path.is_absolute():
+        dest_path = cwd / dest_path
+
     # Build the corresponding external identifier
     ext_id = ItemIdentifier(
         kind=ArtifactKind.External,
@@ -156,7 +212,7 @@ def from_file(path: Path):
 
     data = None
     with open(path, "r") as fhandle:
-        data = yaml.safe_load(fhandle)
+        data = _load_yaml(fhandle)
 
     # TODO # File schema validation
 
@@ -208,9 +264,21 @@ def encode_workspace_info(wsdir: Path, wsinfo: WorkspaceInfo):
     )
     s_mode = str(wsinfo.mode)
 
+    # Only output shallow mode if enabled
+    d_shallow = {"shallow": True} if wsinfo.shallow else dict()
+    d_export = {"export": True} if wsinfo.export else dict()
+    d_mirrors = (
+        {"mirrors": {rule.prefix: list(rule.mirrors) for rule in wsinfo.mirrors}}
+        if wsinfo.mirrors
+        else dict()
+    )
+
     return {
         "catalog_dir": s_catalog_dir,
         "mode": s_mode,
+        **d_shallow,
+        **d_export,
+        **d_mirrors,
     }
 
 
@@ -233,7 +301,10 @@ def encode_library_definition(lib: Library):
         else dict()
     )
 
-    return {"origin": s_origin, **d_friendly_name, **d_refspec}
+    # Only output paths if a sparse checkout is used
+    d_paths = {"paths": list(lib.paths)} if lib.paths else dict()
+
+    return {"origin": s_origin, **d_friendly_name, **d_refspec, **d_paths}
 
 
 def encode_external_definition(wsdir: Path, ext: External):
@@ -283,7 +354,7 @@ def to_file(
 
     # Encode list of libraries and externals
     l_libs = [encode_library_definition(lib) for lib in libraries]
-    l_exts = [encode_external_definition(ext) for ext in externals]
+    l_exts = [encode_external_definition(path.parent, ext) for ext in externals]
 
     # Generate final output dictionary
     d_output_libs = {"libraries": l_libs} if l_libs else dict()
@@ -296,5 +367,7 @@ def to_file(
     }
 
     # Save to yaml file
+    import yaml
+
     with open(path, "w") as fhandle:
         yaml.dump(d_output, fhandle)
@@ -13,6 +13,11 @@ from . import locate
 from . import list as cmd_list
 from . import bump
 from . import bump_all
+from . import serve
+from . import gc
+from . import bundle
+from . import cache_key
+from . import snapshot
 
 
 from frundles.io.available_handlers import (
@@ -28,6 +33,11 @@ CLI_COMMANDS = {
     "list": cmd_list,
     "bump": bump,
     "bump-all": bump_all,
+    "serve": serve,
+    "gc": gc,
+    "bundle": bundle,
+    "cache-key": cache_key,
+    "snapshot": snapshot,
 }
 
 
@@ -13,7 +13,7 @@ import logging
 import traceback
 import sys
 
-from ..backend import workspace
+from .fetch_args import setup_fetch_arguments, get_fetch_options, profile_session
 
 from ..io.base import OutputHandler
 
@@ -31,9 +31,12 @@ def setup_parser(parser: ArgumentParser):
         help="Just raise a warning if targetted lib is fixed at a given commit. May avoid some scripts to fail.",
         action="store_true",
     )
+    setup_fetch_arguments(subparser)
 
 
 def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace
+
     cwd = Path.cwd()
 
     # Find closest workspace
@@ -51,7 +54,13 @@ def run(output_handler: OutputHandler, args: Namespace):
     friendly_name = args.friendly_name
 
     try:
-        workspace.bump_workspace_library(root_wspace_path, friendly_name)
+        with profile_session(args):
+            workspace.bump_workspace_library(
+                root_wspace_path,
+                friendly_name,
+                jobs=args.jobs,
+                options=get_fetch_options(args),
+            )
 
     except CannotBumpFixedCommit as exc:
         if args.ignore_commits:
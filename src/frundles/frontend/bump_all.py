@@ -10,18 +10,23 @@ from argparse import ArgumentParser, Namespace
 from pathlib import Path
 
 import logging
+import sys
 
-from ..backend import workspace
+from .fetch_args import setup_fetch_arguments, get_fetch_options, profile_session
 from ..io.base import OutputHandler
+from ..errors import OfflineSyncIncomplete
 
 log = logging.getLogger("frontend.bump_all")
 
 
 def setup_parser(parser: ArgumentParser):
-    parser.add_parser("bump-all", help="Bump all libraries")
+    subparser = parser.add_parser("bump-all", help="Bump all libraries")
+    setup_fetch_arguments(subparser)
 
 
 def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace
+
     cwd = Path.cwd()
 
     # Find root workspace
@@ -29,4 +34,15 @@ def run(output_handler: OutputHandler, args: Namespace):
     log.info("Bump all dependencies for workspace located in {root_ws_path}")
 
     # Bumping all libraries is a synchronization ignoring the root lock file
-    workspace.sync_workspace(root_ws_path, bump_all=True)
+    try:
+        with profile_session(args):
+            workspace.sync_workspace(
+                root_ws_path,
+                bump_all=True,
+                jobs=args.jobs,
+                options=get_fetch_options(args),
+            )
+
+    except OfflineSyncIncomplete as exc:
+        log.critical(str(exc))
+        sys.exit(1)
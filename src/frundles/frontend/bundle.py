@@ -0,0 +1,80 @@
+"""
+# Create git bundles of the locked libraries
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import logging
+import os
+import sys
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from ..io.base import OutputHandler
+from .fetch_args import positive_int
+from .formatting import format_size
+
+log = logging.getLogger("frontend.bundle")
+
+
+def setup_parser(parser: ArgumentParser):
+    subparser = parser.add_parser(
+        "bundle", help="Create git bundles of the locked libraries, for offline syncs"
+    )
+    actions = subparser.add_subparsers(dest="bundle_action", required=True)
+
+    create = actions.add_parser(
+        "create",
+        help="Write one bundle per origin of the workspace tree, from the current lock files",
+    )
+    create.add_argument(
+        "output",
+        help="Folder to write bundles to, or archive file with --archive",
+    )
+    create.add_argument(
+        "--archive",
+        help="Pack all bundles in a single tar archive",
+        action="store_true",
+    )
+    create.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        default=4,
+        help="Maximum number of bundles to create concurrently",
+    )
+
+
+def run(output_handler: OutputHandler, args: Namespace):
+    from tabulate import tabulate
+
+    from ..backend import workspace, bundle
+
+    cwd = Path.cwd()
+
+    # Find the root workspace
+    root_ws_path = workspace.find_root_workspace(cwd)
+    log.info(f"Create bundles of the locked libraries of workspace {root_ws_path}")
+
+    entries = bundle.create_bundles(
+        root_ws_path, Path(args.output), archive=args.archive, jobs=args.jobs
+    )
+
+    rows = [
+        (
+            entry.origin,
+            len(entry.commits),
+            os.path.relpath(entry.path, cwd) if entry.path is not None else "error",
+            format_size(entry.size) if entry.path is not None else "",
+        )
+        for entry in entries
+    ]
+
+    output_handler.send_output(
+        f"\nBundles:\n\n{tabulate(rows, headers=['Origin', 'Commits', 'Bundle', 'Size'], tablefmt='github')}"
+    )
+
+    if any(entry.path is None for entry in entries):
+        sys.exit(1)
@@ -0,0 +1,40 @@
+"""
+# Print a cache key of the locked dependency tree
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import logging
+import sys
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from ..errors import UnlockedRefSpec
+from ..io.base import OutputHandler
+
+log = logging.getLogger("frontend.cache_key")
+
+
+def setup_parser(parser: ArgumentParser):
+    parser.add_parser(
+        "cache-key",
+        help="Print a digest of the locked dependency tree, to use as CI cache key",
+    )
+
+
+def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace, snapshot
+
+    # Find the root workspace
+    root_ws_path = workspace.find_root_workspace(Path.cwd())
+
+    try:
+        cache_key = snapshot.compute_cache_key(root_ws_path)
+
+    except UnlockedRefSpec as exc:
+        log.critical(f"{exc}, synchronize the workspace first")
+        sys.exit(1)
+
+    output_handler.send_output(cache_key)
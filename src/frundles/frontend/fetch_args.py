@@ -0,0 +1,227 @@
+"""
+# Common arguments for commands fetching libraries
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import logging
+import os
+
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from contextlib import contextmanager
+
+from ..model import FetchOptions, GitBackend
+
+log = logging.getLogger("frontend.fetch_args")
+
+_TRUE_VALUES = ("1", "true", "yes")
+_FALSE_VALUES = ("", "0", "false", "no")
+
+
+def _env_flag(name: str) -> bool:
+    """Read a boolean flag from the environment. Unrecognized values are ignored."""
+
+    value = os.getenv(name, "").strip().lower()
+
+    if value in _TRUE_VALUES:
+        return True
+
+    if value not in _FALSE_VALUES:
+        log.warning(
+            f"Ignoring {name}={os.getenv(name)}, expected one of: {', '.join(_TRUE_VALUES)}"
+        )
+
+    return False
+
+
+def positive_int(value: str) -> int:
+    """Argument type for counts of at least 1, such as the number of jobs"""
+
+    try:
+        count = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid integer value: {value!r}")
+
+    if count < 1:
+        raise ArgumentTypeError(f"must be at least 1, got {count}")
+
+    return count
+
+
+def non_negative_float(value: str) -> float:
+    """Argument type for durations in seconds, such as the branch references TTL"""
+
+    try:
+        duration = float(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid number: {value!r}")
+
+    if not (duration >= 0):
+        raise ArgumentTypeError(f"must be positive or zero, got {value}")
+
+    return duration
+
+
+def _git_backend(value: str) -> str:
+    """Argument type for git backends, also checking the FRUNDLES_GIT_BACKEND default"""
+
+    if value not in [x.value for x in GitBackend]:
+        raise ArgumentTypeError(
+            f"invalid choice: {value!r} (choose from {', '.join(x.value for x in GitBackend)})"
+        )
+
+    return value
+
+
+def setup_fetch_arguments(subparser: ArgumentParser):
+    subparser.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        default=1,
+        help="Maximum number of libraries to process concurrently",
+    )
+    subparser.add_argument(
+        "--object-cache",
+        help="Borrow objects from a machine-wide cache of origin repositories. Can also be enabled with FRUNDLES_OBJECT_CACHE=1",
+        action="store_true",
+        default=None,
+    )
+    subparser.add_argument(
+        "--shallow",
+        help="Only fetch the locked commit of libraries, without history",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--export",
+        help="Only extract the files of the locked commit of libraries, without git repository",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--no-dirty-check",
+        help="Don't check for uncommitted modifications in fetched libraries. Useful for CI where the catalog is never edited.",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--git-backend",
+        type=_git_backend,
+        choices=[x.value for x in GitBackend],
+        default=os.getenv("FRUNDLES_GIT_BACKEND", GitBackend.GitPython.value),
+        help="Implementation used to run git operations: GitPython in a thread pool, or git processes driven by asyncio. Can also be set with FRUNDLES_GIT_BACKEND",
+    )
+    subparser.add_argument(
+        "--max-per-host",
+        metavar="N",
+        type=positive_int,
+        default=None,
+        help="Maximum number of concurrent remote operations per host, no limit by default (asyncio backend only)",
+    )
+    subparser.add_argument(
+        "--git-timeout",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help="Abort git operations taking more than SECONDS (asyncio backend only)",
+    )
+    subparser.add_argument(
+        "--offline",
+        help="Never contact remote origins: only use the reference cache, the object cache and repositories already in the catalog. Can also be enabled with FRUNDLES_OFFLINE=1",
+        action="store_true",
+        default=None,
+    )
+    subparser.add_argument(
+        "--refresh",
+        help="Query remotes for all references, ignoring the resolved references cache",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--branch-ttl",
+        metavar="SECONDS",
+        type=non_negative_float,
+        # NOTE # String default, checked by argparse only for commands using it
+        default=os.getenv("FRUNDLES_BRANCH_TTL", "0"),
+        help="Reuse cached branch references resolved less than SECONDS ago. Tags are always cached. Can also be set with FRUNDLES_BRANCH_TTL",
+    )
+    subparser.add_argument(
+        "--profile",
+        metavar="OUTPUT",
+        nargs="?",
+        const="",
+        default=None,
+        help="Time each phase of the command and show a summary. If an output file is given, also save all timings to it.",
+    )
+    subparser.add_argument(
+        "--profile-format",
+        choices=("chrome", "json"),
+        default="chrome",
+        help="Format of the profile output file: chrome trace events (for chrome://tracing or Perfetto) or plain JSON",
+    )
+
+
+def get_fetch_options(args: Namespace) -> FetchOptions:
+    from ..backend import object_cache
+    from ..exchange import user_config
+
+    # Environment flags are read once logging is set up, to report invalid values
+    if args.object_cache is None:
+        args.object_cache = _env_flag("FRUNDLES_OBJECT_CACHE")
+
+    if args.offline is None:
+        args.offline = _env_flag("FRUNDLES_OFFLINE")
+
+    object_cache_dir = None
+
+    if args.object_cache:
+        if object_cache.is_supported():
+            object_cache_dir = object_cache.default_cache_dir()
+            log.info(f"Using object cache located in {object_cache_dir}")
+        else:
+            log.warning("Object cache is not supported on this platform, ignoring")
+
+    if args.offline:
+        # Any remote transport git would try despite the offline mode fails immediately
+        os.environ["GIT_ALLOW_PROTOCOL"] = "file"
+
+    return FetchOptions(
+        object_cache_dir=object_cache_dir,
+        shallow=args.shallow,
+        export=args.export,
+        dirty_check=not args.no_dirty_check,
+        ref_cache_dir=object_cache.default_cache_dir(),
+        branch_ttl=args.branch_ttl,
+        refresh=args.refresh,
+        git_backend=GitBackend(args.git_backend),
+        max_per_host=args.max_per_host or 0,
+        git_timeout=args.git_timeout,
+        offline=args.offline,
+        mirrors=user_config.load_mirrors(),
+    )
+
+
+@contextmanager
+def profile_session(args: Namespace):
+    """Enable timing spans while running the command, if requested"""
+
+    if args.profile is None:
+        yield
+        return
+
+    from ..backend import profiling
+
+    profiler = profiling.enable()
+
+    try:
+        with profiling.span(args.subcommand):
+            yield
+
+    finally:
+        profiling.disable()
+
+        log.info(
+            f"Time spent in each phase:\n\n{profiling.summary_table(profiler.records)}\n"
+        )
+
+        if args.profile:
+            profiling.save(profiler.records, args.profile, args.profile_format)
+            log.info(f"Saved profile to {args.profile}")
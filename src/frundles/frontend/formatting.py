@@ -0,0 +1,17 @@
+"""
+# Formatting helpers for command outputs
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+
+def format_size(size: int) -> str:
+    """Human readable size, using binary units"""
+
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} TiB"
@@ -0,0 +1,81 @@
+"""
+# Remove unreferenced catalog folders
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import logging
+import os
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from ..io.base import OutputHandler
+from .fetch_args import positive_int
+from .formatting import format_size
+
+log = logging.getLogger("frontend.gc")
+
+
+def setup_parser(parser: ArgumentParser):
+    subparser = parser.add_parser(
+        "gc",
+        help="Remove catalog folders not referenced anymore by the workspace lock files",
+    )
+    subparser.add_argument(
+        "--dry-run",
+        "-n",
+        help="Only report unreferenced folders and their size, without removing them",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--jobs",
+        "-j",
+        type=positive_int,
+        default=4,
+        help="Maximum number of folders to inspect or remove concurrently",
+    )
+
+
+def run(output_handler: OutputHandler, args: Namespace):
+    from tabulate import tabulate
+
+    from ..backend import workspace, catalog_gc
+
+    cwd = Path.cwd()
+
+    # Find the root workspace
+    root_ws_path = workspace.find_root_workspace(cwd)
+    log.info(f"Collect unreferenced catalog folders for workspace {root_ws_path}")
+
+    entries = catalog_gc.collect_garbage(
+        root_ws_path, jobs=args.jobs, dry_run=args.dry_run
+    )
+
+    def get_status(entry):
+        if entry.dirty:
+            return "kept, may be modified"
+        elif entry.removed:
+            return "removed"
+        elif args.dry_run:
+            return "unreferenced"
+        else:
+            return "error"
+
+    rows = [
+        (os.path.relpath(entry.path, cwd), format_size(entry.size), get_status(entry))
+        for entry in entries
+    ]
+
+    reclaimable = sum(entry.size for entry in entries if not entry.dirty)
+    reclaimed = sum(entry.size for entry in entries if entry.removed)
+
+    if args.dry_run:
+        summary = f"{format_size(reclaimable)} can be reclaimed"
+    else:
+        summary = f"{format_size(reclaimed)} reclaimed"
+
+    output_handler.send_output(
+        f"\nUnreferenced catalog folders:\n\n{tabulate(rows, headers=['Folder', 'Size', 'Status'], tablefmt='github')}\n\n{summary}"
+    )
@@ -5,37 +5,69 @@
 - August 2024
 """
 
-from tabulate import tabulate
+import logging
+import os
+
 from argparse import ArgumentParser, Namespace
-from ..backend import workspace
 from pathlib import Path
 
+from ..errors import DaemonError
 from ..io.base import OutputHandler
 
+log = logging.getLogger("frontend.list")
+
 
 def setup_parser(parser: ArgumentParser):
-    subparser = parser.add_parser(  # noqa: F841
+    subparser = parser.add_parser(
         "list", help="List available libraries in the current workspace"
     )
+    subparser.add_argument(
+        "--all",
+        help="Also list libraries required by nested workspaces",
+        action="store_true",
+    )
 
 
 def run(output_handler: OutputHandler, args: Namespace):
+    from tabulate import tabulate
+
+    from ..backend import workspace, daemon
+
     cwd = Path.cwd()
 
     # Find the current workspace
     cur_wspace_path = workspace.find_current_workspace(cwd)
 
-    # Load information
-    wsinfo, libraries, externals, resolved_refspecs = workspace.load_workspace(
-        cur_wspace_path
-    )
+    # Ask the daemon if one is running for the workspace, or load information ourselves
+    query_args = ("list", str(cwd), "all") if args.all else ("list", str(cwd))
+    try:
+        result = daemon.query(workspace.find_root_workspace(cwd), *query_args)
+    except (DaemonError, OSError) as exc:
+        log.warning(f"Daemon request failed, listing libraries without it: {exc}")
+        result = None
+
+    if result is not None:
+        rows = [tuple(line.split("\t")) for line in result]
+
+    else:
+        libraries = workspace.list_libraries(cur_wspace_path, transitive=args.all)
+
+        rows = [
+            (
+                lib.identifier.identifier,
+                lib.identifier.friendly_name or "",
+                os.path.relpath(lib.workspace, cur_wspace_path),
+            )
+            for lib in libraries
+        ]
 
     # Display information
     headers = ["Reference", "Friendly name"]
 
-    rows = [
-        (lib.identifier.identifier, lib.identifier.friendly_name) for lib in libraries
-    ]
+    if args.all:
+        headers.append("Declared in")
+    else:
+        rows = [row[:2] for row in rows]
 
     result = f"\nAvailable libraries:\n\n{tabulate(rows, headers=headers, tablefmt='github')}"
 
@@ -12,7 +12,7 @@ from pathlib import Path
 import logging
 import sys
 
-from ..backend import workspace
+from ..errors import DaemonError
 from ..io.base import OutputHandler
 
 log = logging.getLogger("frontend.locate")
@@ -26,6 +26,8 @@ def setup_parser(parser: ArgumentParser):
 
 
 def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace, daemon
+
     cwd = Path.cwd()
 
     # Find the closest workspace
@@ -34,12 +36,23 @@ def run(output_handler: OutputHandler, args: Namespace):
     # Get the friendly name
     friendly_name = args.friendly_name
 
-    # Find that damn library
-    lib_path = workspace.locate(cur_wspace_path, friendly_name)
+    # Ask the daemon if one is running for the workspace, or find that damn library ourselves
+    try:
+        result = daemon.query(
+            workspace.find_root_workspace(cwd), "locate", str(cwd), friendly_name
+        )
+    except (DaemonError, OSError) as exc:
+        log.warning(f"Daemon request failed, locating library without it: {exc}")
+        result = None
+
+    if result is not None:
+        lib_path = result[0] if result else None
+    else:
+        lib_path = workspace.locate(cur_wspace_path, friendly_name)
 
     if lib_path is None:
         log.error(f"Could not found library path with name '{friendly_name}'")
         sys.exit(1)
 
     # print(lib_path)
-    output_handler.send_output(lib_path)
+    output_handler.send_output(str(lib_path))
@@ -0,0 +1,68 @@
+"""
+# Serve locate/list requests from a long-lived process
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+import logging
+import signal
+import sys
+
+from ..io.base import OutputHandler
+from ..errors import DaemonError
+
+log = logging.getLogger("frontend.serve")
+
+
+def setup_parser(parser: ArgumentParser):
+    subparser = parser.add_parser(
+        "serve",
+        help="Answer locate and list requests for the root workspace over a Unix socket",
+    )
+    subparser.add_argument(
+        "--socket",
+        help="Path of the socket to listen on. Defaults to a per workspace path, also used by the locate and list commands",
+        default=None,
+    )
+    subparser.add_argument(
+        "--print-socket",
+        help="Only print the socket path for the current workspace, and exit",
+        action="store_true",
+    )
+
+
+def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace, daemon
+
+    if not daemon.is_supported():
+        log.error("Unix sockets are not supported on this platform")
+        sys.exit(1)
+
+    cwd = Path.cwd()
+
+    # Find the root workspace
+    root_ws_path = workspace.find_root_workspace(cwd)
+    socket_path = Path(args.socket or daemon.get_socket_path(root_ws_path))
+
+    if args.print_socket:
+        output_handler.send_output(str(socket_path))
+        return
+
+    log.info(f"Serve requests for workspace located in {root_ws_path}")
+
+    # Stop cleanly (removing the socket file) when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        daemon.serve(socket_path)
+
+    except KeyboardInterrupt:
+        log.info("Interrupted, stopping")
+
+    except DaemonError as exc:
+        log.error(str(exc))
+        sys.exit(1)
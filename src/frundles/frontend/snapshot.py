@@ -0,0 +1,77 @@
+"""
+# Save and restore catalog snapshots
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import logging
+import sys
+
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from ..errors import (
+    InvalidSnapshot,
+    SnapshotDestinationNotEmpty,
+    SnapshotNotSelfContained,
+)
+from ..io.base import OutputHandler
+
+log = logging.getLogger("frontend.snapshot")
+
+
+def setup_parser(parser: ArgumentParser):
+    subparser = parser.add_parser(
+        "snapshot",
+        help="Save the catalog folders to an archive, or restore them, to cache them in CI",
+    )
+    actions = subparser.add_subparsers(dest="snapshot_action", required=True)
+
+    save = actions.add_parser(
+        "save", help="Pack the catalog folder and external destinations in an archive"
+    )
+    save.add_argument(
+        "archive",
+        help="Archive file to write, compressed according to its extension (.tar.gz, .tar.xz, .tar.bz2)",
+    )
+
+    restore = actions.add_parser(
+        "restore", help="Restore the folders saved in an archive to the workspace"
+    )
+    restore.add_argument("archive", help="Archive file created by snapshot save")
+    restore.add_argument(
+        "--force",
+        help="Replace existing folders with the snapshot content",
+        action="store_true",
+    )
+
+
+def run(output_handler: OutputHandler, args: Namespace):
+    from ..backend import workspace, snapshot
+
+    # Find the root workspace
+    root_ws_path = workspace.find_root_workspace(Path.cwd())
+
+    try:
+        if args.snapshot_action == "save":
+            folders = snapshot.save_snapshot(root_ws_path, Path(args.archive))
+            log.info(f"Saved {', '.join(map(str, folders))} to snapshot {args.archive}")
+
+        elif snapshot.restore_snapshot(
+            root_ws_path, Path(args.archive), force=args.force
+        ):
+            log.info("Snapshot restored, the workspace is synchronized")
+
+        else:
+            log.warning(
+                "Snapshot restored, but it doesn't match the lock files: run frundles sync to update it"
+            )
+
+    except (
+        InvalidSnapshot,
+        SnapshotDestinationNotEmpty,
+        SnapshotNotSelfContained,
+    ) as exc:
+        log.critical(str(exc))
+        sys.exit(1)
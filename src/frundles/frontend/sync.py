@@ -6,26 +6,61 @@
 """
 
 import logging
+import sys
 import argparse
 
-from ..backend import workspace
+from dataclasses import replace
+
+from .fetch_args import setup_fetch_arguments, get_fetch_options, profile_session
 from pathlib import Path
 
 from ..io.base import OutputHandler
+from ..errors import InvalidBundle, OfflineSyncIncomplete
 
 log = logging.getLogger("frontend.sync")
 
 
 def setup_parser(parser: argparse.ArgumentParser):
-    subparser = parser.add_parser("sync", help="Synchronize dependencies")  # noqa: F841
+    subparser = parser.add_parser("sync", help="Synchronize dependencies")
+    subparser.add_argument(
+        "--force",
+        help="Synchronize even if nothing changed since the last synchronization",
+        action="store_true",
+    )
+    subparser.add_argument(
+        "--from-bundle",
+        metavar="PATH",
+        default=None,
+        help="Get libraries from the bundles created by frundles bundle create (folder or archive), without network access",
+    )
+    setup_fetch_arguments(subparser)
 
 
 def run(output_handler: OutputHandler, args: argparse.Namespace):
+    from ..backend import workspace, bundle
+
     cwd = Path.cwd()
 
     # Find the root workspace
     root_ws_path = workspace.find_root_workspace(cwd)
     log.info(f"Synchronize workspace located in {root_ws_path}")
 
+    # Bundles replace the origins
+    if args.from_bundle is not None:
+        args.offline = True
+
+    options = get_fetch_options(args)
+
     # Do the proper synchronization
-    workspace.sync_workspace(root_ws_path)
+    try:
+        with profile_session(args), bundle.open_bundles(args.from_bundle) as bundle_dir:
+            workspace.sync_workspace(
+                root_ws_path,
+                jobs=args.jobs,
+                options=replace(options, bundle_dir=bundle_dir),
+                force=args.force,
+            )
+
+    except (InvalidBundle, OfflineSyncIncomplete) as exc:
+        log.critical(str(exc))
+        sys.exit(1)
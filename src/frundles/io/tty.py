@@ -5,7 +5,6 @@
 - September 2024
 """
 
-import coloredlogs
 import logging
 import os
 
@@ -24,6 +23,9 @@ class TTYOutputHandler(OutputHandler):
         pass
 
     def configure(self):
+        # Imported here, as it is quite long to load and only needed for TTY output
+        import coloredlogs
+
         debug_enabled = bool(os.getenv("FRUNDLES_DEBUG", 0))
         coloredlogs.install(level=logging.DEBUG if debug_enabled else logging.INFO)
 
@@ -5,13 +5,19 @@
 - August 2024
 """
 
-from dataclasses import dataclass
+import sys
+
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 from pathlib import Path
 
 from ..errors import UnlockedRefSpec
 
+# Model objects are created by the thousands when resolving large trees: use slots when
+# dataclasses support them
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else dict()
+
 
 ###########################################
 # Ref spec classes
@@ -33,7 +39,7 @@ class RefSpecKind(Enum):
     Tag = "tag"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class RefSpec:
     """
     An indication of a target git library revision
@@ -46,11 +52,26 @@ class RefSpec:
 
     value: str
 
+    """Interned string representation, computed once at construction"""
+    _str: str = field(init=False, repr=False, compare=False)
+
+    """Hash of the string representation"""
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        text = sys.intern(f"{self.kind.value}:{self.value}")
+        object.__setattr__(self, "_str", text)
+        object.__setattr__(self, "_hash", hash(text))
+
+    def __reduce__(self):
+        # String hashes change between processes: recompute them when unpickling
+        return (RefSpec, (self.kind, self.value))
+
     def __hash__(self):
-        return hash(f"{self.kind.value}:{self.value}")
+        return self._hash
 
     def __str__(self):
-        return f"{self.kind.value}:{self.value}"
+        return self._str
 
 
 ###########################################
@@ -89,7 +110,7 @@ class ArtifactKind(Enum):
 ###########################################
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ItemIdentifier:
     """
     Library identification information
@@ -110,15 +131,58 @@ class ItemIdentifier:
     """Optional friendly name"""
     friendly_name: Optional[str] = None
 
+    """Interned identifier strings, computed once at construction"""
+    _identifier: str = field(init=False, repr=False, compare=False)
+    _locked_identifier: Optional[str] = field(init=False, repr=False, compare=False)
+
+    """Hash of the locked identifier if locked, of the identifier otherwise"""
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        prefix = f"{self.kind.value}:{self.name}:"
+        identifier = sys.intern(prefix + self.refspec.value)
+        locked_identifier = (
+            sys.intern(prefix + self.locked_refspec.value)
+            if self.locked_refspec is not None
+            else None
+        )
+
+        object.__setattr__(self, "_identifier", identifier)
+        object.__setattr__(self, "_locked_identifier", locked_identifier)
+        object.__setattr__(self, "_hash", hash(self._key))
+
+    def __reduce__(self):
+        # String hashes change between processes: recompute them when unpickling
+        return (
+            ItemIdentifier,
+            (
+                self.kind,
+                self.name,
+                self.refspec,
+                self.locked_refspec,
+                self.friendly_name,
+            ),
+        )
+
+    @property
+    def _key(self):
+        """Identifier used for comparisons: the locked one if available"""
+        return (
+            self._locked_identifier
+            if self._locked_identifier is not None
+            else self._identifier
+        )
+
     def __eq__(self, other: "ItemIdentifier"):
-        id_self = self.locked_identifier if self.is_locked() else self.identifier
-        id_other = other.locked_identifier if other.is_locked() else other.identifier
+        if not isinstance(other, ItemIdentifier):
+            return NotImplemented
 
-        return id_self == id_other
+        # Interned strings are usually the same object
+        return self._key is other._key or self._key == other._key
 
     @property
     def identifier(self):
-        return f"{self.kind.value}:{self.name}:{self.refspec.value}"
+        return self._identifier
 
     @property
     def identifier_path(self):
@@ -128,10 +192,10 @@ class ItemIdentifier:
     def locked_identifier(self):
         """Returns an identifier string that shall be unique to a given library"""
 
-        if self.locked_refspec is None:
+        if self._locked_identifier is None:
             raise UnlockedRefSpec(self)
 
-        return f"{self.kind.value}:{self.name}:{self.locked_refspec.value}"
+        return self._locked_identifier
 
     @property
     def locked_identifier_path(self):
@@ -183,13 +247,10 @@ class ItemIdentifier:
         return self.locked_refspec is not None
 
     def __hash__(self):
-        if self.locked_refspec:
-            return self.locked_identifier.__hash__()
-        else:
-            return self.identifier.__hash__()
+        return self._hash
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Library:
     """Contains detailled information about a specific library"""
 
@@ -199,17 +260,25 @@ class Library:
     """Git origin URL"""
     origin: str
 
+    """Folders to check out, using a sparse checkout of a blobless partial clone. The
+    whole tree is checked out if empty"""
+    paths: Tuple[str, ...] = tuple()
+
     def lock(self, refspec: RefSpec):
-        return Library(identifier=self.identifier.lock(refspec), origin=self.origin)
+        return Library(
+            identifier=self.identifier.lock(refspec),
+            origin=self.origin,
+            paths=self.paths,
+        )
 
     def __hash__(self):
         return self.identifier.__hash__()
 
     def change_origin(self, new_origin: str):
-        return Library(identifier=self.identifier, origin=new_origin)
+        return Library(identifier=self.identifier, origin=new_origin, paths=self.paths)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class External:
     """Contains detailled information about an external reference"""
 
@@ -223,11 +292,74 @@ class External:
     dest_path: Path
 
     def lock(self, refspec: RefSpec):
-        return External(identifier=self.identifier.lock(refspec, origin=self.origin))
+        return External(
+            identifier=self.identifier.lock(refspec),
+            origin=self.origin,
+            dest_path=self.dest_path,
+        )
 
     def __hash__(self):
         return self.identifier.__hash__()
 
+    def change_origin(self, new_origin: str):
+        return External(
+            identifier=self.identifier, origin=new_origin, dest_path=self.dest_path
+        )
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class ResolvedLibrary:
+    """Library resolved in the whole dependency tree, as stored in the resolved manifest"""
+
+    """Identifier of the library, locked if the reference could be resolved"""
+    identifier: ItemIdentifier
+
+    """Git origin URL"""
+    origin: str
+
+    """Folder where the library is stored, None if it can't be determined yet"""
+    path: Optional[Path]
+
+    """Path of the workspace declaring the library"""
+    workspace: Path
+
+    """Identifiers of the libraries leading to this one, starting from the root workspace"""
+    parents: Tuple[str, ...] = tuple()
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Catalog folder not referenced anymore by the workspace tree, see frundles gc"""
+
+    """Path of the folder"""
+    path: Path
+
+    """Disk usage of the folder, in bytes"""
+    size: int
+
+    """The folder may contain modifications, and is kept"""
+    dirty: bool
+
+    """The folder has been removed"""
+    removed: bool = False
+
+
+@dataclass(frozen=True)
+class BundleEntry:
+    """Git bundle of the locked commits of an origin, see frundles bundle create"""
+
+    """Origin URL of the bundled repository"""
+    origin: str
+
+    """Locked commits of the origin in the workspace tree"""
+    commits: Tuple[str, ...]
+
+    """Path of the bundle file, None if it could not be created"""
+    path: Optional[Path] = None
+
+    """Size of the bundle file, in bytes"""
+    size: int = 0
+
 
 ###########################################
 # Workspace related information
@@ -239,11 +371,97 @@ class WorkspaceMode(Enum):
     Recurse = "recurse"
 
 
+@dataclass(frozen=True)
+class OriginRewrite:
+    """Rewrite rule for origin URLs, in the spirit of git url.<base>.insteadOf"""
+
+    """Prefix of the origin URLs to rewrite"""
+    prefix: str
+
+    """Replacements of the prefix, tried in order before the origin itself"""
+    mirrors: Tuple[str, ...]
+
+
 @dataclass
 class WorkspaceInfo:
     catalog_dir: Path
     mode: WorkspaceMode = None
 
+    """Only fetch the locked commit of libraries, without history"""
+    shallow: bool = False
+
+    """Extract the files of libraries, without git repository"""
+    export: bool = False
+
+    """Origin rewrite rules, only used for the root workspace"""
+    mirrors: Tuple[OriginRewrite, ...] = tuple()
+
     def __post_init__(self):
         # Set default values
         self.mode = self.mode or WorkspaceMode.Aggregate
+
+
+###########################################
+# Fetch options
+###########################################
+
+
+class GitBackend(Enum):
+    """Implementation used to run git operations"""
+
+    """GitPython, with blocking operations run in a thread pool"""
+    GitPython = "gitpython"
+
+    """git command line tool, driven by asyncio subprocesses"""
+    Asyncio = "asyncio"
+
+
+@dataclass(frozen=True)
+class FetchOptions:
+    """Options controlling how libraries are retrieved from their origin"""
+
+    """Path to the machine-wide object cache, None if disabled"""
+    object_cache_dir: Optional[Path] = None
+
+    """Only fetch the locked commit, without history"""
+    shallow: bool = False
+
+    """Extract the files of the locked commit, without git repository"""
+    export: bool = False
+
+    """Check for uncommitted modifications in already fetched libraries"""
+    dirty_check: bool = True
+
+    """Path to the resolved references cache, None if disabled"""
+    ref_cache_dir: Optional[Path] = None
+
+    """Maximum age in seconds of cached branch references. Tags are cached indefinitely"""
+    branch_ttl: float = 0
+
+    """Query remotes even for cached references"""
+    refresh: bool = False
+
+    """Implementation used to run git operations"""
+    git_backend: GitBackend = GitBackend.GitPython
+
+    """Maximum number of concurrent remote operations per host, 0 for no limit (asyncio backend)"""
+    max_per_host: int = 0
+
+    """Timeout of each git operation in seconds, None for no timeout (asyncio backend)"""
+    git_timeout: Optional[float] = None
+
+    """Never contact remote origins: only use the reference cache, the object cache and
+    repositories already present in the catalog"""
+    offline: bool = False
+
+    """Catalog folders searched for repositories of the same origin in offline mode"""
+    catalog_dirs: Tuple[Path, ...] = tuple()
+
+    """Folder of bundles created by frundles bundle create, used first in offline mode"""
+    bundle_dir: Optional[Path] = None
+
+    """Origin rewrite rules for remote operations. Repositories keep the original origin"""
+    mirrors: Tuple[OriginRewrite, ...] = tuple()
+
+    """Folders to check out for the library being retrieved, see Library.paths"""
+    sparse_paths: Tuple[str, ...] = tuple()
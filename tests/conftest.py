@@ -0,0 +1,92 @@
+"""
+# Shared test fixtures
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import subprocess
+
+import pytest
+
+
+def _git(*args, cwd):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, check=True, text=True
+    ).stdout.strip()
+
+
+def _commit(repo, message):
+    _git("add", "-A", cwd=repo)
+    _git(
+        "-c",
+        "user.name=a",
+        "-c",
+        "user.email=a@b.c",
+        "commit",
+        "-qm",
+        message,
+        cwd=repo,
+    )
+    return _git("rev-parse", "HEAD", cwd=repo)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the user cache directory out of the way of tests"""
+
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("FRUNDLES_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def git():
+    """Run a git command in a folder, and return its output"""
+
+    return _git
+
+
+@pytest.fixture
+def commit():
+    """Commit all files of a repository, and return the new commit SHA1"""
+
+    return _commit
+
+
+@pytest.fixture
+def make_origin(tmp_path):
+    """Create a git repository in the test folder, on branch main.
+
+    Each commit writes its index in the README file. If a tag name is given, the last commit
+    is tagged with an annotated tag. Returns the path of the repository and the SHA1 of its
+    commits.
+    """
+
+    def make(name, commits=1, tag=None):
+        origin = tmp_path / name
+        origin.mkdir(parents=True)
+        _git("init", "--quiet", "--initial-branch=main", cwd=origin)
+
+        sha1s = list()
+        for i in range(commits):
+            (origin / "README").write_text(f"revision {i}\n")
+            sha1s.append(_commit(origin, str(i)))
+
+        if tag is not None:
+            _git(
+                "-c",
+                "user.name=a",
+                "-c",
+                "user.email=a@b.c",
+                "tag",
+                "-a",
+                "-m",
+                tag,
+                tag,
+                cwd=origin,
+            )
+
+        return origin, sha1s
+
+    return make
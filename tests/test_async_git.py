@@ -0,0 +1,37 @@
+"""
+# asyncio git backend tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import subprocess
+
+from frundles.backend.async_git import AsyncGit, get_host
+from frundles.errors import GitProcessError
+
+
+def test_get_host():
+    assert get_host("https://user@example.com:8443/lib.git") == "example.com"
+    assert get_host("git@example.com:group/lib.git") == "example.com"
+    assert get_host("file:///srv/git/lib.git") is None
+    assert get_host("/srv/git/lib.git") is None
+
+
+def test_git_process(tmp_path):
+    subprocess.run(["git", "init", "--quiet", str(tmp_path)], check=True)
+
+    git = AsyncGit(jobs=2)
+    try:
+        ok, failed = git.run_all(
+            [
+                git.git("rev-parse", "--is-inside-work-tree", cwd=tmp_path),
+                git.git("rev-parse", "--verify", "HEAD", cwd=tmp_path),
+            ]
+        )
+    finally:
+        git.close()
+
+    assert ok.strip() == "true"
+    assert isinstance(failed, GitProcessError)
+    assert "rev-parse --verify HEAD" in str(failed)
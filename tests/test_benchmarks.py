@@ -0,0 +1,44 @@
+"""
+# Benchmark harness smoke test
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Runs the scale benchmarks on a tiny tree, which also checks synchronization of nested
+workspaces with file:// origins, in both modes.
+"""
+
+import json
+import subprocess
+import sys
+
+from pathlib import Path
+
+BENCH_SCRIPT = Path(__file__).resolve().parent.parent / "benchmarks" / "run.py"
+
+PHASES = {"sync-cold", "sync-warm", "sync-forced", "list", "locate", "bump-all"}
+
+
+def test_benchmark_smoke(tmp_path):
+    output = tmp_path / "results.json"
+
+    subprocess.run(
+        [
+            sys.executable,
+            str(BENCH_SCRIPT),
+            *("--libraries", "4", "--depth", "2", "--diamonds", "1"),
+            *("--history", "2", "--files", "2", "--repeat", "1"),
+            *("--work-dir", str(tmp_path / "work"), "--output", str(output)),
+        ],
+        check=True,
+    )
+
+    report = json.loads(output.read_text())
+
+    assert {(x["mode"], x["phase"]) for x in report["results"]} == {
+        (mode, phase) for mode in ("aggregate", "recurse") for phase in PHASES
+    }
+
+    # Shared library is cloned in the catalog of each library of the deepest level
+    recurse_catalog = tmp_path / "work" / "recurse" / "ws" / "ip"
+    assert len(list(recurse_catalog.glob("*/ip/*/ip/lib-0004"))) == 2
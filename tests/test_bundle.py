@@ -0,0 +1,66 @@
+"""
+# Git bundles tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import shutil
+
+import pytest
+
+from frundles.backend import artifact, bundle, catalog, workspace
+from frundles.errors import InvalidBundle
+from frundles.model import FetchOptions, RefSpec, RefSpecKind
+
+# Never reached: libraries are synchronized from the bundle
+ORIGIN = "https://example.invalid/lib.git"
+
+
+def test_bundle_roundtrip(tmp_path, git, make_origin):
+    origin, commits = make_origin("lib", 2)
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      commit: {commits[1]}\n"
+    )
+
+    workspace.sync_workspace(wspace)
+
+    archive_path = tmp_path / "bundles.tar"
+    entries = bundle.create_bundles(wspace, archive_path, archive=True)
+
+    assert [(x.origin, x.commits, x.path) for x in entries] == [
+        (str(origin), (commits[1],), archive_path)
+    ]
+    assert archive_path.is_file()
+
+    # Serve the bundle for another origin, which can't be reached
+    with bundle.open_bundles(archive_path) as bundle_dir:
+        shutil.move(
+            str(catalog.get_bundle_path(bundle_dir, str(origin))),
+            str(catalog.get_bundle_path(bundle_dir, ORIGIN)),
+        )
+
+        target_dir = tmp_path / "ip" / f"lib-{commits[1]}"
+        artifact.clone(
+            target_dir,
+            ORIGIN,
+            RefSpec(kind=RefSpecKind.Commit, value=commits[1]),
+            FetchOptions(offline=True, bundle_dir=bundle_dir),
+        )
+
+    assert artifact.get_head(target_dir) == commits[1]
+    assert (target_dir / "README").read_text() == "revision 1\n"
+    assert git("remote", "get-url", "origin", cwd=target_dir) == ORIGIN
+
+
+def test_invalid_archive(tmp_path):
+    archive_path = tmp_path / "bundles.tar"
+    archive_path.write_text("not an archive\n")
+
+    with pytest.raises(InvalidBundle):
+        with bundle.open_bundles(archive_path):
+            pass
@@ -0,0 +1,89 @@
+"""
+# Catalog garbage collection tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+from frundles.backend import artifact, catalog_gc, workspace
+from frundles.model import RefSpec, RefSpecKind
+
+
+def test_collect_garbage(tmp_path, make_origin):
+    origin, commits = make_origin("lib", 2)
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      commit: {commits[1]}\n"
+    )
+
+    workspace.sync_workspace(wspace)
+
+    # Folder left behind by a previous lock, and one with local modifications
+    (store_dir,) = (wspace / "ip" / ".stores").iterdir()
+    for commit, name in ((commits[0], "old"), (commits[0], "modified")):
+        artifact.clone(
+            wspace / "ip" / name,
+            str(origin),
+            RefSpec(kind=RefSpecKind.Commit, value=commit),
+            store_dir=store_dir,
+        )
+
+    (wspace / "ip" / "modified" / "README").write_text("local change\n")
+
+    entries = catalog_gc.collect_garbage(wspace, dry_run=True)
+    assert [(x.path.name, x.dirty) for x in entries] == [
+        ("modified", True),
+        ("old", False),
+    ]
+    assert all(x.size > 0 for x in entries)
+    assert (wspace / "ip" / "old").is_dir()
+
+    entries = catalog_gc.collect_garbage(wspace)
+    assert [(x.path.name, x.removed) for x in entries] == [
+        ("modified", False),
+        ("old", True),
+    ]
+
+    assert sorted(x.name for x in (wspace / "ip").iterdir()) == [
+        ".stores",
+        f"lib-{commits[1]}",
+        "modified",
+    ]
+    assert artifact.get_head(wspace / "ip" / f"lib-{commits[1]}") == commits[1]
+
+
+def test_local_commits_are_kept(tmp_path, commit, make_origin):
+    origin, commits = make_origin("lib", 2)
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      commit: {commits[1]}\n"
+    )
+
+    workspace.sync_workspace(wspace)
+
+    # Unreferenced folders with a clean status, but commits that were never pushed
+    (store_dir,) = (wspace / "ip" / ".stores").iterdir()
+    for name in (f"lib-{commits[0]}", "unpushed", "pushed"):
+        artifact.clone(
+            wspace / "ip" / name,
+            str(origin),
+            RefSpec(kind=RefSpecKind.Commit, value=commits[0]),
+            store_dir=store_dir,
+        )
+
+    for name in (f"lib-{commits[0]}", "unpushed"):
+        (wspace / "ip" / name / "README").write_text("local commit\n")
+        commit(wspace / "ip" / name, "local")
+
+    entries = catalog_gc.collect_garbage(wspace)
+    assert [(x.path.name, x.dirty, x.removed) for x in entries] == [
+        (f"lib-{commits[0]}", True, False),
+        ("pushed", False, True),
+        ("unpushed", True, False),
+    ]
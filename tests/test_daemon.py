@@ -0,0 +1,111 @@
+"""
+# Workspace daemon tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import argparse
+import os
+import socketserver
+import threading
+
+import pytest
+
+from frundles.backend import daemon, workspace
+from frundles.errors import DaemonError
+from frundles.frontend import list as cmd_list
+from frundles.frontend import locate
+from frundles.io.base import OutputHandler
+
+
+@pytest.fixture
+def socket_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("FRUNDLES_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    return tmp_path / f"frundles-{os.getuid()}"
+
+
+def test_private_socket_dir(socket_dir):
+    socket_dir.mkdir(mode=0o700)
+    daemon._check_socket_dir(socket_dir)
+
+    assert daemon.get_socket_path(socket_dir).parent == socket_dir
+
+
+def test_shared_socket_dir(socket_dir):
+    socket_dir.mkdir()
+    socket_dir.chmod(0o777)
+
+    with pytest.raises(DaemonError):
+        daemon._check_socket_dir(socket_dir)
+
+    # Clients don't connect to a daemon listening there
+    assert daemon.query(socket_dir, "ping") is None
+
+
+def test_symlinked_socket_dir(socket_dir, tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir(mode=0o700)
+    socket_dir.symlink_to(target)
+
+    with pytest.raises(DaemonError):
+        daemon.serve(daemon.get_socket_path(tmp_path))
+
+
+class _RecordingOutput(OutputHandler):
+    def __init__(self):
+        self.outputs = list()
+
+    def send_output(self, data: str):
+        self.outputs.append(data)
+
+    def send_log(self, record):
+        pass
+
+
+class _FailingHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.rfile.readline()
+        self.wfile.write(b"ERR Something went wrong\n")
+
+
+@pytest.fixture
+def failing_daemon(tmp_path, monkeypatch):
+    """Daemon answering an error to every request"""
+
+    socket_path = tmp_path / "daemon.sock"
+    monkeypatch.setenv("FRUNDLES_SOCKET", str(socket_path))
+
+    with socketserver.UnixStreamServer(str(socket_path), _FailingHandler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        yield socket_path
+
+        server.shutdown()
+
+
+def test_daemon_error_fallback(tmp_path, monkeypatch, make_origin, failing_daemon):
+    origin, (commit,) = make_origin("lib")
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      commit: {commit}\n"
+        f"      friendly_name: mylib\n"
+    )
+    workspace.sync_workspace(wspace)
+    monkeypatch.chdir(wspace)
+
+    with pytest.raises(DaemonError):
+        daemon.query(wspace, "ping")
+
+    # Commands use the in-process result instead
+    output = _RecordingOutput()
+    locate.run(output, argparse.Namespace(friendly_name="mylib"))
+    cmd_list.run(output, argparse.Namespace(all=False))
+
+    assert output.outputs[0] == str(wspace / "ip" / f"lib-{commit}")
+    assert "mylib" in output.outputs[1]
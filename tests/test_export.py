@@ -0,0 +1,57 @@
+"""
+# Exported libraries tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+from frundles.backend import artifact
+from frundles.model import (
+    ArtifactKind,
+    FetchStatus,
+    ItemIdentifier,
+    RefSpec,
+    RefSpecKind,
+    WorkspaceInfo,
+    WorkspaceMode,
+)
+
+
+def test_export(tmp_path, make_origin):
+    origin, commits = make_origin("origin", 2)
+
+    wspace = WorkspaceInfo(catalog_dir=tmp_path / "ip", mode=WorkspaceMode.Recurse)
+    target_dir = tmp_path / "ip" / "lib"
+
+    def lib_id(commit):
+        refspec = RefSpec(kind=RefSpecKind.Commit, value=commit)
+        return ItemIdentifier(
+            kind=ArtifactKind.Library,
+            name="lib",
+            refspec=refspec,
+            locked_refspec=refspec,
+            friendly_name="lib",
+        )
+
+    artifact.export(target_dir, str(origin), lib_id(commits[0]).locked_refspec)
+
+    assert not (target_dir / ".git").exists()
+    assert (target_dir / "README").read_text() == "revision 0\n"
+    assert artifact.is_exported(target_dir)
+    assert artifact.get_head(target_dir) == commits[0]
+    assert artifact.get_origin(target_dir) == str(origin)
+
+    assert artifact.check_status(wspace, wspace, lib_id(commits[0])) == FetchStatus.Ok
+    assert (
+        artifact.check_status(wspace, wspace, lib_id(commits[1]))
+        == FetchStatus.Modified
+    )
+
+    # Updating an exported library extracts it again
+    artifact.update(target_dir, str(origin), lib_id(commits[1]).locked_refspec)
+
+    assert (target_dir / "README").read_text() == "revision 1\n"
+    assert artifact.check_status(wspace, wspace, lib_id(commits[1])) == FetchStatus.Ok
+
+    # Temporary folders are removed
+    assert [x.name for x in (tmp_path / "ip").iterdir()] == ["lib"]
@@ -0,0 +1,120 @@
+"""
+# Externals sync tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import os
+import shutil
+
+import pytest
+
+from frundles.backend import artifact, catalog
+from frundles.errors import ExternalDestinationNotEmpty
+from frundles.model import (
+    ArtifactKind,
+    ItemIdentifier,
+    RefSpec,
+    RefSpecKind,
+    WorkspaceInfo,
+    WorkspaceMode,
+)
+
+
+@pytest.fixture
+def commit_files(commit):
+    """Replace the content of the origin repository, and return the new commit SHA1"""
+
+    def commit_files(origin, files):
+        for path in origin.iterdir():
+            if path.name != ".git":
+                shutil.rmtree(path) if path.is_dir() else path.unlink()
+
+        for name, content in files.items():
+            (origin / name).parent.mkdir(parents=True, exist_ok=True)
+            (origin / name).write_text(content)
+
+        return commit(origin, "c")
+
+    return commit_files
+
+
+def item_id(kind):
+    refspec = RefSpec(kind=RefSpecKind.Branch, value="main")
+    return ItemIdentifier(kind=kind, name="ext", refspec=refspec)
+
+
+def sync(tmp_path, origin, commit_sha1):
+    wspace = WorkspaceInfo(catalog_dir=tmp_path / "ip", mode=WorkspaceMode.Aggregate)
+
+    artifact.sync_external(
+        tmp_path / "vendor",
+        catalog.get_external_store_path(
+            wspace, item_id(ArtifactKind.External), str(origin)
+        ),
+        str(origin),
+        RefSpec(kind=RefSpecKind.Commit, value=commit_sha1),
+    )
+
+
+@pytest.fixture
+def origin(make_origin):
+    origin, _ = make_origin("origin", 0)
+    return origin
+
+
+def test_only_changed_files_are_written(tmp_path, origin, commit_files):
+    first = commit_files(origin, {"keep.v": "k", "src/a.v": "a", "src/b.v": "b"})
+    second = commit_files(origin, {"keep.v": "k", "src/a.v": "a2", "c.v": "c"})
+
+    vendor = tmp_path / "vendor"
+
+    sync(tmp_path, origin, first)
+    assert artifact.get_head(vendor) == first
+
+    # Make previous writes recognizable
+    for path in ("keep.v", "src/a.v"):
+        os.utime(vendor / path, (1000, 1000))
+
+    sync(tmp_path, origin, second)
+    assert artifact.get_head(vendor) == second
+
+    assert (vendor / "keep.v").stat().st_mtime == 1000
+    assert (vendor / "src" / "a.v").stat().st_mtime != 1000
+    assert (vendor / "src" / "a.v").read_text() == "a2"
+    assert (vendor / "c.v").read_text() == "c"
+    assert not (vendor / "src" / "b.v").exists()
+
+
+def test_removed_store(tmp_path, origin, commit_files):
+    first = commit_files(origin, {"old.v": "o"})
+    second = commit_files(origin, {"new.v": "n"})
+
+    sync(tmp_path, origin, first)
+    shutil.rmtree(tmp_path / "ip")
+
+    sync(tmp_path, origin, second)
+    assert sorted(x.name for x in (tmp_path / "vendor").iterdir()) == [
+        artifact.EXPORT_MARKER,
+        "new.v",
+    ]
+
+
+def test_foreign_destination(tmp_path, origin, commit_files):
+    first = commit_files(origin, {"a.v": "a"})
+
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "mine.v").write_text("m")
+
+    with pytest.raises(ExternalDestinationNotEmpty):
+        sync(tmp_path, origin, first)
+
+
+def test_store_namespace(tmp_path, origin):
+    wspace = WorkspaceInfo(catalog_dir=tmp_path / "ip", mode=WorkspaceMode.Aggregate)
+
+    # A library and an external of the same origin don't share their object store
+    assert catalog.get_external_store_path(
+        wspace, item_id(ArtifactKind.External), str(origin)
+    ) != catalog.get_store_path(wspace, item_id(ArtifactKind.Library), str(origin))
@@ -0,0 +1,85 @@
+"""
+# Fetch arguments tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import argparse
+
+import pytest
+
+from frundles.frontend import fetch_args
+
+ENV_FLAGS = ("FRUNDLES_OFFLINE", "FRUNDLES_OBJECT_CACHE")
+
+
+@pytest.mark.parametrize("name", ENV_FLAGS)
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1", True),
+        ("true", True),
+        ("Yes", True),
+        ("", False),
+        ("0", False),
+        ("false", False),
+        ("no", False),
+        ("off", False),
+        ("disabled", False),
+    ],
+)
+def test_env_flag(monkeypatch, name, value, expected):
+    monkeypatch.setenv(name, value)
+    assert fetch_args._env_flag(name) == expected
+
+
+@pytest.mark.parametrize("name", ENV_FLAGS)
+def test_env_flag_unset(monkeypatch, name):
+    monkeypatch.delenv(name, raising=False)
+    assert not fetch_args._env_flag(name)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="frundles")
+    commands = parser.add_subparsers(dest="subcommand")
+    fetch_args.setup_fetch_arguments(commands.add_parser("sync"))
+    commands.add_parser("locate")
+    return parser
+
+
+def test_branch_ttl(monkeypatch, capsys):
+    monkeypatch.setenv("FRUNDLES_BRANCH_TTL", "60")
+    assert make_parser().parse_args(["sync"]).branch_ttl == 60
+
+    # Invalid values only matter to commands fetching libraries
+    monkeypatch.setenv("FRUNDLES_BRANCH_TTL", "abc")
+    make_parser().parse_args(["locate"])
+
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(["sync"])
+    assert "--branch-ttl" in capsys.readouterr().err
+
+    monkeypatch.delenv("FRUNDLES_BRANCH_TTL")
+    for value in ("-1", "nan"):
+        with pytest.raises(SystemExit):
+            make_parser().parse_args(["sync", "--branch-ttl", value])
+
+
+def test_git_backend(monkeypatch, capsys):
+    monkeypatch.setenv("FRUNDLES_GIT_BACKEND", "asyncio")
+    assert make_parser().parse_args(["sync"]).git_backend == "asyncio"
+
+    monkeypatch.setenv("FRUNDLES_GIT_BACKEND", "foo")
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(["sync"])
+    assert "--git-backend" in capsys.readouterr().err
+
+
+def test_max_per_host():
+    assert make_parser().parse_args(["sync"]).max_per_host is None
+    assert make_parser().parse_args(["sync", "--max-per-host", "2"]).max_per_host == 2
+
+    for value in ("0", "-1"):
+        with pytest.raises(SystemExit):
+            make_parser().parse_args(["sync", "--max-per-host", value])
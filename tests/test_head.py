@@ -0,0 +1,52 @@
+"""
+# Fast HEAD reading tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pytest
+from git import Repo
+
+from frundles.backend import artifact
+
+
+def detached_head(git, repo):
+    git("checkout", "--quiet", "--detach", "HEAD~1", cwd=repo)
+    return repo
+
+
+def symbolic_ref(git, repo):
+    return repo
+
+
+def packed_ref(git, repo):
+    git("pack-refs", "--all", cwd=repo)
+    assert not (repo / ".git" / "refs" / "heads" / "main").exists()
+    return repo
+
+
+def worktree_branch(git, repo):
+    git("pack-refs", "--all", cwd=repo)
+
+    worktree = repo.parent / "worktree"
+    git(
+        "worktree", "add", "--quiet", "-b", "feature", str(worktree), "HEAD~1", cwd=repo
+    )
+    return worktree
+
+
+@pytest.mark.parametrize(
+    "setup", [detached_head, symbolic_ref, packed_ref, worktree_branch]
+)
+def test_same_as_gitpython(git, make_origin, setup):
+    repo, _ = make_origin("repo", 2)
+    repo_dir = setup(git, repo)
+
+    assert artifact.get_head(repo_dir) == Repo(repo_dir).head.commit.hexsha
+
+
+def test_unborn_branch(git, tmp_path):
+    git("init", "--quiet", cwd=tmp_path)
+
+    assert artifact.get_head(tmp_path) is None
@@ -0,0 +1,46 @@
+"""
+# Concurrent synchronization tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import argparse
+
+import pytest
+
+from frundles.backend import workspace
+from frundles.frontend.fetch_args import positive_int
+
+
+@pytest.mark.parametrize("mode", ["aggregate", "recurse"])
+def test_lock_file_is_independent_of_jobs(tmp_path, mode, make_origin):
+    # Libraries with different histories, so that they are locked to different commits
+    origins = [make_origin(f"origins/lib{i}", i + 1)[0] for i in range(6)]
+
+    libraries = "".join(
+        f"    - origin: {origin}\n      branch: main\n" for origin in origins
+    )
+
+    lock_files = list()
+    for jobs in (1, 4):
+        wspace = tmp_path / f"ws-{jobs}"
+        wspace.mkdir()
+        (wspace / "frundles.yml").write_text(
+            f"workspace:\n    catalog_dir: ip\n    mode: {mode}\n"
+            f"libraries:\n{libraries}"
+        )
+
+        workspace.sync_workspace(wspace, jobs=jobs)
+        lock_files.append((wspace / "frundles.lock").read_text())
+
+    assert lock_files[0] == lock_files[1]
+    assert len(lock_files[0].splitlines()) == len(origins)
+
+
+def test_positive_int():
+    assert positive_int("4") == 4
+
+    for value in ("0", "-1", "four"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)
@@ -0,0 +1,95 @@
+"""
+# Lock file tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import os
+
+import pytest
+
+from frundles.exchange import lock_file
+from frundles.exchange.atomic_write import atomic_write
+from frundles.model import ArtifactKind, ItemIdentifier, RefSpec, RefSpecKind
+
+# Old enough to notice a rewrite
+OLD_MTIME = 1_000_000_000
+
+
+def make_lib_id(name, sha1):
+    return ItemIdentifier(
+        kind=ArtifactKind.Library,
+        name=name,
+        refspec=RefSpec(kind=RefSpecKind.Branch, value="main"),
+        locked_refspec=RefSpec(kind=RefSpecKind.Commit, value=sha1),
+    )
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    lock_path = tmp_path / "frundles.lock"
+
+    session = lock_file.LockFileSession(lock_path)
+    for name in ("zeta", "alpha", "mu"):
+        session.add(make_lib_id(name, "1" * 40))
+    session.commit()
+
+    os.utime(lock_path, (OLD_MTIME, OLD_MTIME))
+    return lock_path
+
+
+def test_sorted_entries(lock_path):
+    lines = lock_path.read_text().splitlines()
+
+    assert [line.split(":")[1] for line in lines] == ["alpha", "mu", "zeta"]
+    assert len(lock_file.from_file(lock_path)) == 3
+
+
+def test_no_op_session(lock_path):
+    session = lock_file.LockFileSession(lock_path)
+    session.commit()
+
+    # Locking a library to the same commit again changes nothing
+    session.add(make_lib_id("mu", "1" * 40), replace_existing=True)
+    session.commit()
+
+    assert lock_path.stat().st_mtime == OLD_MTIME
+
+    session.add(make_lib_id("mu", "2" * 40), replace_existing=True)
+    session.commit()
+
+    assert lock_path.stat().st_mtime != OLD_MTIME
+    assert lock_file.from_file(lock_path)[make_lib_id("mu", "2" * 40).unlock()] == (
+        RefSpec(kind=RefSpecKind.Commit, value="2" * 40)
+    )
+
+
+def test_interrupted_write(lock_path):
+    content = lock_path.read_text()
+
+    with pytest.raises(KeyboardInterrupt):
+        with atomic_write(lock_path) as fhandle:
+            fhandle.write("partial")
+            raise KeyboardInterrupt()
+
+    assert lock_path.read_text() == content
+    assert os.listdir(lock_path.parent) == [lock_path.name]
+
+
+def test_failed_write(lock_path, monkeypatch):
+    content = lock_path.read_text()
+
+    def replace(src, dst):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(os, "replace", replace)
+
+    session = lock_file.LockFileSession(lock_path)
+    session.add(make_lib_id("new", "2" * 40))
+
+    with pytest.raises(OSError):
+        session.commit()
+
+    assert lock_path.read_text() == content
+    assert os.listdir(lock_path.parent) == [lock_path.name]
@@ -0,0 +1,68 @@
+"""
+# Resolved dependency manifest tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pytest
+
+from frundles.backend import workspace
+from frundles.errors import OfflineSyncIncomplete
+from frundles.exchange import manifest_file
+from frundles.model import FetchOptions
+
+
+def make_wspace(tmp_path, origin, refspec):
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      {refspec}\n"
+        f"      friendly_name: mylib\n"
+    )
+
+    return wspace
+
+
+def check_manifest(wspace, origin, commit_sha1):
+    root, _, (lib,) = manifest_file.from_file(wspace / workspace.MANIFEST_PATH)
+
+    assert root == wspace.resolve()
+    assert lib.identifier.friendly_name == "mylib"
+    assert lib.identifier.locked_refspec.value == commit_sha1
+    assert lib.origin == str(origin)
+    assert lib.path == wspace.resolve() / "ip" / f"lib-{commit_sha1}"
+    assert lib.workspace == wspace.resolve()
+    assert lib.parents == tuple()
+
+    # Up to date with the workspace files
+    assert workspace.load_manifest(wspace) == [lib]
+
+
+def test_sync_and_bump(tmp_path, commit, make_origin):
+    origin, commits = make_origin("lib")
+
+    wspace = make_wspace(tmp_path, origin, "branch: main")
+    workspace.sync_workspace(wspace)
+
+    check_manifest(wspace, origin, commits[0])
+
+    (origin / "README").write_text("revision 1\n")
+    commits.append(commit(origin, "1"))
+
+    workspace.bump_workspace_library(wspace, "mylib")
+
+    check_manifest(wspace, origin, commits[1])
+
+
+def test_offline_sync_incomplete(tmp_path):
+    # Never reached: offline mode must not contact the origin
+    wspace = make_wspace(
+        tmp_path, "https://example.invalid/lib.git", f"commit: '{'0' * 40}'"
+    )
+
+    with pytest.raises(OfflineSyncIncomplete):
+        workspace.sync_workspace(wspace, options=FetchOptions(offline=True))
+
+    assert not (wspace / workspace.MANIFEST_PATH).exists()
@@ -0,0 +1,65 @@
+"""
+# Model classes tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pickle
+
+import pytest
+
+from frundles.backend.workspace import _index_by_name
+from frundles.errors import UnlockedRefSpec
+from frundles.model import ArtifactKind, ItemIdentifier, RefSpec, RefSpecKind
+
+
+def _identifier(refspec="main", locked=None, friendly_name=None):
+    return ItemIdentifier(
+        kind=ArtifactKind.Library,
+        name="lib",
+        refspec=RefSpec(RefSpecKind.Branch, refspec),
+        locked_refspec=RefSpec(RefSpecKind.Commit, locked) if locked else None,
+        friendly_name=friendly_name,
+    )
+
+
+def test_identifier_equality():
+    unlocked = _identifier()
+    locked = unlocked.lock(RefSpec(RefSpecKind.Commit, "1234"))
+
+    assert unlocked.identifier == "lib:lib:main"
+    assert locked.locked_identifier == "lib:lib:1234"
+    with pytest.raises(UnlockedRefSpec):
+        unlocked.locked_identifier
+
+    # Locked identifiers compare on the locked commit only
+    assert locked == _identifier(refspec="v1", locked="1234")
+    assert locked != unlocked
+    assert unlocked == _identifier(friendly_name="other")
+    assert len({locked, unlocked, _identifier(locked="1234")}) == 2
+
+
+def test_identifier_pickle():
+    identifier = _identifier(locked="1234", friendly_name="lib")
+    loaded = pickle.loads(pickle.dumps(identifier))
+
+    assert loaded == identifier
+    assert hash(loaded) == hash(identifier)
+    assert loaded.friendly_name == "lib"
+    assert str(loaded.refspec) == "branch:main"
+
+
+def test_index_by_name():
+    class Lib:
+        def __init__(self, identifier):
+            self.identifier = identifier
+
+    first = Lib(_identifier(refspec="v1", friendly_name="lib"))
+    second = Lib(_identifier(refspec="v2", friendly_name="lib"))
+
+    assert _index_by_name([first, second])["lib"] is first
+    assert "lib:lib:v2" not in _index_by_name([first, second])
+    assert (
+        _index_by_name([first, second], with_identifiers=True)["lib:lib:v2"] is second
+    )
@@ -0,0 +1,63 @@
+"""
+# Offline mode tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pytest
+
+from frundles.backend import artifact
+from frundles.errors import NotAvailableOffline
+from frundles.model import (
+    ArtifactKind,
+    FetchOptions,
+    ItemIdentifier,
+    Library,
+    RefSpec,
+    RefSpecKind,
+)
+
+# Never reached: offline mode must not contact the origin
+ORIGIN = "https://example.invalid/lib.git"
+
+
+def test_offline_from_catalog(tmp_path, git, make_origin):
+    origin, commits = make_origin("origin", 2)
+
+    # A catalog repository of the library, checked out at the first commit
+    catalog_dir = tmp_path / "ip"
+    artifact.clone(
+        catalog_dir / f"lib-{commits[0]}",
+        str(origin),
+        RefSpec(kind=RefSpecKind.Commit, value=commits[0]),
+    )
+    git("remote", "set-url", "origin", ORIGIN, cwd=catalog_dir / f"lib-{commits[0]}")
+
+    options = FetchOptions(offline=True, catalog_dirs=(catalog_dir,))
+
+    lib = Library(
+        identifier=ItemIdentifier(
+            kind=ArtifactKind.Library,
+            name="lib",
+            refspec=RefSpec(kind=RefSpecKind.Branch, value="main"),
+        ),
+        origin=ORIGIN,
+    )
+    assert artifact.resolve_commit_sha1(lib, options) == commits[1]
+
+    target_dir = catalog_dir / f"lib-{commits[1]}"
+    artifact.clone(
+        target_dir, ORIGIN, RefSpec(kind=RefSpecKind.Commit, value=commits[1]), options
+    )
+
+    assert artifact.get_head(target_dir) == commits[1]
+    assert (target_dir / "README").read_text() == "revision 1\n"
+
+    with pytest.raises(NotAvailableOffline):
+        artifact.clone(
+            tmp_path / "missing",
+            ORIGIN,
+            RefSpec(kind=RefSpecKind.Commit, value="0" * 40),
+            options,
+        )
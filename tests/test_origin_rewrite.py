@@ -0,0 +1,78 @@
+"""
+# Origin rewrite rules tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+from pathlib import Path
+
+import pytest
+
+from frundles.backend import origin_rewrite
+from frundles.exchange import user_config, workspace_file
+from frundles.model import OriginRewrite
+
+RULES = (
+    OriginRewrite(prefix="https://github.com/", mirrors=("https://lan/github/",)),
+    OriginRewrite(
+        prefix="https://github.com/vendor/",
+        mirrors=("https://lan/vendor/", "https://backup/vendor/"),
+    ),
+)
+
+
+def test_attempts():
+    assert origin_rewrite.get_attempts("https://gitlab.com/lib.git", RULES) == [None]
+
+    # Longest prefix wins
+    assert origin_rewrite.get_attempts("https://github.com/vendor/lib.git", RULES) == [
+        "url.https://lan/vendor/.insteadOf=https://github.com/vendor/",
+        "url.https://backup/vendor/.insteadOf=https://github.com/vendor/",
+        None,
+    ]
+
+
+def test_fallback():
+    attempts = []
+
+    def operation(config):
+        attempts.append(config)
+        if config is not None:
+            raise OSError("unreachable")
+        return "done"
+
+    assert origin_rewrite.run("https://github.com/lib.git", RULES, operation) == "done"
+    assert len(attempts) == 2
+
+    with pytest.raises(OSError):
+        origin_rewrite.run(
+            "https://github.com/lib.git",
+            RULES,
+            lambda config: operation("always failing"),
+        )
+
+
+def test_parse_mirrors(tmp_path):
+    wsinfo = workspace_file.parse_workspace_info(
+        Path(tmp_path),
+        {
+            "catalog_dir": "ip",
+            "mirrors": {
+                "https://github.com/": "https://lan/github/",
+                "https://github.com/vendor/": [
+                    "https://lan/vendor/",
+                    "https://backup/vendor/",
+                ],
+            },
+        },
+    )
+    assert wsinfo.mirrors == RULES
+
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(
+        "mirrors:\n    'https://github.com/': 'https://lan/github/'\n"
+    )
+
+    assert user_config.load_mirrors(config_path) == RULES[:1]
+    assert user_config.load_mirrors(tmp_path / "missing.yml") == tuple()
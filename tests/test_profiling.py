@@ -0,0 +1,86 @@
+"""
+# Timing spans tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import asyncio
+import json
+
+from frundles.backend import profiling
+
+
+def test_disabled_span_records_nothing():
+    profiler = profiling.enable()
+    profiling.disable()
+
+    with profiling.span("fetch", "lib:a:main"):
+        pass
+
+    assert profiler.records == []
+
+
+def test_spans_saved_as_chrome_trace(tmp_path):
+    profiler = profiling.enable()
+
+    try:
+        with profiling.span("sync"):
+            with profiling.span("fetch", "lib:a:main"):
+                pass
+    finally:
+        profiling.disable()
+
+    assert [x.phase for x in profiler.records] == ["fetch", "sync"]
+    assert "fetch" in profiling.summary_table(profiler.records)
+
+    output = tmp_path / "trace.json"
+    profiling.save(profiler.records, output, "chrome")
+    events = json.loads(output.read_text())["traceEvents"]
+
+    assert {x["cat"] for x in events} == {"sync", "fetch"}
+    assert all(x["ph"] == "X" for x in events)
+
+
+def test_nested_spans_self_time():
+    profiler = profiling.enable()
+
+    try:
+        with profiling.span("sync"):
+            with profiling.span("clone", "lib:a:main"):
+                with profiling.span("fetch", "lib:a:main"):
+                    pass
+                with profiling.span("checkout", "lib:a:main"):
+                    pass
+    finally:
+        profiling.disable()
+
+    fetch, checkout, clone, sync = profiler.records
+
+    assert clone.self_ns == clone.duration_ns - fetch.duration_ns - checkout.duration_ns
+    assert sync.self_ns == sync.duration_ns - clone.duration_ns
+    assert fetch.self_ns == fetch.duration_ns
+
+    # The sum of self times is the duration of the outer span
+    assert sum(x.self_ns for x in profiler.records) == sync.duration_ns
+
+
+def test_concurrent_tasks_overlap():
+    async def clone(name):
+        with profiling.span("clone", name):
+            await asyncio.sleep(0.01)
+
+    async def sync():
+        with profiling.span("sync"):
+            await asyncio.gather(clone("lib:a:main"), clone("lib:b:main"))
+
+    profiler = profiling.enable()
+
+    try:
+        asyncio.run(sync())
+    finally:
+        profiling.disable()
+
+    # Concurrent tasks overlap the span that started them, instead of being nested in it
+    sync_record = next(x for x in profiler.records if x.phase == "sync")
+    assert sync_record.self_ns == sync_record.duration_ns
@@ -0,0 +1,34 @@
+"""
+# Resolved references cache tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import time
+
+from frundles.backend import ref_cache
+from frundles.model import RefSpec, RefSpecKind
+
+ORIGIN = "https://example.com/lib.git"
+SHA1 = "0123456789abcdef0123456789abcdef01234567"
+
+
+def test_tags_never_expire(tmp_path):
+    tag = RefSpec(kind=RefSpecKind.Tag, value="v1.0")
+    ref_cache.put(tmp_path, ORIGIN, tag, SHA1)
+
+    assert ref_cache.get(tmp_path, ORIGIN, tag) == SHA1
+    assert ref_cache.get(tmp_path, "https://example.com/other.git", tag) is None
+
+
+def test_branch_ttl(tmp_path, monkeypatch):
+    branch = RefSpec(kind=RefSpecKind.Branch, value="main")
+    ref_cache.put(tmp_path, ORIGIN, branch, SHA1)
+
+    assert ref_cache.get(tmp_path, ORIGIN, branch, max_age=60) == SHA1
+    assert ref_cache.get(tmp_path, ORIGIN, branch, max_age=0) is None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert ref_cache.get(tmp_path, ORIGIN, branch, max_age=60) is None
@@ -0,0 +1,38 @@
+"""
+# Reference resolution tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pytest
+
+from frundles.backend import artifact, workspace
+from frundles.exchange import lock_file
+from frundles.model import FetchOptions, GitBackend, RefSpec, RefSpecKind
+
+
+@pytest.mark.parametrize("git_backend", [GitBackend.GitPython, GitBackend.Asyncio])
+def test_annotated_tag(tmp_path, git, git_backend, make_origin):
+    origin, commits = make_origin("lib", 2, tag="v1.0")
+
+    # The tag object is not the commit it points to
+    assert git("rev-parse", "v1.0", cwd=origin) != commits[1]
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      tag: v1.0\n"
+    )
+
+    options = FetchOptions(git_backend=git_backend)
+    workspace.sync_workspace(wspace, options=options)
+
+    # The lock file holds the peeled commit
+    ((lib_id, locked_refspec),) = lock_file.from_file(wspace / "frundles.lock").items()
+    assert lib_id.refspec == RefSpec(kind=RefSpecKind.Tag, value="v1.0")
+    assert locked_refspec == RefSpec(kind=RefSpecKind.Commit, value=commits[1])
+
+    lib_path = wspace / "ip" / f"lib-{commits[1]}"
+    assert artifact.get_head(lib_path) == commits[1]
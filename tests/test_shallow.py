@@ -0,0 +1,56 @@
+"""
+# Shallow fetch tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import pytest
+
+from frundles.backend import workspace
+from frundles.model import FetchOptions, GitBackend
+
+
+def sync(tmp_path, git_backend, refspec):
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: recurse\n"
+        f"libraries:\n    - origin: {tmp_path / 'lib'}\n      {refspec}\n"
+        f"      friendly_name: lib\n"
+    )
+
+    workspace.sync_workspace(
+        wspace, options=FetchOptions(shallow=True, git_backend=git_backend)
+    )
+
+    return wspace / "ip" / "lib"
+
+
+@pytest.mark.parametrize("git_backend", [GitBackend.GitPython, GitBackend.Asyncio])
+def test_depth(tmp_path, git, git_backend, make_origin):
+    make_origin("lib", 3)
+
+    lib_path = sync(tmp_path, git_backend, "branch: main")
+
+    assert (lib_path / ".git" / "shallow").is_file()
+    assert git("rev-list", "--count", "HEAD", cwd=lib_path) == "1"
+
+
+@pytest.mark.parametrize("git_backend", [GitBackend.GitPython, GitBackend.Asyncio])
+def test_full_fetch_fallback(
+    tmp_path, monkeypatch, caplog, git, git_backend, make_origin
+):
+    _, commits = make_origin("lib", 3)
+
+    # Protocol v0 servers only serve advertised commits, such as branch tips
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    monkeypatch.setenv("GIT_CONFIG_KEY_0", "protocol.version")
+    monkeypatch.setenv("GIT_CONFIG_VALUE_0", "0")
+
+    lib_path = sync(tmp_path, git_backend, f"commit: {commits[1]}")
+
+    assert "fallback to full fetch" in caplog.text
+    assert git("rev-parse", "HEAD", cwd=lib_path) == commits[1]
+    assert not (lib_path / ".git" / "shallow").is_file()
+    assert git("rev-list", "--count", "HEAD", cwd=lib_path) == "2"
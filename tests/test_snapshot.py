@@ -0,0 +1,59 @@
+"""
+# Catalog cache key and snapshot tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import shutil
+
+import pytest
+
+from frundles.backend import artifact, snapshot, sync_stamp, workspace
+from frundles.errors import SnapshotDestinationNotEmpty, UnlockedRefSpec
+
+
+def test_snapshot_roundtrip(tmp_path, git, make_origin):
+    origin, (commit,) = make_origin("lib")
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      branch: main\n"
+    )
+
+    with pytest.raises(UnlockedRefSpec):
+        snapshot.compute_cache_key(wspace)
+
+    workspace.sync_workspace(wspace)
+    cache_key = snapshot.compute_cache_key(wspace)
+
+    archive_path = tmp_path / "snapshot.tar.gz"
+    assert [str(x) for x in snapshot.save_snapshot(wspace, archive_path)] == ["ip"]
+
+    # Fresh checkout of the workspace, in another location
+    other = tmp_path / "other"
+    other.mkdir()
+    for name in ("frundles.yml", "frundles.lock"):
+        shutil.copy(wspace / name, other / name)
+
+    assert snapshot.compute_cache_key(other) == cache_key
+
+    shutil.rmtree(wspace)
+
+    assert snapshot.restore_snapshot(other, archive_path)
+    assert sync_stamp.is_up_to_date(other)
+
+    lib_path = other / "ip" / f"lib-{commit}"
+    assert artifact.get_head(lib_path) == commit
+    assert git("status", "--porcelain", cwd=lib_path) == ""
+
+    with pytest.raises(SnapshotDestinationNotEmpty):
+        snapshot.restore_snapshot(other, archive_path)
+
+    # Other locked commits change the key
+    (other / "frundles.lock").write_text(
+        (other / "frundles.lock").read_text().replace(commit, "0" * 40)
+    )
+    assert snapshot.compute_cache_key(other) != cache_key
@@ -0,0 +1,175 @@
+"""
+# Sparse checkout tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from frundles.backend import artifact, catalog, workspace
+from frundles.errors import InvalidSparsePath, OfflineSyncIncomplete
+from frundles.exchange import workspace_file
+from frundles.model import (
+    ArtifactKind,
+    FetchOptions,
+    FetchStatus,
+    GitBackend,
+    ItemIdentifier,
+    RefSpec,
+    RefSpecKind,
+    WorkspaceInfo,
+    WorkspaceMode,
+)
+
+
+@pytest.mark.parametrize("mode", [WorkspaceMode.Aggregate, WorkspaceMode.Recurse])
+def test_sparse_checkout(tmp_path, mode, git, commit, make_origin):
+    origin, _ = make_origin("lib", 0)
+    git("config", "uploadpack.allowFilter", "true", cwd=origin)
+
+    for folder in ("rtl", "docs", "sim"):
+        (origin / folder).mkdir()
+        (origin / folder / "file").write_text(f"{folder}\n")
+
+    commits = [commit(origin, "0")]
+
+    (origin / "rtl" / "file").write_text("rtl 1\n")
+    commits.append(commit(origin, "1"))
+
+    wspace = WorkspaceInfo(catalog_dir=tmp_path / "ip", mode=mode)
+    lib_id = ItemIdentifier(
+        kind=ArtifactKind.Library,
+        name="lib",
+        refspec=RefSpec(kind=RefSpecKind.Commit, value=commits[0]),
+        locked_refspec=RefSpec(kind=RefSpecKind.Commit, value=commits[0]),
+    )
+
+    store_dir = catalog.get_store_path(wspace, lib_id, str(origin))
+
+    target_dir = catalog.get_lib_path(wspace, wspace, lib_id)
+    artifact.clone(
+        target_dir,
+        str(origin),
+        lib_id.locked_refspec,
+        FetchOptions(sparse_paths=("rtl",)),
+        store_dir=store_dir,
+    )
+
+    assert sorted(x.name for x in target_dir.iterdir()) == [".git", "rtl"]
+    assert git("config", "remote.origin.promisor", cwd=target_dir) == "true"
+
+    # Folders outside of the sparse checkout are not modifications
+    assert artifact.check_status(wspace, wspace, lib_id) == FetchStatus.Ok
+
+    # Without sparse paths, the whole tree is checked out again
+    artifact.update(
+        target_dir,
+        str(origin),
+        RefSpec(kind=RefSpecKind.Commit, value=commits[1]),
+    )
+
+    assert sorted(x.name for x in target_dir.iterdir()) == [
+        ".git",
+        "docs",
+        "rtl",
+        "sim",
+    ]
+    assert (target_dir / "rtl" / "file").read_text() == "rtl 1\n"
+    assert git("status", "--porcelain", cwd=target_dir) == ""
+
+
+@pytest.mark.parametrize("git_backend", [GitBackend.GitPython, GitBackend.Asyncio])
+def test_offline_sparse_checkout(
+    tmp_path, monkeypatch, git_backend, git, commit, make_origin
+):
+    # Only reachable through the mirror rule of the workspace
+    origin = "https://example.invalid/lib.git"
+
+    mirror, _ = make_origin("mirrors/lib.git", 0)
+    git("config", "uploadpack.allowFilter", "true", cwd=mirror)
+
+    for folder in ("rtl", "docs"):
+        (mirror / folder).mkdir()
+        (mirror / folder / "file").write_text(f"{folder}\n")
+
+    commits = [commit(mirror, "0")]
+
+    (mirror / "rtl" / "file").write_text("rtl 1\n")
+    commits.append(commit(mirror, "1"))
+
+    def write_manifest(commit_sha1, mirrors):
+        (wspace / "frundles.yml").write_text(
+            f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n{mirrors}"
+            f"libraries:\n    - origin: {origin}\n      commit: {commit_sha1}\n"
+            f"      paths: [rtl]\n"
+        )
+
+    mirrors = (
+        f"    mirrors:\n        'https://example.invalid/': '{tmp_path}/mirrors/'\n"
+    )
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    write_manifest(commits[0], mirrors)
+    workspace.sync_workspace(wspace)
+
+    # As set by the frontend in offline mode
+    monkeypatch.setenv("GIT_ALLOW_PROTOCOL", "file")
+    options = FetchOptions(offline=True, git_backend=git_backend)
+
+    # The files of the second commit can't be fetched from the partial clone origin
+    write_manifest(commits[1], "")
+    with pytest.raises(OfflineSyncIncomplete):
+        workspace.sync_workspace(wspace, options=options)
+
+    assert not (wspace / "ip" / f"lib-{commits[1]}").exists()
+
+    # They are fetched from the local mirror
+    write_manifest(commits[1], mirrors)
+    workspace.sync_workspace(wspace, options=options)
+
+    lib_path = wspace / "ip" / f"lib-{commits[1]}"
+    assert (lib_path / "rtl" / "file").read_text() == "rtl 1\n"
+
+
+def test_filter_args():
+    sparse_options = FetchOptions(sparse_paths=("rtl",))
+    assert artifact.get_filter_args(sparse_options) == ("--filter=blob:none",)
+
+    # Files must come with the history when the origin is not contacted
+    assert artifact.get_filter_args(FetchOptions()) == tuple()
+    assert artifact.get_filter_args(replace(sparse_options, offline=True)) == tuple()
+    assert (
+        artifact.get_filter_args(
+            replace(sparse_options, object_cache_dir=Path("cache"))
+        )
+        == tuple()
+    )
+
+
+def test_parse_paths(tmp_path):
+    lib = workspace_file.parse_library_definition(
+        tmp_path,
+        {
+            "origin": "https://example.com/lib.git",
+            "branch": "main",
+            "paths": ["rtl/", "rtl"],
+        },
+    )
+    assert lib.paths == ("rtl",)
+    assert lib.lock(RefSpec(kind=RefSpecKind.Commit, value="0" * 40)).paths == ("rtl",)
+    assert workspace_file.encode_library_definition(lib)["paths"] == ["rtl"]
+
+    with pytest.raises(InvalidSparsePath):
+        workspace_file.parse_library_definition(
+            tmp_path,
+            {
+                "origin": "https://example.com/lib.git",
+                "branch": "main",
+                "paths": "../rtl",
+            },
+        )
@@ -0,0 +1,93 @@
+"""
+# Startup regression tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+
+Commands like locate and list are called many times from vendor tools scripts, so
+they shall not import heavy dependencies they don't need.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+HEAVY_MODULES = ("git", "coloredlogs")
+
+# Run the CLI, then report which heavy modules were imported
+CLI_WRAPPER = """
+import json, sys
+from frundles import frontend
+
+sys.argv = ["frundles"] + sys.argv[1:]
+try:
+    frontend.main()
+finally:
+    print(json.dumps([m for m in {modules!r} if m in sys.modules]), file=sys.stderr)
+"""
+
+WORKSPACE_FILE = """
+workspace:
+    catalog_dir: 'ip'
+    mode: 'recurse'
+
+libraries:
+    - origin: 'https://github.com/pulp-platform/common_cells.git'
+      commit: '{commit}'
+      friendly_name: 'pulp-common_cells'
+"""
+
+
+@pytest.fixture
+def wspace_dir(tmp_path):
+    wspace = tmp_path / "wspace"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(WORKSPACE_FILE.format(commit="0" * 40))
+
+    return wspace
+
+
+def _imported_heavy_modules(cwd: Path, tmp_path: Path, *args: str):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_DIR), env.get("PYTHONPATH")])
+    )
+    env["FRUNDLES_CACHE_DIR"] = str(tmp_path / "cache")
+
+    result = subprocess.run(
+        [sys.executable, "-c", CLI_WRAPPER.format(modules=HEAVY_MODULES), *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return result.stdout, json.loads(result.stderr.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("command", [["locate", "pulp-common_cells"], ["list"]])
+def test_no_heavy_imports(wspace_dir, tmp_path, command):
+    # Run twice: first call parses the workspace, second one uses the cached information
+    for _ in range(2):
+        stdout, imported = _imported_heavy_modules(
+            wspace_dir, tmp_path, "--output_mode", "vivado", *command
+        )
+
+        assert stdout.startswith("OUTPUT:")
+        assert imported == []
+
+
+def test_locate_output(wspace_dir, tmp_path):
+    stdout, _ = _imported_heavy_modules(
+        wspace_dir, tmp_path, "--output_mode", "vivado", "locate", "pulp-common_cells"
+    )
+
+    assert stdout.strip() == f"OUTPUT:{wspace_dir / 'ip' / 'pulp-common_cells'}"
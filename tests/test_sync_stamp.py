@@ -0,0 +1,92 @@
+"""
+# Sync stamp tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import os
+import shutil
+
+import pytest
+
+from frundles.backend import sync_stamp, workspace
+from frundles.model import FetchOptions
+
+
+@pytest.fixture
+def wspace(tmp_path, make_origin):
+    """Workspace synchronized once, with a single library"""
+
+    origin, _ = make_origin("lib")
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      branch: main\n"
+    )
+
+    workspace.sync_workspace(wspace)
+    assert sync_stamp.is_up_to_date(wspace)
+
+    return wspace
+
+
+def get_lib_path(wspace):
+    (lib_path,) = (x for x in (wspace / "ip").iterdir() if x.name != ".stores")
+    return lib_path
+
+
+def edit_manifest(wspace, commit):
+    with open(wspace / "frundles.yml", "a") as fhandle:
+        fhandle.write("# Edited\n")
+
+
+def edit_lock_file(wspace, commit):
+    lock_path = wspace / "frundles.lock"
+    lock_path.write_text(lock_path.read_text().replace("lib:", "lib:other", 1))
+
+
+def move_head(wspace, commit):
+    lib_path = get_lib_path(wspace)
+    (lib_path / "README").write_text("local change\n")
+    commit(lib_path, "1")
+
+
+def remove_library(wspace, commit):
+    shutil.rmtree(get_lib_path(wspace))
+
+
+@pytest.mark.parametrize(
+    "change", [edit_manifest, edit_lock_file, move_head, remove_library]
+)
+def test_changes_invalidate_stamp(wspace, commit, change):
+    change(wspace, commit)
+    assert not sync_stamp.is_up_to_date(wspace)
+
+
+def test_touched_files(wspace):
+    # Same content with other stat information
+    for name in ("frundles.yml", "frundles.lock"):
+        content = (wspace / name).read_text()
+        (wspace / name).unlink()
+        (wspace / name).write_text(content)
+        os.utime(wspace / name, (1000, 1000))
+
+    assert sync_stamp.is_up_to_date(wspace)
+
+
+def test_options_change(wspace):
+    export_options = FetchOptions(export=True)
+    assert not sync_stamp.is_up_to_date(wspace, export_options)
+    assert not sync_stamp.is_up_to_date(wspace, FetchOptions(shallow=True))
+
+    # Other options don't change library folders
+    assert sync_stamp.is_up_to_date(wspace, FetchOptions(dirty_check=False))
+
+    # The synchronization is not skipped, and stamped with its own options
+    workspace.sync_workspace(wspace, options=export_options)
+
+    assert sync_stamp.is_up_to_date(wspace, export_options)
+    assert not sync_stamp.is_up_to_date(wspace)
@@ -0,0 +1,120 @@
+"""
+# Parsed workspace cache tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import json
+import os
+
+import pytest
+
+from frundles.backend import workspace, workspace_cache
+
+# Old enough to be trusted, see workspace_cache._RACY_DELAY_NS
+OLD_MTIME = 1_000_000_000
+
+
+def age(*paths):
+    for path in paths:
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Record the paths of the workspaces parsed instead of taken from the cache"""
+
+    calls = list()
+    parse_workspace = workspace._parse_workspace
+
+    def wrapper(path, ignore_lockfile):
+        calls.append(path)
+        return parse_workspace(path, ignore_lockfile)
+
+    monkeypatch.setattr(workspace, "_parse_workspace", wrapper)
+    workspace_cache._memory_cache.clear()
+
+    return calls
+
+
+@pytest.fixture
+def wspace(tmp_path, make_origin):
+    origin, _ = make_origin("lib")
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      branch: main\n"
+        f"externals:\n    - origin: {origin}\n      branch: main\n      dest_path: vendor\n"
+    )
+
+    workspace.sync_workspace(wspace)
+    age(wspace / "frundles.yml", wspace / "frundles.lock")
+
+    return wspace
+
+
+def test_cache_hit(wspace, cache_dir, parse_calls):
+    result = workspace.load_workspace(wspace)
+    assert parse_calls == [wspace]
+
+    # Entries are plain JSON data
+    (entry_path,) = (cache_dir / "workspaces").iterdir()
+    assert (
+        json.loads(entry_path.read_text())["version"] == workspace_cache._CACHE_VERSION
+    )
+
+    # Other processes start with an empty memory cache
+    workspace_cache._memory_cache.clear()
+    assert workspace.load_workspace(wspace) == result
+    assert parse_calls == [wspace]
+
+
+# Number of lines declaring or locking the external, at the end of each file
+@pytest.mark.parametrize(
+    "name, external_lines", [("frundles.yml", 4), ("frundles.lock", 1)]
+)
+def test_invalidation(wspace, parse_calls, name, external_lines):
+    workspace.load_workspace(wspace)
+
+    # Remove the external
+    content = (wspace / name).read_text().splitlines(keepends=True)
+    (wspace / name).write_text("".join(content[:-external_lines]))
+    age(wspace / name)
+
+    workspace_cache._memory_cache.clear()
+    workspace.load_workspace(wspace)
+    assert parse_calls == [wspace, wspace]
+
+
+def test_racy_files(wspace, cache_dir, parse_calls):
+    # Files modified just now may be modified again without changing their signature
+    os.utime(wspace / "frundles.yml")
+
+    workspace.load_workspace(wspace)
+    assert not (cache_dir / "workspaces").exists()
+
+    workspace.load_workspace(wspace)
+    assert parse_calls == [wspace]
+
+
+def test_worktree_origin(tmp_path, git, make_origin, parse_calls):
+    repo, _ = make_origin("repo")
+    git("remote", "add", "origin", "https://example.com/a.git", cwd=repo)
+
+    # The workspace is a worktree: its origin is in the configuration of the main repository
+    wspace = tmp_path / "ws"
+    git("worktree", "add", "--quiet", "--detach", str(wspace), cwd=repo)
+    (wspace / "frundles.yml").write_text(
+        "workspace:\n    catalog_dir: ip\n    mode: aggregate\nlibraries: []\n"
+    )
+    age(wspace / "frundles.yml", wspace / ".git", repo / ".git" / "config")
+
+    sig = workspace_cache.signature(wspace)
+
+    git("remote", "set-url", "origin", "https://example.com/b.git", cwd=repo)
+    age(repo / ".git" / "config")
+
+    assert workspace_cache.signature(wspace) != sig
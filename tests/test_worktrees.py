@@ -0,0 +1,93 @@
+"""
+# Aggregate mode worktrees tests
+
+- Florian Dupeyron <florian.dupeyron@mugcat.fr>
+- October 2026
+"""
+
+import shutil
+
+from frundles.backend import artifact, workspace
+from frundles.model import RefSpec, RefSpecKind
+
+
+def test_commits_share_store(tmp_path, make_origin):
+    origin, commits = make_origin("origin", 2)
+
+    store_dir = tmp_path / "ip" / ".stores" / "lib.git"
+
+    for commit in commits:
+        artifact.clone(
+            tmp_path / "ip" / f"lib-{commit}",
+            str(origin),
+            RefSpec(kind=RefSpecKind.Commit, value=commit),
+            store_dir=store_dir,
+        )
+
+    for i, commit in enumerate(commits):
+        target_dir = tmp_path / "ip" / f"lib-{commit}"
+
+        assert artifact.get_head(target_dir) == commit
+        assert artifact.get_origin(target_dir) == str(origin)
+        assert (target_dir / "README").read_text() == f"revision {i}\n"
+        assert not artifact._is_workspace_dirty(target_dir)
+
+    # Both checkouts are worktrees of the same store
+    assert len(list((store_dir / "worktrees").iterdir())) == 2
+
+
+def test_forks_use_separate_stores(tmp_path, make_origin):
+    origins, commits = [], []
+
+    # The fork has one more commit than upstream
+    for i, name in enumerate(("upstream/libA", "fork/libA")):
+        origin, origin_commits = make_origin(name, i + 1)
+        origins.append(origin)
+        commits.append(origin_commits[-1])
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        "workspace:\n    catalog_dir: ip\n    mode: aggregate\nlibraries:\n"
+        + "".join(
+            f"    - origin: {origin}\n      commit: {commit}\n      friendly_name: lib{i}\n"
+            for i, (origin, commit) in enumerate(zip(origins, commits))
+        )
+    )
+
+    workspace.sync_workspace(wspace)
+
+    for i, commit in enumerate(commits):
+        target_dir = wspace / "ip" / f"libA-{commit}"
+        assert artifact.get_head(target_dir) == commit
+        assert artifact.get_origin(target_dir) == str(origins[i])
+
+    assert len(list((wspace / "ip" / ".stores").iterdir())) == 2
+
+
+def test_moved_catalog(tmp_path, git, make_origin):
+    origin, (commit,) = make_origin("origin")
+
+    wspace = tmp_path / "ws"
+    wspace.mkdir()
+    (wspace / "frundles.yml").write_text(
+        f"workspace:\n    catalog_dir: ip\n    mode: aggregate\n"
+        f"libraries:\n    - origin: {origin}\n      commit: {commit}\n"
+    )
+
+    workspace.sync_workspace(wspace)
+
+    # Worktree links are absolute: both copies must be repaired to their own store
+    copied = tmp_path / "copied"
+    shutil.copytree(wspace, copied, symlinks=True)
+    moved = tmp_path / "moved"
+    wspace.rename(moved)
+
+    for path in (moved, copied):
+        workspace.sync_workspace(path, force=True)
+
+        target_dir = path / "ip" / f"origin-{commit}"
+        assert git("rev-parse", "--git-common-dir", cwd=target_dir).startswith(
+            str(path / "ip" / ".stores")
+        )
+        assert git("status", "--porcelain", cwd=target_dir) == ""